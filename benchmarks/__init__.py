@@ -0,0 +1,6 @@
+"""
+Benchmarks for the solver and the data pipeline.
+
+Run from the project root, e.g.:
+    python -m benchmarks.solver_bench --team-sizes 30 60 120
+"""
@@ -0,0 +1,132 @@
+import random
+from collections import defaultdict
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+DAY_NUM_MAP = {day: i + 1 for i, day in enumerate(DAYS)}
+
+# Teaching/Assisting are always generated first so the preference/equality rules are exercised
+SPECIAL_FAMILIES = ["Teaching", "Assisting"]
+
+
+def generate_team(team_size, both_share=0.2, seed=0):
+    """Team members shaped like data/team_members.json (alternating roles, some 'both')."""
+    rng = random.Random(seed)
+    team = []
+    for i in range(team_size):
+        team.append({
+            "name": f"Person {i + 1:03d}",
+            "role": "leader" if i % 2 == 0 else "follower",
+            "both": rng.random() < both_share
+        })
+    return team
+
+
+def generate_instance(team_size=30, weeks=4, families=8, groups_per_family=2, repeats=1,
+                      density=0.6, priority_share=0.1, manual_share=0.05, seed=0):
+    """
+    Deterministic synthetic instance shaped like step 03's {prefix}_groups.json.
+    Returns (groups, team_members).
+
+    - families:          Number of task families (the first two are Teaching/Assisting).
+    - groups_per_family: Group definitions per family, each fixed to one weekday.
+    - repeats:           Instances of each group definition per week (repeat_index 1..N).
+    - density:           Probability that a team member is available for a group.
+    - priority_share:    Share of groups with 1-2 priority candidates.
+    - manual_share:      Share of groups with a manual assignee.
+    """
+    rng = random.Random(seed)
+    team = generate_team(team_size, seed=seed)
+    member_map = {m['name']: m for m in team}
+
+    # 1. Group definitions (family, name, day, role, task count, effort)
+    family_names = (SPECIAL_FAMILIES + [f"Family {i + 1:02d}" for i in range(max(0, families - 2))])[:families]
+    definitions = []
+    for fam_name in family_names:
+        for j in range(groups_per_family):
+            definitions.append({
+                "family": fam_name,
+                "name": f"{fam_name} Group {j + 1}",
+                "day": rng.choice(DAYS),
+                "role": rng.choice(["leader", "follower", "any"]),
+                "task_count": rng.randint(1, 3),
+                "effort": round(rng.choice([0.5, 1.0, 1.5, 2.0, 3.0]), 2)
+            })
+
+    # 2. Instances per week and repeat
+    groups = []
+    id_counters = defaultdict(int)
+    manual_by_day = defaultdict(set) # (week, day) -> manual assignees (keeps manual picks non-overlapping)
+    for week in range(1, weeks + 1):
+        for gdef in definitions:
+            for repeat in range(1, repeats + 1):
+                day = gdef['day']
+                id_counters[(week, day)] += 1
+                group_id = f"G{week}_{DAY_NUM_MAP[day]}_{id_counters[(week, day)]}_{repeat}"
+
+                candidates = sorted(m['name'] for m in team if rng.random() < density)
+                filtered = [c for c in candidates if _role_matches(member_map[c], gdef['role'])]
+
+                priority = []
+                if filtered and rng.random() < priority_share:
+                    priority = sorted(rng.sample(filtered, min(len(filtered), rng.randint(1, 2))))
+
+                assignee = None
+                if filtered and rng.random() < manual_share:
+                    free = [c for c in filtered if c not in manual_by_day[(week, day)]]
+                    if free:
+                        assignee = rng.choice(free)
+                        manual_by_day[(week, day)].add(assignee)
+
+                groups.append({
+                    "name": gdef['name'],
+                    "id": group_id,
+                    "role": gdef['role'],
+                    "family": gdef['family'],
+                    "week": week,
+                    "day": day,
+                    "tasks": [[f"T{week}_{day}_{gdef['name']}_{k}_{repeat}", f"{gdef['name']} Task {k}"]
+                              for k in range(1, gdef['task_count'] + 1)],
+                    "task_count": gdef['task_count'],
+                    "repeat_index": repeat,
+                    "assignee": assignee,
+                    "exclusive_groups": [],
+                    "cooldown_refs": [],
+                    "intra_cooldown_refs": [],
+                    "overlap_cliques": [],
+                    "candidates_list": candidates,
+                    "filtered_candidates_list": filtered,
+                    "priority_candidates_list": priority,
+                    "filtered_priority_candidates_list": priority,
+                    "note": None,
+                    "effort": gdef['effort']
+                })
+
+    link_groups(groups)
+    return groups, team
+
+
+def _role_matches(member, role):
+    if role == 'any':
+        return True
+    return member['role'] == role or member['both']
+
+
+def link_groups(groups):
+    """Same linking rules as step 03: same-day repeats are exclusive, family cooldowns by (family, week) reference."""
+    by_day = defaultdict(list)
+    family_week_names = defaultdict(set)
+    for g in groups:
+        by_day[(g['week'], g['day'])].append(g)
+        family_week_names[(g['family'], g['week'])].add(g['name'])
+
+    for g in groups:
+        for other in by_day[(g['week'], g['day'])]:
+            if other['id'] != g['id'] and other['name'] == g['name'] and other['repeat_index'] != g['repeat_index']:
+                g['exclusive_groups'].append([other['id'], other['name']])
+
+        g['cooldown_refs'] = [[g['family'], week] for week in (g['week'] - 1, g['week'] + 1)
+                              if (g['family'], week) in family_week_names]
+
+        names = family_week_names[(g['family'], g['week'])]
+        if len(names) > 1 or g['name'] not in names:
+            g['intra_cooldown_refs'] = [[g['family'], g['week']]]
@@ -0,0 +1,215 @@
+"""
+Data pipeline benchmark (steps 02, 03 and 05) on synthetic raw CSVs.
+
+Usage (from the project root):
+    python -m benchmarks.pipeline_bench --scales 1 10 100
+    python -m benchmarks.pipeline_bench --save-baseline   # Store the result as the new baseline
+
+A scale multiplies the base team size, task count, schedule rows per day and family count.
+Each step is timed (best of --repeat runs) and then run once more under tracemalloc for
+its peak Python memory.
+"""
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+# Allow running as a script from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+import pandas as pd
+
+from benchmarks.pipeline_data import generate_raw_data
+from benchmarks.report import make_report, save_report, load_report, compare_reports, format_comparison
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCH_DIR / "baselines" / "pipeline.json"
+RESULTS_DIR = BENCH_DIR / "results"
+PREFIX = "january_2026"
+
+# Differences below these are treated as noise (seconds / MB)
+NOISE_FLOOR_SECONDS = 0.02
+NOISE_FLOOR_MB = 1.0
+
+
+@contextlib.contextmanager
+def working_directory(path):
+    """The step scripts resolve data/ relative to the CWD."""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def measure(fn, repeat):
+    """Returns (result, best seconds, peak traced MB)."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, round(best, 4), round(peak / (1024 * 1024), 2)
+
+
+def run_pipeline(work_dir, repeat=3):
+    """Runs steps 02, 03 and 05 on the data/ tree in work_dir. Returns the metrics dict."""
+    from src.step_02_convert_data import (process_task_availability, process_calendar_availability, process_schedule,
+                                          schedule_columns, assign_task_ids, task_row_ids, file_digest)
+    from src.step_03_aggregate_groups import process_groups
+    from src.step_05_export_csv import export_csv_for_month
+
+    data_dir = Path(work_dir) / "data"
+    raw_dir = data_dir / "raw"
+    metrics = {}
+
+    def record(step, fn):
+        result, seconds, peak_mb = measure(fn, repeat)
+        metrics[f"{step}_seconds"] = seconds
+        metrics[f"{step}_peak_mb"] = peak_mb
+        return result
+
+    # Step 02
+    task_df, cal_df, schedule_df = record("read_csv", lambda: (
+        pd.read_csv(raw_dir / "task_availability.csv", encoding='utf-8'),
+        pd.read_csv(raw_dir / "calendar_availability.csv", header=None, encoding='utf-8'),
+        pd.read_csv(raw_dir / f"{PREFIX}.csv", encoding='utf-8')
+    ))
+    tasks_data = record("task_availability", lambda: process_task_availability(task_df.copy()))
+    calendar_data = record("calendar_availability", lambda: process_calendar_availability(cal_df))
+    tasks_list = record("schedule", lambda: process_schedule(schedule_df, tasks_data, calendar_data))
+
+    # Step 03 (process_groups normalizes exclusions in place, so each run gets a fresh copy)
+    with open(data_dir / "task_families.json", 'r', encoding='utf-8') as f:
+        task_families = json.load(f)
+    with open(data_dir / "team_members.json", 'r', encoding='utf-8') as f:
+        team_members = json.load(f)
+    groups = record("groups", lambda: process_groups(copy.deepcopy(tasks_list), copy.deepcopy(task_families), team_members))
+
+    # Step 05 needs groups.json, the row map and an assignments file (first filtered candidate stands in for the solver)
+    processed_dir = data_dir / "processed"
+    results_dir = data_dir / "results"
+    processed_dir.mkdir(parents=True, exist_ok=True)
+    results_dir.mkdir(parents=True, exist_ok=True)
+    assignments = {}
+    for g in groups:
+        cands = g.get('filtered_candidates_list') or []
+        assignee = g.get('assignee') or (cands[0] if cands else None)
+        assignments[g['id']] = {"group_name": g['name'], "assignee": assignee}
+    with open(processed_dir / f"{PREFIX}_groups.json", 'w', encoding='utf-8') as f:
+        json.dump(groups, f, ensure_ascii=False)
+    with open(results_dir / f"{PREFIX}_assignments.json", 'w', encoding='utf-8') as f:
+        json.dump(assignments, f, ensure_ascii=False)
+    task_rows = {
+        "source": f"{PREFIX}.csv",
+        "source_sha256": file_digest(raw_dir / f"{PREFIX}.csv"),
+        "task_ids": task_row_ids(assign_task_ids(schedule_columns(schedule_df)), len(schedule_df))
+    }
+    with open(processed_dir / f"{PREFIX}_task_rows.json", 'w', encoding='utf-8') as f:
+        json.dump(task_rows, f, ensure_ascii=False)
+
+    with working_directory(work_dir):
+        record("export_csv", lambda: export_csv_for_month(PREFIX))
+
+    metrics["num_tasks"] = len(tasks_list)
+    metrics["num_groups"] = len(groups)
+    metrics["total_seconds"] = round(sum(v for k, v in metrics.items() if k.endswith("_seconds")), 4)
+    return metrics
+
+
+def run_case(params, repeat=3):
+    with tempfile.TemporaryDirectory() as tmp:
+        sizes = generate_raw_data(Path(tmp) / "data", prefix=PREFIX, **params)
+        metrics = run_pipeline(tmp, repeat=repeat)
+    return sizes, metrics
+
+
+def noise_floor(metrics):
+    return {k: (NOISE_FLOOR_MB if k.endswith("_mb") else NOISE_FLOOR_SECONDS) for k in metrics}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the step 02/03/05 data pipeline on synthetic CSVs.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--team-size", type=int, default=30, help="Team size at scale 1.")
+    parser.add_argument("--weeks", type=int, default=4, help="Calendar weeks (7 columns each); not scaled.")
+    parser.add_argument("--tasks", type=int, default=40, help="Task columns at scale 1.")
+    parser.add_argument("--rows-per-day", type=int, default=6, help="Schedule rows per day at scale 1.")
+    parser.add_argument("--families", type=int, default=8, help="Families at scale 1.")
+    parser.add_argument("--groups-per-family", type=int, default=2)
+    parser.add_argument("--density", type=float, default=0.6)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    results = []
+    for scale in args.scales:
+        params = {
+            "team_size": args.team_size * scale,
+            "weeks": args.weeks,
+            "tasks": args.tasks * scale,
+            "rows_per_day": args.rows_per_day * scale,
+            "families": args.families * scale,
+            "groups_per_family": args.groups_per_family,
+            "density": args.density,
+            "seed": args.seed
+        }
+        name = f"x{scale}"
+        print(f"Running {name}...", flush=True)
+        sizes, metrics = run_case(params, repeat=args.repeat)
+        print(f"  rows={sizes['schedule_rows']} team={sizes['team_size']} groups={metrics['num_groups']} "
+              f"calendar={metrics['calendar_availability_seconds']}s schedule={metrics['schedule_seconds']}s "
+              f"groups={metrics['groups_seconds']}s export={metrics['export_csv_seconds']}s", flush=True)
+        results.append({"case": name, "params": params, "sizes": sizes, "metrics": metrics})
+
+    report = make_report("pipeline", results)
+    output = args.output or RESULTS_DIR / f"pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    save_report(report, output)
+    print(f"Report saved to {output}")
+
+    if args.save_baseline:
+        save_report(report, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_report(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline} (run with --save-baseline to create one).")
+        return 0
+
+    floors = noise_floor(results[0]['metrics']) if results else {}
+    rows = compare_reports(report, baseline, tolerance=args.tolerance, noise_floor=floors)
+    print(format_comparison(rows))
+    regressions = [r for r in rows if r['regression']]
+    print(f"{len(regressions)} regression(s) against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
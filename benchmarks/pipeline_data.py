@@ -0,0 +1,136 @@
+import csv
+import json
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+DAY_SHORT = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# Values people type into the calendar sheet (time ranges, see src/time_slots.py)
+CALENDAR_VALUES = ["All", "19-00", "19-22", "19-21", "19-20", "20-22", "21-00", "20-21", "21-22", "22-00"]
+SCHEDULE_SLOTS = ["19-20", "20-21", "21-22", "22-00", "19-21", "20-22"]
+
+
+def generate_raw_data(out_dir, prefix="january_2026", team_size=30, weeks=4, tasks=40, rows_per_day=6,
+                      families=8, groups_per_family=2, density=0.6, manual_share=0.05, seed=0):
+    """
+    Writes a synthetic data/ tree as produced by step 01 (plus the team/family JSONs):
+    - raw/task_availability.csv:  Name, Role, one Yes/No column per task.
+    - raw/calendar_availability.csv: 3 blank rows, Weeks/Dates/Days rows, a header row,
+      then one row per person; data columns start at index 4 (7 columns per week).
+    - raw/{prefix}.csv: Week, Day, Time, TODO, Assignee, EFFORT.
+    - task_families.json / team_members.json.
+
+    Every task is tied to one weekday, so family groups combine tasks that occur together.
+    Returns a dict with the row/column counts that were generated.
+    """
+    rng = random.Random(seed)
+    out_dir = Path(out_dir)
+    raw_dir = out_dir / "raw"
+    raw_dir.mkdir(parents=True, exist_ok=True)
+
+    team = [{"name": f"Person {i + 1:04d}", "role": "leader" if i % 2 == 0 else "follower", "both": rng.random() < 0.2}
+            for i in range(team_size)]
+    names = [m['name'] for m in team]
+    task_names = [f"Task {i + 1:04d}" for i in range(tasks)]
+    task_day = {t: DAYS[i % 7] for i, t in enumerate(task_names)}
+
+    # 1. Task availability
+    capable = {}
+    with open(raw_dir / "task_availability.csv", 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Name", "Role"] + task_names)
+        for m in team:
+            answers = ["Yes" if rng.random() < density else "No" for _ in task_names]
+            for t, a in zip(task_names, answers):
+                if a == "Yes":
+                    capable.setdefault(t, []).append(m['name'])
+            writer.writerow([m['name'], m['role'].capitalize()] + answers)
+
+    # 2. Calendar availability (week label only on the first column of each week)
+    n_cols = 4 + weeks * 7
+    start = date(2026, 1, 5) # A Monday
+    weeks_row = [""] * n_cols
+    dates_row = [""] * n_cols
+    days_row = [""] * n_cols
+    for w in range(weeks):
+        for d in range(7):
+            col = 4 + w * 7 + d
+            if d == 0:
+                weeks_row[col] = f"Week {w + 1}"
+            dates_row[col] = (start + timedelta(days=w * 7 + d)).isoformat()
+            days_row[col] = DAY_SHORT[d]
+
+    with open(raw_dir / "calendar_availability.csv", 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        for _ in range(3):
+            writer.writerow([""] * n_cols)
+        writer.writerow(weeks_row)
+        writer.writerow(dates_row)
+        writer.writerow(days_row)
+        writer.writerow(["ID", "Name", "Email", "Role"] + [""] * (n_cols - 4))
+        for i, m in enumerate(team):
+            slots = [rng.choice(CALENDAR_VALUES) if rng.random() < density else "" for _ in range(n_cols - 4)]
+            writer.writerow([str(i + 1), m['name'], f"p{i + 1}@example.com", m['role'][0].upper()] + slots)
+
+    # 3. Monthly schedule (tasks of the day, some repeated, a few manual assignees)
+    by_day = {day: [t for t in task_names if task_day[t] == day] for day in DAYS}
+    schedule_rows = 0
+    with open(raw_dir / f"{prefix}.csv", 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Week", "Day", "Time", "TODO", "Assignee", "EFFORT"])
+        for w in range(1, weeks + 1):
+            for day in DAYS:
+                if not by_day[day]:
+                    continue
+                for _ in range(rows_per_day):
+                    task = rng.choice(by_day[day])
+                    assignee = ""
+                    if capable.get(task) and rng.random() < manual_share:
+                        assignee = rng.choice(capable[task])
+                    writer.writerow([w, day, rng.choice(SCHEDULE_SLOTS), task, assignee, rng.choice([0.5, 1.0, 1.5, 2.0])])
+                    schedule_rows += 1
+                # Blank separator row between days, as in the real sheet
+                writer.writerow(["", "", "", "", "", ""])
+
+    # 4. Families: groups of 1-2 tasks from the same day
+    task_families = []
+    for i in range(families):
+        fam = {"name": f"Family {i + 1:03d}", "groups": []}
+        for j in range(groups_per_family):
+            day_tasks = by_day[DAYS[rng.randrange(7)]]
+            if not day_tasks:
+                continue
+            group_tasks = rng.sample(day_tasks, min(len(day_tasks), rng.randint(1, 2)))
+            fam['groups'].append({
+                "name": f"Family {i + 1:03d} Group {j + 1}",
+                "tasks": group_tasks,
+                "exclusive": [],
+                "PriorityAssignees": rng.sample(names, 1) if names and rng.random() < 0.1 else [],
+                "leader-group-count": rng.randint(0, 1),
+                "follower-group-count": rng.randint(0, 1),
+                "any-group-count": 1
+            })
+        task_families.append(fam)
+
+    # Exclusive pairs between groups of different families
+    all_groups = [g for fam in task_families for g in fam['groups']]
+    for g in all_groups:
+        if len(all_groups) > 1 and rng.random() < 0.3:
+            other = rng.choice(all_groups)
+            if other is not g:
+                g['exclusive'].append(other['name'])
+
+    with open(out_dir / "task_families.json", 'w', encoding='utf-8') as f:
+        json.dump(task_families, f, indent=4, ensure_ascii=False)
+    with open(out_dir / "team_members.json", 'w', encoding='utf-8') as f:
+        json.dump(team, f, indent=4, ensure_ascii=False)
+
+    return {
+        "team_size": team_size,
+        "calendar_columns": n_cols,
+        "schedule_rows": schedule_rows,
+        "tasks": tasks,
+        "family_groups": len(all_groups)
+    }
@@ -0,0 +1,112 @@
+import json
+import platform
+import sys
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource # Unix only
+except ImportError:
+    resource = None
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+def environment():
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine()
+    }
+    try:
+        import ortools
+        info["ortools"] = ortools.__version__
+    except ImportError:
+        pass
+    return info
+
+
+def make_report(benchmark, cases):
+    return {
+        "benchmark": benchmark,
+        "created": datetime.now().isoformat(timespec='seconds'),
+        "environment": environment(),
+        "cases": cases
+    }
+
+
+def save_report(report, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
+
+
+def load_report(path):
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# Lower-is-better metrics; everything else numeric (sizes, counts such as num_solutions) is only reported
+COST_SUFFIXES = ("_seconds", "_mb")
+COST_PREFIXES = ("objective_at_",)
+COST_METRICS = {"time_to_first_solution", "final_objective"}
+
+
+def is_cost_metric(metric):
+    return metric in COST_METRICS or metric.endswith(COST_SUFFIXES) or metric.startswith(COST_PREFIXES)
+
+
+def compare_reports(current, baseline, tolerance=1.25, noise_floor=None):
+    """
+    Compares every numeric metric of matching cases. Only cost metrics (timings, memory,
+    objectives; see is_cost_metric) can regress; the others are reported, never flagged.
+    A cost metric regresses when current > baseline * tolerance and the difference is above
+    its noise floor (noise_floor: metric name -> absolute value, e.g. 0.05 s for timings).
+    A cost value that was present in the baseline but is missing now (e.g. no solution
+    within a budget) is also a regression.
+    """
+    noise_floor = noise_floor or {}
+    baseline_cases = {c['case']: c for c in baseline.get('cases', [])}
+    rows = []
+    for case in current.get('cases', []):
+        base = baseline_cases.get(case['case'])
+        if not base:
+            continue
+        for metric, value in case['metrics'].items():
+            base_value = base['metrics'].get(metric)
+            if isinstance(value, bool) or not isinstance(base_value, (int, float)) or isinstance(base_value, bool):
+                continue
+            cost = is_cost_metric(metric)
+            if value is None:
+                rows.append({"case": case['case'], "metric": metric, "baseline": base_value,
+                             "current": None, "ratio": None, "regression": cost})
+                continue
+            if not isinstance(value, (int, float)):
+                continue
+            ratio = value / base_value if base_value else (1.0 if value == base_value else float('inf'))
+            regression = cost and value > base_value * tolerance and (value - base_value) > noise_floor.get(metric, 0)
+            rows.append({"case": case['case'], "metric": metric, "baseline": base_value,
+                         "current": value, "ratio": round(ratio, 3), "regression": regression})
+    return rows
+
+
+def format_comparison(rows):
+    lines = [f"{'Case':<28}{'Metric':<28}{'Baseline':>16}{'Current':>16}{'Ratio':>8}"]
+    lines.append("-" * len(lines[0]))
+    for r in rows:
+        current = "n/a" if r['current'] is None else f"{r['current']:.6g}"
+        ratio = "n/a" if r['ratio'] is None else f"{r['ratio']:.2f}"
+        flag = "  <-- REGRESSION" if r['regression'] else ""
+        lines.append(f"{r['case']:<28}{r['metric']:<28}{r['baseline']:>16.6g}{current:>16}{ratio:>8}{flag}")
+    return "\n".join(lines)
@@ -0,0 +1,180 @@
+"""
+Solver scaling benchmark on synthetic instances.
+
+Usage (from the project root):
+    python -m benchmarks.solver_bench --team-sizes 30 60 120 --budgets 5 15 30
+    python -m benchmarks.solver_bench --save-baseline   # Store the result as the new baseline
+
+Each case runs in a fresh process so peak memory is per case.
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Allow running as a script from the project root
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from benchmarks.instances import generate_instance
+from benchmarks.report import (
+    peak_rss_mb, make_report, save_report, load_report, compare_reports, format_comparison
+)
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCH_DIR / "baselines" / "solver.json"
+RESULTS_DIR = BENCH_DIR / "results"
+
+# Timings below these absolute differences are treated as noise
+NOISE_FLOOR = {
+    "build_seconds": 0.1,
+    "time_to_first_solution": 0.25,
+    "total_seconds": 0.5,
+    "peak_rss_mb": 25
+}
+
+
+def load_solver_config():
+    """Ladder and settings from data/penalty_config.json (time limit is set per run)."""
+    with open(PROJECT_ROOT / "data" / "penalty_config.json", 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def objective_at(solutions, budget):
+    """Best objective found within `budget` seconds of search (None if no solution yet)."""
+    found = [obj for t, obj in solutions if t <= budget]
+    return min(found) if found else None
+
+
+def run_case(params, budgets, config):
+    """Builds and solves one instance. Returns the metrics dict."""
+    from src.solver.solver import SATSolver
+
+    groups, team = generate_instance(**params)
+
+    run_config = dict(config)
+    run_config['time_limit_seconds'] = max(budgets)
+    run_config['progress_interval_seconds'] = 3600 # Nothing to report to; keep the callback cheap
+
+    solutions = []
+    def on_progress(printer):
+        solutions.append((printer.WallTime(), printer.ObjectiveValue()))
+
+    solver = SATSolver(groups, team, run_config, log=lambda line: None)
+    started = time.perf_counter()
+    solver.solve(progress_callback=on_progress)
+    total = time.perf_counter() - started
+
+    totals = solver.build_profile['totals'] if solver.build_profile else {}
+    stats = solver.solve_stats or {}
+    metrics = {
+        "num_groups": len(groups),
+        "num_team_members": len(team),
+        "num_variables": totals.get('variables'),
+        "num_constraints": totals.get('constraints'),
+        "build_seconds": totals.get('seconds'),
+        "time_to_first_solution": solutions[0][0] if solutions else None,
+        "num_solutions": len(solutions),
+        "status": stats.get('status'),
+        "final_objective": stats.get('objective'),
+        "total_seconds": round(total, 3),
+        "peak_rss_mb": peak_rss_mb()
+    }
+    for budget in budgets:
+        metrics[f"objective_at_{budget:g}s"] = objective_at(solutions, budget)
+    return metrics
+
+
+def run_isolated(params, budgets, config):
+    """run_case in a fresh process (peak RSS would otherwise carry over between cases)."""
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(run_case, (params, budgets, config))
+
+
+def case_name(params):
+    return f"team{params['team_size']}_w{params['weeks']}_f{params['families']}x{params['groups_per_family']}_s{params['seed']}"
+
+
+def build_cases(args):
+    cases = []
+    for team_size in args.team_sizes:
+        # By default the workload grows with the team (more people -> more venues/groups)
+        groups_per_family = args.groups_per_family
+        if not args.fixed_groups:
+            groups_per_family = max(1, round(args.groups_per_family * team_size / 30))
+        for seed in args.seeds:
+            cases.append({
+                "team_size": team_size,
+                "weeks": args.weeks,
+                "families": args.families,
+                "groups_per_family": groups_per_family,
+                "repeats": args.repeats,
+                "density": args.density,
+                "priority_share": args.priority_share,
+                "manual_share": args.manual_share,
+                "seed": seed
+            })
+    return cases
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark SATSolver on synthetic instances.")
+    parser.add_argument("--team-sizes", type=int, nargs="+", default=[30, 60, 120])
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--families", type=int, default=8)
+    parser.add_argument("--groups-per-family", type=int, default=2, help="Per family at 30 people (scaled with team size unless --fixed-groups).")
+    parser.add_argument("--fixed-groups", action="store_true", help="Do not scale the number of groups with the team size.")
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--density", type=float, default=0.6)
+    parser.add_argument("--priority-share", type=float, default=0.1)
+    parser.add_argument("--manual-share", type=float, default=0.05)
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--budgets", type=float, nargs="+", default=[5, 15, 30], help="Search time checkpoints in seconds (the largest is the time limit).")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="Allowed ratio to the baseline before flagging a regression.")
+    args = parser.parse_args(argv)
+
+    config = load_solver_config()
+    budgets = sorted(args.budgets)
+
+    results = []
+    for params in build_cases(args):
+        name = case_name(params)
+        print(f"Running {name}...", flush=True)
+        metrics = run_isolated(params, budgets, config)
+        print(f"  groups={metrics['num_groups']} vars={metrics['num_variables']} build={metrics['build_seconds']}s "
+              f"first={metrics['time_to_first_solution']}s status={metrics['status']} "
+              f"objective={metrics['final_objective']} rss={metrics['peak_rss_mb']}MB", flush=True)
+        results.append({"case": name, "params": params, "budgets": budgets, "metrics": metrics})
+
+    report = make_report("solver", results)
+    output = args.output or RESULTS_DIR / f"solver_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    save_report(report, output)
+    print(f"Report saved to {output}")
+
+    if args.save_baseline:
+        save_report(report, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_report(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline} (run with --save-baseline to create one).")
+        return 0
+
+    rows = compare_reports(report, baseline, tolerance=args.tolerance, noise_floor=NOISE_FLOOR)
+    print(format_comparison(rows))
+    regressions = [r for r in rows if r['regression']]
+    print(f"{len(regressions)} regression(s) against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,23 @@
 import asyncio
 import json
 import logging
-import subprocess
 import sys
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from fastapi import FastAPI, WebSocket, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
+# Add project root to sys.path to allow running as script
+root_dir = str(Path(__file__).resolve().parent.parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from src.worker import WorkerClient
+from src.jobs import JobManager
+from src.pipeline import default_prefix
+
 # Initialize FastAPI
 app = FastAPI(title="Partyka Solver API")
 
@@ -28,6 +36,12 @@ DATA_DIR = BASE_DIR / "data"
 CONFIG_PATH = DATA_DIR / "penalty_config.json"
 VENV_PYTHON = BASE_DIR / ".venv" / "bin" / "python"
 
+# Resident pipeline worker (src/worker.py), started on the first run and shared by all requests
+RESIDENT_WORKER = WorkerClient([VENV_PYTHON, "-u", BASE_DIR / "src" / "worker.py"], cwd=BASE_DIR)
+
+# Solve jobs (src/jobs.py), created on startup
+jobs: JobManager = None
+
 # --- Models ---
 class ConfigUpdate(BaseModel):
     ladder: List[str]
@@ -35,8 +49,10 @@ class ConfigUpdate(BaseModel):
     effort_threshold: float
     time_limit_seconds: float
 
-class StartSearchRequest(BaseModel):
-    time_limit: float
+class JobRequest(BaseModel):
+    prefix: Optional[str] = None # Default from penalty_config.json
+    time_limit: Optional[float] = None # Default time_limit_seconds
+    publish: bool = False # Copy the results into data/results when the job ends
 
 # --- Helpers ---
 def load_config() -> Dict[str, Any]:
@@ -49,25 +65,95 @@ def save_config(config: Dict[str, Any]):
     with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
         json.dump(config, f, indent=4, ensure_ascii=False)
 
-async def run_script(script_name: str, args: List[str] = []):
-    """Runs a Python script from src/ as a subprocess."""
-    script_path = BASE_DIR / "src" / script_name
-    cmd = [str(VENV_PYTHON), str(script_path)] + args
-    
-    # Run synchronously for simple steps (or await asyncio.create_subprocess_exec if preferred for non-blocking)
-    # For simplicity of these short scripts, we'll use blocking for now, or asyncio wrapper.
-    process = await asyncio.create_subprocess_exec(
-        *cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
+async def worker_events(args: List[str]):
+    """Events of `pipeline.py <args>` on the resident worker, as they arrive (the last one is "done")."""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    def pump():
+        try:
+            for event in RESIDENT_WORKER.run(args):
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, {"event": "done", "ok": False, "code": None, "error": str(e)})
+
+    runner = loop.run_in_executor(None, pump)
+    while True:
+        event = await queue.get()
+        yield event
+        if event["event"] == "done":
+            break
+    await runner
+
+async def run_pipeline(args: List[str]):
+    """Runs the pipeline on the resident worker and returns its output."""
+    lines = []
+    async for event in worker_events(args):
+        if event["event"] == "log":
+            lines.append(event["line"])
+        elif event["event"] == "done":
+            done = event
+
+    output = "\n".join(lines)
+    if not done["ok"]:
+        raise HTTPException(status_code=500, detail=f"Script failed: {done.get('error') or output}")
+
+    return {"status": "success", "output": output}
+
+async def prepare_job(job):
+    """Brings the job's groups up to date on the resident worker (steps 02/03 only if their inputs changed)."""
+    async for event in worker_events(["aggregate", job.prefix]):
+        if event["event"] == "log":
+            jobs.publish(job, {"event": "log", "line": event["line"]})
+    if not event["ok"]:
+        raise RuntimeError(event.get("error") or "Preparing the groups failed")
+
+async def stream_job(websocket: WebSocket, job, send):
+    """
+    Passes the job's events to send(event) until the job ends.
+    Returns False if the client disconnected first.
+    """
+    async def forward():
+        async for event in jobs.subscribe(job.id):
+            await send(event)
+
+    async def disconnect():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    sender = asyncio.create_task(forward())
+    watcher = asyncio.create_task(disconnect())
+    done, pending = await asyncio.wait({sender, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    for task in pending:
+        task.cancel()
+    if sender in done:
+        sender.result()
+        return True
+    return False
+
+def get_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+@app.on_event("startup")
+async def start_jobs():
+    global jobs
+    config = load_config()
+    jobs = JobManager(
+        [VENV_PYTHON, "-u", BASE_DIR / "src" / "step_04_run_solver.py"],
+        results_root=DATA_DIR / "results" / "jobs",
+        publish_dir=DATA_DIR / "results",
+        max_jobs=config.get("max_concurrent_jobs"),
+        cwd=BASE_DIR,
+        prepare=prepare_job
     )
-    
-    stdout, stderr = await process.communicate()
-    
-    if process.returncode != 0:
-        raise HTTPException(status_code=500, detail=f"Script failed: {stderr.decode()}")
-    
-    return {"status": "success", "output": stdout.decode()}
+
+@app.on_event("shutdown")
+async def stop_jobs():
+    # Running solves stop and still write their best solution
+    await jobs.shutdown()
 
 # --- Endpoints ---
 
@@ -85,87 +171,83 @@ def update_config(update: ConfigUpdate):
     save_config(config)
     return {"status": "updated", "config": config}
 
+# Steps run through the pipeline runner (src/pipeline.py): only steps whose inputs changed are re-run
+
 @app.post("/api/run/download")
 async def run_download():
-    return await run_script("step_01_download_data.py")
+    return await run_pipeline(["convert", "--download"])
 
 @app.post("/api/run/aggregate")
 async def run_aggregate():
-    # Run step 2 and 3 together as "Aggregate" usually implies getting data ready
-    await run_script("step_02_convert_data.py")
-    return await run_script("step_03_aggregate_groups.py")
+    # Steps 2 and 3, as "Aggregate" usually implies getting data ready
+    return await run_pipeline(["aggregate"])
 
 @app.post("/api/run/export")
 async def run_export():
-    return await run_script("step_05_export_csv.py")
+    return await run_pipeline(["export"])
+
+# Solve jobs: each runs in its own process with its own results directory (data/results/jobs/{job_id})
+
+@app.post("/api/jobs")
+async def submit_job(request: JobRequest):
+    prefix = request.prefix.lower().replace(" ", "_") if request.prefix else default_prefix(load_config())
+    return jobs.submit(prefix, time_limit=request.time_limit, publish=request.publish).summary()
+
+@app.get("/api/jobs")
+def list_jobs():
+    return jobs.list()
+
+@app.get("/api/jobs/{job_id}")
+def job_status(job_id: str):
+    return get_job(job_id).summary()
+
+@app.post("/api/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    get_job(job_id)
+    return jobs.cancel(job_id).summary()
+
+@app.websocket("/api/jobs/{job_id}/events")
+async def websocket_job_events(websocket: WebSocket, job_id: str):
+    await websocket.accept()
+    job = jobs.get(job_id)
+    if job is None:
+        await websocket.send_json({"error": f"Unknown job: {job_id}"})
+        await websocket.close()
+        return
+
+    # Every event so far, then live ones; any number of viewers can follow the same job
+    try:
+        if await stream_job(websocket, job, websocket.send_json):
+            await websocket.close()
+    except Exception as e:
+        await websocket.send_json({"error": str(e)})
+        await websocket.close()
 
 @app.websocket("/api/solve/live")
 async def websocket_solve(websocket: WebSocket):
     await websocket.accept()
-    
-    script_path = BASE_DIR / "src" / "step_04_run_solver.py"
-    cmd = [str(VENV_PYTHON), "-u", str(script_path)] # -u for unbuffered stdout
-    
+    # One job per connection, published to data/results; it is cancelled if the client leaves first
+    job = jobs.submit(default_prefix(load_config()), publish=True)
+
+    async def send(event):
+        if event["event"] == "log":
+            await websocket.send_json({"raw": event["line"].strip()})
+        else:
+            # Typed solver progress (src/progress.py) and the job's state changes
+            await websocket.send_json(event)
+
     try:
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        
-        # Read line by line
-        while True:
-            line = await process.stdout.readline()
-            if not line:
-                break
-            
-            line_str = line.decode().strip()
-            
-            # Simple parsing for visualization
-            # Format: "Solution X, time = Y s, objective = Z, penalties = W"
-            data = {"raw": line_str}
-            
-            if "objective =" in line_str:
-                parts = line_str.split(',')
-                try:
-                    # Parse interesting bits
-                    # "Solution 345" -> 345
-                    # " time = 50.61 s" -> 50.61
-                    # " objective = 2714.0" -> 2714.0
-                    # " penalties = 148" -> 148
-                    
-                    obj_part = [p for p in parts if "objective =" in p][0]
-                    time_part = [p for p in parts if "time =" in p][0]
-                    pen_part = [p for p in parts if "penalties =" in p]
-                    
-                    objective = float(obj_part.split('=')[1].strip())
-                    time_val = float(time_part.split('=')[1].strip().replace('s',''))
-                    penalties = 0
-                    if pen_part:
-                        penalties = int(pen_part[0].split('=')[1].strip())
-
-                    data["parsed"] = {
-                        "time": time_val,
-                        "objective": objective,
-                        "penalties": penalties
-                    }
-                except Exception as e:
-                    # ignore parsing errors for non-standard lines
-                    pass
-
-            await websocket.send_json(data)
-
-        # Check for errors
-        stderr_output = await process.stderr.read()
-        if stderr_output:
-            await websocket.send_json({"error": stderr_output.decode()})
-            
-        await process.wait()
-        await websocket.send_json({"status": "complete", "return_code": process.returncode})
-        
+        if not await stream_job(websocket, job, send):
+            jobs.cancel(job.id)
+            return
+
+        if job.error:
+            await websocket.send_json({"error": job.error})
+        await websocket.send_json({"status": "complete", "return_code": job.return_code, "job_id": job.id})
+        await websocket.close()
     except Exception as e:
+        jobs.cancel(job.id)
         await websocket.send_json({"error": str(e)})
-    finally:
         await websocket.close()
 
 if __name__ == "__main__":
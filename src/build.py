@@ -73,7 +73,15 @@ def build_app():
         "PyQt6.QtSvg",
         "src.default_families",
         "src.default_team",
-        "src.rule_descriptions"
+        "src.rule_descriptions",
+        "src.interchange",
+        "src.worker",
+        "src.progress",
+        "src.scenarios",
+        "src.solver.evaluator",
+        "msgpack",
+        "openpyxl",
+        "concurrent.futures" # src/pipeline.py (run via --dispatch, not seen by the analysis)
     ]
     
     # Collect OR-Tools dependencies automatically (fixes DLL load errors)
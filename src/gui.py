@@ -32,6 +32,16 @@ try:
 except ImportError:
     from rule_descriptions import RULE_DESCRIPTIONS
 
+try:
+    from src.interchange import data_exists, load_data
+except ImportError:
+    from interchange import data_exists, load_data
+
+try:
+    from src.worker import WorkerClient
+except ImportError:
+    from worker import WorkerClient
+
 
 # Inline definition to avoid import issues
 class NumericSortItem(QTreeWidgetItem):
@@ -127,6 +137,11 @@ def setup_paths():
     
     return base_dir
 
+# Frozen app: pool processes (src/scenarios.py) start this executable; run them and exit here
+if getattr(sys, 'frozen', False):
+    import multiprocessing
+    multiprocessing.freeze_support()
+
 BASE_DIR = setup_paths()
 
 # Define Execution Python
@@ -363,9 +378,22 @@ QRadioButton::indicator:unchecked:hover {{
 """
 
 # --- Solver Worker Thread ---
+_RESIDENT_WORKER = None
+
+def resident_worker():
+    """The session's resident pipeline worker (src/worker.py), started on first use."""
+    global _RESIDENT_WORKER
+    if _RESIDENT_WORKER is None:
+        if getattr(sys, 'frozen', False):
+            cmd = [str(VENV_PYTHON), "--dispatch", "worker.py"]
+        else:
+            cmd = [str(VENV_PYTHON), "-u", str(SRC_DIR / "worker.py")]
+        _RESIDENT_WORKER = WorkerClient(cmd, cwd=BASE_DIR)
+    return _RESIDENT_WORKER
+
 class ScriptWorker(QThread):
     progress_signal = pyqtSignal(str) # Raw output line
-    data_signal = pyqtSignal(dict)    # Parsed data for graph
+    data_signal = pyqtSignal(dict)    # "solution" progress events for the graph (src/progress.py)
     finished_signal = pyqtSignal()
     
     def __init__(self, script_name, args=None, parse_output=False):
@@ -375,8 +403,14 @@ class ScriptWorker(QThread):
         self.parse_output = parse_output
         self.is_running = True
         self.process = None
+        self.returncode = None
 
     def run(self):
+        if self.script_name == "pipeline.py":
+            # Pipeline runs go to the resident worker: no interpreter start-up or imports per step
+            self._run_resident()
+            return
+
         # Force unbuffered output to get real-time updates
         env = os.environ.copy()
         env["PYTHONUNBUFFERED"] = "1"
@@ -411,44 +445,34 @@ class ScriptWorker(QThread):
                 line = line.strip()
                 self.progress_signal.emit(line)
                 
-                if self.parse_output:
-                    self._parse_solver_line(line)
-                    
             self.process.wait()
+            self.returncode = self.process.returncode
             
         except Exception as e:
             self.progress_signal.emit(f"Error: {e}")
         finally:
             self.finished_signal.emit()
 
-    def _parse_solver_line(self, line):
-        # Format: "Solution X, time = Y s, objective = Z, penalties = W"
-        if "objective =" in line:
-            parts = line.split(',')
-            try:
-                obj_part = [p for p in parts if "objective =" in p][0]
-                time_part = [p for p in parts if "time =" in p][0]
-                pen_part = [p for p in parts if "penalties =" in p]
-                
-                objective = float(obj_part.split('=')[1].strip())
-                time_val = float(time_part.split('=')[1].strip().replace('s',''))
-                penalties = 0
-                if pen_part:
-                    penalties = int(pen_part[0].split('=')[1].strip())
-                    
-                self.data_signal.emit({
-                    "time": time_val,
-                    "objective": objective,
-                    "penalties": penalties
-                })
-            except:
-                pass
+    def _run_resident(self):
+        try:
+            for event in resident_worker().run(self.args):
+                if event["event"] == "log":
+                    self.progress_signal.emit(event["line"].strip())
+                elif event["event"] == "solution":
+                    if self.parse_output:
+                        self.data_signal.emit(event)
+                elif event["event"] == "done":
+                    self.returncode = event["code"]
+        except Exception as e:
+            self.progress_signal.emit(f"Error: {e}")
+        finally:
+            self.finished_signal.emit()
 
     def stop(self):
         self.is_running = False
-        if self.process:
-            self.process.terminate()
-
+        if self.script_name == "pipeline.py":
+            # Ends the run; the next one starts a fresh worker
+            resident_worker().stop()
         if self.process:
             self.process.terminate()
 
@@ -921,13 +945,12 @@ class TaskFamiliesOverlay(QDialog):
         
         # Load additional known tasks from processed/tasks.json
         tasks_path = DATA_DIR / "processed" / "tasks.json"
-        if tasks_path.exists():
+        if data_exists(tasks_path):
             try:
-                with open(tasks_path, 'r', encoding='utf-8') as f:
-                    tasks_data = json.load(f)
-                    for t in tasks_data:
-                        if "name" in t:
-                            self.all_tasks.add(t["name"])
+                tasks_data = load_data(tasks_path)
+                for t in tasks_data:
+                    if "name" in t:
+                        self.all_tasks.add(t["name"])
             except Exception as e:
                 print(f"Error loading tasks.json in Families Overlay: {e}")
         
@@ -1459,14 +1482,13 @@ class TeamMemberOverlay(QDialog):
         
         self.available_names = set()
         
-        if processed_tasks_path.exists():
+        if data_exists(processed_tasks_path):
             try:
-                with open(processed_tasks_path, 'r', encoding='utf-8') as f:
-                    tasks_data = json.load(f)
-                    # Extract all candidates
-                    for t in tasks_data:
-                         if "candidates" in t:
-                             self.available_names.update(t["candidates"])
+                tasks_data = load_data(processed_tasks_path)
+                # Extract all candidates
+                for t in tasks_data:
+                     if "candidates" in t:
+                         self.available_names.update(t["candidates"])
             except Exception as e:
                 print(f"Error loading tasks.json: {e}")
         else:
@@ -1776,10 +1798,8 @@ class PartykaSolverApp(QMainWindow):
         
         # 3. Solve Button
         self.btn_solve = QPushButton("2. Start Search")
-        self.btn_solve.setToolTip("Auto-runs aggregation then starts solver")
-        
-        # State
-        self.pending_solve = False
+        self.btn_solve.setToolTip("Updates the data (unchanged steps are skipped), then starts the solver")
+
         # Use pseudo-states for proper disabled styling
         self.btn_solve.setStyleSheet(f"""
             QPushButton {{
@@ -1853,6 +1873,10 @@ class PartykaSolverApp(QMainWindow):
         
         self.curve_obj = p1.plot(name="Penalty Sum", pen=pg.mkPen(COLORS['graph_obj'], width=3))
         
+        # Per-rule cost curves (created on demand from the "breakdown" of solution events)
+        self.rule_curves = {}
+        self.rule_series = {}
+        
         # Axis 2: Penalties (Right, Linear)
         self.vb2 = pg.ViewBox()
         self.vb2.setMouseEnabled(x=False, y=False) # Disable interaction on secondary axis
@@ -1922,6 +1946,41 @@ class PartykaSolverApp(QMainWindow):
         pen_layout.addWidget(self.tree_pen)
         self.tabs.addTab(self.tab_penalties, "Penalties")
 
+        # TAB 5: Scenarios (what-if batch solves over config variants, src/scenarios.py)
+        self.tab_scenarios = QWidget()
+        scen_layout = QVBoxLayout(self.tab_scenarios)
+        scen_controls = QHBoxLayout()
+        scen_controls.addWidget(QLabel("Effort thresholds:"))
+        self.scen_thresholds = QLineEdit()
+        self.scen_thresholds.setPlaceholderText("e.g. 6, 8, 10")
+        scen_controls.addWidget(self.scen_thresholds)
+        scen_controls.addWidget(QLabel("Penalty ratios:"))
+        self.scen_ratios = QLineEdit()
+        self.scen_ratios.setPlaceholderText("e.g. 5, 10")
+        scen_controls.addWidget(self.scen_ratios)
+        self.scen_swap = QCheckBox("Swap adjacent rules")
+        self.scen_swap.setToolTip("One scenario per swap of two neighbouring ladder rules")
+        scen_controls.addWidget(self.scen_swap)
+        self.scen_drop = QCheckBox("Drop each rule")
+        self.scen_drop.setToolTip("One scenario per active rule, with that rule disabled")
+        scen_controls.addWidget(self.scen_drop)
+        scen_controls.addWidget(QLabel("Time (s):"))
+        self.scen_time = QSpinBox()
+        self.scen_time.setRange(5, 3600)
+        self.scen_time.setValue(60)
+        self.scen_time.setToolTip("Time limit per scenario")
+        scen_controls.addWidget(self.scen_time)
+        self.btn_scenarios = QPushButton("Run Scenarios")
+        self.btn_scenarios.clicked.connect(self.run_scenarios_flow)
+        scen_controls.addWidget(self.btn_scenarios)
+        scen_layout.addLayout(scen_controls)
+
+        # Rows: rule violations, objective, status, changed assignments; one column per scenario
+        self.table_scenarios = QTableWidget()
+        self.table_scenarios.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        scen_layout.addWidget(self.table_scenarios)
+        self.tabs.addTab(self.tab_scenarios, "Scenarios")
+
         right_layout.addWidget(self.tabs)
         
         # --- Bottom Area: Collapsible Console ---
@@ -1968,6 +2027,7 @@ class PartykaSolverApp(QMainWindow):
         
         # Initial State Check
         self.update_button_states()
+        self.load_scenarios()
 
     def restore_defaults(self):
         # 1. Reset Values
@@ -2096,9 +2156,11 @@ class PartykaSolverApp(QMainWindow):
         
         # 3. Solve (Search): Requires Processed Tasks (because it chains Aggregate)
         processed_tasks = PROCESSED_DIR / f"{month}_{year}_tasks.json"
-        can_solve = processed_tasks.exists()
+        can_solve = data_exists(processed_tasks)
         self.btn_solve.setEnabled(can_solve)
         self.btn_solve.setToolTip("Requires processed data (run Step 1)" if not can_solve else "")
+        self.btn_scenarios.setEnabled(can_solve)
+        self.btn_scenarios.setToolTip("Requires processed data (run Step 1)" if not can_solve else "")
 
         # 5. Export: Requires Results
         assignments_file = RESULTS_DIR / f"{month}_{year}_assignments_by_person.json"
@@ -2106,57 +2168,130 @@ class PartykaSolverApp(QMainWindow):
         # step_05 reads: assignments_path = results_dir / f"{month}_{year}_assignments.json"
         # Let's check that one.
         assignments_file = RESULTS_DIR / f"{month}_{year}_assignments.json"
-        can_export = assignments_file.exists()
+        can_export = data_exists(assignments_file)
         self.btn_export.setEnabled(can_export)
         self.btn_export.setToolTip("Requires solution results" if not can_export else "")
 
-    def run_step(self, script_name, args=None):
+    def run_step(self, script_name, args=None, on_finished=None):
         if self.worker and self.worker.isRunning():
             return
             
         self.btn_download.setEnabled(False)
         self.btn_solve.setEnabled(False)
         self.btn_export.setEnabled(False)
+        self.btn_scenarios.setEnabled(False)
         
         self.log(f"--- Running {script_name} ---", COLORS['blue'])
         
         self.worker = ScriptWorker(script_name, args)
         self.worker.progress_signal.connect(self.log)
         # Use built-in 'finished' signal which is emitted AFTER run() returns
-        self.worker.finished.connect(self.on_step_finished) 
+        self.worker.finished.connect(on_finished or self.on_step_finished)
         self.worker.start()
 
     def run_download_flow(self):
-        # Pass "January 2026"
-        arg = f"{self.month_combo.currentText()} {self.year_combo.currentText()}" 
-        self.run_step("step_01_download_data.py", args=[arg])
+        # Pass "january_2026": download (step 01), then convert what changed (step 02)
+        month = self.month_combo.currentText().lower()
+        year = self.year_combo.currentText()
+        prefix = f"{month}_{year}"
+        self.run_step("pipeline.py", args=["convert", prefix, "--download"])
 
     def run_aggregate_flow(self):
         # Pass "january_2026"
         month = self.month_combo.currentText().lower()
         year = self.year_combo.currentText()
         prefix = f"{month}_{year}"
-        self.run_step("step_03_aggregate_groups.py", args=[prefix]) 
+        self.run_step("pipeline.py", args=["aggregate", prefix]) 
 
     def run_export_flow(self):
         # Pass "january_2026"
         month = self.month_combo.currentText().lower()
         year = self.year_combo.currentText()
         prefix = f"{month}_{year}"
-        self.run_step("step_05_export_csv.py", args=[prefix])
+        self.run_step("pipeline.py", args=["export", prefix])
+
+    def run_scenarios_flow(self):
+        # One batch: baseline + the variants picked in the Scenarios tab, solved in parallel
+        def numbers(text):
+            return [float(x) for x in text.replace(";", ",").split(",") if x.strip()]
+        try:
+            thresholds = numbers(self.scen_thresholds.text())
+            ratios = numbers(self.scen_ratios.text())
+        except ValueError:
+            self.log("Scenarios: thresholds and ratios must be comma-separated numbers.", COLORS['danger'])
+            return
+
+        self.update_config_values()
+        month = self.month_combo.currentText().lower()
+        year = self.year_combo.currentText()
+        args = [f"{month}_{year}", "--time-limit", str(self.scen_time.value())]
+        if thresholds:
+            args += ["--effort-threshold"] + [str(t) for t in thresholds]
+        if ratios:
+            args += ["--penalty-ratio"] + [str(r) for r in ratios]
+        if self.scen_swap.isChecked():
+            args.append("--swap-adjacent")
+        if self.scen_drop.isChecked():
+            disabled = set(self.config.get("disabled_rules", []))
+            for rule in self.config.get("ladder", []):
+                if rule not in disabled:
+                    args += ["--disable", rule]
+
+        self.tabs.setCurrentWidget(self.tab_scenarios)
+        self.run_step("scenarios.py", args, on_finished=self.on_scenarios_finished)
+
+    def on_scenarios_finished(self):
+        self.on_step_finished()
+        self.load_scenarios()
+
+    def load_scenarios(self):
+        prefix = f"{self.month_combo.currentText().lower()}_{self.year_combo.currentText()}"
+        path = RESULTS_DIR / "scenarios" / f"{prefix}_scenarios.json"
+        self.table_scenarios.clear()
+        if not data_exists(path):
+            self.table_scenarios.setRowCount(0)
+            self.table_scenarios.setColumnCount(0)
+            return
+        data = load_data(path)
+        scenarios = data.get("scenarios", [])
+        rules = data.get("rules", [])
+
+        self.table_scenarios.setColumnCount(len(scenarios))
+        self.table_scenarios.setHorizontalHeaderLabels([s["name"] for s in scenarios])
+        labels = rules + ["Objective", "Status", "Changed assignments"]
+        self.table_scenarios.setRowCount(len(labels))
+        self.table_scenarios.setVerticalHeaderLabels(labels)
+
+        baseline = scenarios[0] if scenarios else None
+        for col, scenario in enumerate(scenarios):
+            for row, rule in enumerate(rules):
+                count = scenario["violations"].get(rule, 0)
+                item = QTableWidgetItem(str(count))
+                item.setToolTip(f"Cost: {scenario['costs'].get(rule, 0)}")
+                # Fewer / more violations than the baseline
+                base_count = baseline["violations"].get(rule, 0)
+                if count < base_count:
+                    item.setForeground(QColor(COLORS['success']))
+                elif count > base_count:
+                    item.setForeground(QColor(COLORS['danger']))
+                self.table_scenarios.setItem(row, col, item)
+            objective = scenario.get("objective")
+            self.table_scenarios.setItem(len(rules), col, QTableWidgetItem("-" if objective is None else str(round(objective))))
+            self.table_scenarios.setItem(len(rules) + 1, col, QTableWidgetItem(scenario.get("status") or "-"))
+            changed = QTableWidgetItem(str(len(scenario.get("changed", {}))))
+            changed.setToolTip("\n".join(f"{g}: {a or '-'} -> {b or '-'}" for g, (a, b) in list(scenario.get("changed", {}).items())[:30]))
+            self.table_scenarios.setItem(len(rules) + 2, col, changed)
+        self.table_scenarios.resizeColumnsToContents()
 
     def start_solver(self):
         # 0. Check if running
         if self.worker and self.worker.isRunning():
             self.log("Stopping solver...", COLORS['danger'])
             self.worker.stop()
-            self.pending_solve = False # Cancel chain
             return
 
-        # Chained Flow: Aggregate -> Solve
-        self.pending_solve = True
-        self.log("--- Auto-Chain: Running Aggregation First ---", COLORS['accent_secondary'])
-        self.run_aggregate_flow()
+        # One pipeline run: steps 02/03 only if their inputs changed, then the solver
+        self._start_solver_internal()
 
     def _start_solver_internal(self):
         if self.worker and self.worker.isRunning():
@@ -2173,6 +2308,11 @@ class PartykaSolverApp(QMainWindow):
         self.pens = []
         self.curve_obj.setData([], [])
         self.curve_pen.setData([], [])
+        for curve in self.rule_curves.values():
+            self.plot_widget.getPlotItem().removeItem(curve)
+            self.legend.removeItem(curve)
+        self.rule_curves = {}
+        self.rule_series = {}
         self.log_output.clear()
         
         self.solve_start_time = None
@@ -2195,21 +2335,23 @@ class PartykaSolverApp(QMainWindow):
         """)
         self.btn_download.setEnabled(False)
         self.btn_export.setEnabled(False)
+        self.btn_scenarios.setEnabled(False)
         
         # Pass "january_2026"
         month = self.month_combo.currentText().lower()
         year = self.year_combo.currentText()
         prefix = f"{month}_{year}"
-        script_args = [prefix] 
+        script_args = ["solve", prefix] 
         
         self.log("--- Starting Solver ---", COLORS['success'])
-        self.worker = ScriptWorker("step_04_run_solver.py", script_args, parse_output=True)
+        self.worker = ScriptWorker("pipeline.py", script_args, parse_output=True)
         self.worker.progress_signal.connect(self.log)
         self.worker.data_signal.connect(self.update_graph)
         self.worker.finished.connect(self.on_solver_finished)
         self.worker.start()
 
     def update_graph(self, data):
+        # One "solution" event: a point on the objective/penalty curves plus its per-rule costs
         # Initialize timer on first data point
         if self.solve_start_time is None:
             # Sync local time to the solver's reported time
@@ -2222,6 +2364,24 @@ class PartykaSolverApp(QMainWindow):
         self.pens.append(data['penalties'])
         self.curve_obj.setData(self.times, self.objs)
         self.curve_pen.setData(self.times, self.pens)
+        self.update_rule_curves(data['breakdown'])
+
+    def update_rule_curves(self, breakdown):
+        if not self.times:
+            return
+        p1 = self.plot_widget.getPlotItem()
+        n = len(self.times)
+        for rule, cost in breakdown.items():
+            if rule not in self.rule_curves:
+                # One thin curve per ladder rule, created the first time it appears
+                color = pg.intColor(len(self.rule_curves), hues=12)
+                self.rule_curves[rule] = p1.plot(name=rule, pen=pg.mkPen(color, width=1), connect='finite')
+                self.rule_series[rule] = [float('nan')] * (n - 1)
+            series = self.rule_series[rule]
+            series.extend([float('nan')] * (n - 1 - len(series)))
+            # Log axis: a satisfied rule (cost 0) leaves a gap instead of -inf
+            series.append(cost if cost > 0 else float('nan'))
+            self.rule_curves[rule].setData(self.times[:len(series)], series)
 
     def update_live_time(self):
         if not self.solve_start_time:
@@ -2244,15 +2404,10 @@ class PartykaSolverApp(QMainWindow):
 
     def on_step_finished(self):
         script_name = self.worker.script_name if self.worker else None
+        script_args = self.worker.args if self.worker else []
         
-        # Check success via return code (if accessible)
-        success = False
-        if self.worker and self.worker.process:
-             # Just in case process hasn't been polled recently
-             if self.worker.process.returncode is None:
-                 self.worker.process.poll()
-             if self.worker.process.returncode == 0:
-                 success = True
+        # Check success via return code (None if stopped or the process died)
+        success = self.worker is not None and self.worker.returncode == 0
         
         self.log("Finished.", COLORS['success'] if success else COLORS['danger'])
         
@@ -2261,28 +2416,6 @@ class PartykaSolverApp(QMainWindow):
         self.timer.stop()
         self.update_button_states()
         
-        # --- Chained Execution Logic ---
-        if self.pending_solve:
-            if script_name == "step_03_aggregate_groups.py" and success:
-                self.log("Aggregation Successful. Proceeding to Solver...", COLORS['accent_primary'])
-                # Small delay or immediate? Immediate is fine.
-                # Must reset pending_solve BEFORE calling internal start to avoid loop if it fails immediately? 
-                # Actually _start_solver_internal launches a thread, so it returns immediately.
-                # But _start_solver_internal sets worker to step_04. 
-                # pending_solve should be reset once the solver STARTS (or if aggregation fails).
-                
-                # We need to call _start_solver_internal.
-                # But wait, self.pending_solve should only be consumed if we were waiting for aggregation.
-                self.pending_solve = False 
-                self._start_solver_internal()
-                return # Don't process other finished logic for aggregation
-            else:
-                # If aggregation failed or was wrong script
-                if script_name == "step_03_aggregate_groups.py" and not success:
-                    self.log("Aggregation Failed. Aborting Solver.", COLORS['danger'])
-                
-                self.pending_solve = False
-
         # Check if we just finished Export
         
         self.log("Finished.", COLORS['success'])
@@ -2291,7 +2424,7 @@ class PartykaSolverApp(QMainWindow):
         self.update_button_states()
         
         # Check if we just finished Export
-        if script_name == "step_05_export_csv.py":
+        if script_name == "pipeline.py" and script_args[:1] == ["export"]:
             month = self.month_combo.currentText().lower()
             year = self.year_combo.currentText()
             prefix = f"{month}_{year}"
@@ -2344,9 +2477,8 @@ class PartykaSolverApp(QMainWindow):
         
         self.tree_assign.clear()
         self.tree_assign.clear()
-        if assign_path.exists():
-            with open(assign_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+        if data_exists(assign_path):
+            data = load_data(assign_path)
                 
             for person, info in data.items():
                 p_item = QTreeWidgetItem(self.tree_assign)
@@ -2375,9 +2507,8 @@ class PartykaSolverApp(QMainWindow):
         pen_path = RESULTS_DIR / f"{prefix}_penalties.json"
         self.tree_pen.clear()
         self.tree_pen.clear()
-        if pen_path.exists():
-            with open(pen_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+        if data_exists(pen_path):
+            data = load_data(pen_path)
             
             # Determine top 3 tiers threshold
             # Solver uses ratio=10. Costs are 10^(N-1), 10^(N-2), ...
@@ -2424,6 +2555,9 @@ class PartykaSolverApp(QMainWindow):
                 # Force kill if needed (though terminate usually works)
                 if self.worker.process:
                     self.worker.process.kill()
+
+        if _RESIDENT_WORKER is not None:
+            _RESIDENT_WORKER.close()
         
         event.accept()
 
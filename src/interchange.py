@@ -0,0 +1,97 @@
+import json
+from pathlib import Path
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Formats the steps can hand data to each other in (name -> file suffix).
+# Paths are always passed around with their .json name; the suffix is swapped for the chosen format.
+FORMATS = {
+    "json": ".json",
+    "msgpack": ".msgpack"
+}
+DEFAULT_FORMAT = "json"
+
+
+def data_format(config=None):
+    """
+    Interchange format selected by penalty_config.json ("interchange_format", default "json").
+    Falls back to JSON when msgpack is selected but not installed.
+    """
+    fmt = (config or {}).get("interchange_format", DEFAULT_FORMAT)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown interchange_format '{fmt}' (expected one of {', '.join(FORMATS)})")
+    if fmt == "msgpack" and msgpack is None:
+        print("[WARN] interchange_format is 'msgpack' but msgpack is not installed, using JSON")
+        return "json"
+    return fmt
+
+
+def data_path(path, fmt=DEFAULT_FORMAT):
+    return Path(path).with_suffix(FORMATS[fmt])
+
+
+def dumps(data, fmt=DEFAULT_FORMAT):
+    """data -> bytes. JSON is the indented, human-readable form the steps have always written."""
+    if fmt == "msgpack":
+        return msgpack.packb(data, use_bin_type=True)
+    return json.dumps(data, indent=4, ensure_ascii=False).encode('utf-8')
+
+
+def loads(blob, fmt=DEFAULT_FORMAT):
+    if fmt == "msgpack":
+        return msgpack.unpackb(blob, raw=False)
+    return json.loads(blob)
+
+
+def find_data(path):
+    """
+    (path, fmt) of the newest existing file for a .json path in any readable format, or None.
+    Newest wins, so switching formats never reads a stale file from the previous setting.
+    """
+    found = []
+    for fmt in FORMATS:
+        if fmt == "msgpack" and msgpack is None:
+            continue
+        candidate = data_path(path, fmt)
+        if candidate.exists():
+            # Ties (coarse timestamps) go to the binary file
+            found.append((candidate.stat().st_mtime_ns, fmt != "json", candidate, fmt))
+    if not found:
+        return None
+    _, _, candidate, fmt = max(found, key=lambda x: x[:2])
+    return candidate, fmt
+
+
+def data_exists(path):
+    return find_data(path) is not None
+
+
+def load_data(path):
+    """Loads a .json path from whichever format was written last."""
+    located = find_data(path)
+    if located is None:
+        raise FileNotFoundError(f"No data file for {path}")
+    candidate, fmt = located
+    return loads(candidate.read_bytes(), fmt)
+
+
+def save_data(data, path, fmt=DEFAULT_FORMAT, export_json=False):
+    """
+    Writes data for a .json path in fmt (atomically: tmp file, then rename) and returns the bytes written.
+    export_json also writes the .json copy for humans when fmt is a binary format.
+    """
+    if export_json and fmt != "json":
+        # Written first so the primary file stays the newest (and is the one find_data picks)
+        _write_atomic(data_path(path, "json"), dumps(data, "json"))
+    blob = dumps(data, fmt)
+    _write_atomic(data_path(path, fmt), blob)
+    return blob
+
+
+def _write_atomic(path, blob):
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    tmp_path.write_bytes(blob)
+    tmp_path.replace(path)
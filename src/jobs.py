@@ -0,0 +1,287 @@
+"""
+Solve jobs for api.py.
+
+Each job is one run of step 04 in its own process, writing to its own results directory
+(data/results/jobs/{job_id}), so concurrent solves never overwrite each other's files.
+At most max_jobs run at a time; the others wait in submission order. The cores are split
+between the running jobs (CP-SAT num_workers = cores // max_jobs).
+
+- Events: everything a job produces is kept in order and fanned out to any number of
+  subscribers, who first get what they missed. "log" (printed lines), the solver's typed
+  progress events (src/progress.py, read from --events-fd) and "job" (state changes, the
+  job's summary; the last one has a final status).
+- Cancel: a queued job is dropped; a running solve is told to stop on its stdin
+  (--stop-on-stdin), CP-SAT StopSearch ends the search and the best solution is written.
+  The solver processes also stop that way when the API goes away (stdin closes).
+- Publish: a job submitted with publish=True copies its result files into data/results
+  when it ends with a result, where step 05 and the GUI read them.
+
+States: queued -> running -> (cancelling ->) completed | cancelled | failed
+"""
+import asyncio
+import json
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+
+FINAL_STATES = ("completed", "cancelled", "failed")
+
+# CP-SAT search workers per job when max_jobs is not given (cores // 4 jobs at a time)
+DEFAULT_SEARCH_WORKERS = 4
+
+# Longest output line read from a job (model stats, breakdowns)
+LINE_LIMIT = 1 << 20
+
+
+@dataclass
+class Job:
+    id: str
+    prefix: str
+    results_dir: Path
+    time_limit: float = None
+    publish: bool = False
+    status: str = "queued"
+    created: float = field(default_factory=time.time)
+    started: float = None
+    finished: float = None
+    return_code: int = None
+    error: str = None
+    stop_requested: bool = False
+    last_solution: dict = None
+    result: dict = None # The solver's "finished" event
+    events: list = field(default_factory=list)
+    subscribers: set = field(default_factory=set)
+    process: object = None
+
+    def has_result(self):
+        return any(self.results_dir.glob(f"{self.prefix}_assignments.*"))
+
+    def summary(self):
+        return {
+            "job_id": self.id,
+            "prefix": self.prefix,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "time_limit": self.time_limit,
+            "publish": self.publish,
+            "return_code": self.return_code,
+            "error": self.error,
+            "results_dir": str(self.results_dir),
+            "has_result": self.status in FINAL_STATES and self.has_result(),
+            "last_solution": self.last_solution,
+            "result": self.result
+        }
+
+
+class JobManager:
+    """
+    Queues, runs and cancels solve jobs on the running event loop.
+
+    solver_cmd: command line of step 04 without arguments (the job's prefix and flags are appended).
+    prepare: optional coroutine function(job) run before the solve (api.py brings the groups up
+    to date); it may publish events, and an exception fails the job.
+    """
+    def __init__(self, solver_cmd, results_root, publish_dir=None, max_jobs=None, cwd=None, prepare=None):
+        cores = os.cpu_count() or 1
+        self.solver_cmd = [str(c) for c in solver_cmd]
+        self.results_root = Path(results_root)
+        self.publish_dir = Path(publish_dir) if publish_dir else None
+        self.max_jobs = max_jobs or max(1, cores // DEFAULT_SEARCH_WORKERS)
+        self.search_workers = max(1, cores // self.max_jobs)
+        self.cwd = cwd
+        self.prepare = prepare
+        self.jobs = {}
+        self._slots = asyncio.Semaphore(self.max_jobs)
+        self._tasks = set()
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def list(self):
+        return [job.summary() for job in self.jobs.values()]
+
+    def submit(self, prefix, time_limit=None, publish=False):
+        """Queues a solve of prefix and returns the Job (call from the event loop)."""
+        job_id = uuid.uuid4().hex[:12]
+        job = Job(job_id, prefix, self.results_root / job_id, time_limit=time_limit, publish=publish)
+        self.jobs[job_id] = job
+        self._set_status(job, "queued")
+        task = asyncio.get_running_loop().create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def cancel(self, job_id):
+        """Cancels a queued job, or stops a running solve keeping its best solution. Returns the Job or None."""
+        job = self.jobs.get(job_id)
+        if job is None or job.status in FINAL_STATES:
+            return job
+        job.stop_requested = True
+        if job.status == "queued":
+            self._finish(job, "cancelled")
+        elif job.status == "running":
+            self._set_status(job, "cancelling")
+            self._send_stop(job)
+        return job
+
+    async def shutdown(self):
+        """Stops every job (running solves still write their best solution) and waits for them."""
+        for job_id in list(self.jobs):
+            self.cancel(job_id)
+        await self.join()
+
+    async def join(self):
+        """Waits until every submitted job has ended."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def publish(self, job, event):
+        """Records an event of job and passes it to its subscribers."""
+        if event.get("event") == "solution":
+            job.last_solution = event
+        elif event.get("event") == "finished":
+            job.result = event
+        job.events.append(event)
+        for queue in job.subscribers:
+            queue.put_nowait(event)
+
+    async def subscribe(self, job_id):
+        """The job's events so far, then live ones, up to its final "job" event."""
+        job = self.jobs[job_id]
+        queue = asyncio.Queue()
+        # Replay and registration happen without yielding to the loop, so nothing is lost in between
+        for event in job.events:
+            queue.put_nowait(event)
+        job.subscribers.add(queue)
+        try:
+            while True:
+                event = await queue.get()
+                yield event
+                if event.get("event") == "job" and event["status"] in FINAL_STATES:
+                    return
+        finally:
+            job.subscribers.discard(queue)
+
+    def _set_status(self, job, status):
+        job.status = status
+        self.publish(job, {"event": "job", **job.summary()})
+
+    def _finish(self, job, status, error=None):
+        job.finished = time.time()
+        job.error = error
+        self._set_status(job, status)
+
+    def _send_stop(self, job):
+        process = job.process
+        if process is None or process.returncode is not None:
+            return # Not started yet: the stop is sent once it is
+        try:
+            process.stdin.write(b"stop\n")
+        except (OSError, RuntimeError):
+            pass
+
+    def _command(self, job, events_fd):
+        cmd = self.solver_cmd + [
+            job.prefix,
+            "--results-dir", str(job.results_dir),
+            "--events-fd", str(events_fd),
+            "--search-workers", str(self.search_workers),
+            "--stop-on-stdin"
+        ]
+        if job.time_limit is not None:
+            cmd += ["--time-limit", str(job.time_limit)]
+        return cmd
+
+    async def _run(self, job):
+        async with self._slots:
+            if job.status in FINAL_STATES:
+                return # Cancelled while queued
+            job.started = time.time()
+            self._set_status(job, "running")
+            try:
+                if self.prepare is not None:
+                    await self.prepare(job)
+                if job.stop_requested:
+                    self._finish(job, "cancelled")
+                    return
+                job.return_code = await self._solve(job)
+            except Exception as e:
+                self._finish(job, "failed", error=str(e))
+                return
+
+            if job.return_code != 0:
+                self._finish(job, "failed", error=f"Solver exited with code {job.return_code}")
+                return
+            if job.publish and self.publish_dir and job.has_result():
+                try:
+                    self._publish_results(job)
+                except OSError as e:
+                    self._finish(job, "failed", error=f"Publishing results failed: {e}")
+                    return
+            self._finish(job, "cancelled" if job.stop_requested else "completed")
+
+    async def _solve(self, job):
+        job.results_dir.mkdir(parents=True, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        read_fd, write_fd = os.pipe()
+        try:
+            job.process = await asyncio.create_subprocess_exec(
+                *self._command(job, write_fd),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                pass_fds=(write_fd,),
+                limit=LINE_LIMIT,
+                cwd=self.cwd,
+                env={**os.environ, "PYTHONUNBUFFERED": "1"}
+            )
+        except BaseException:
+            os.close(read_fd)
+            raise
+        finally:
+            os.close(write_fd)
+        if job.stop_requested:
+            self._send_stop(job)
+
+        events = asyncio.StreamReader(limit=LINE_LIMIT)
+        transport, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(events), os.fdopen(read_fd, 'rb'))
+        try:
+            await asyncio.gather(
+                self._pump(job, job.process.stdout, parse=False),
+                self._pump(job, events, parse=True)
+            )
+            return await job.process.wait()
+        finally:
+            transport.close()
+            if job.process.returncode is None:
+                job.process.kill()
+
+    async def _pump(self, job, stream, parse):
+        async for raw in stream:
+            line = raw.decode('utf-8', errors='replace').rstrip("\r\n")
+            if parse:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(event, dict):
+                    self.publish(job, event)
+            else:
+                self.publish(job, {"event": "log", "line": line})
+
+    def _publish_results(self, job):
+        self.publish_dir.mkdir(parents=True, exist_ok=True)
+        for path in job.results_dir.iterdir():
+            if not path.is_file():
+                continue
+            # Atomic per file: copy to tmp, then rename
+            target = self.publish_dir / path.name
+            tmp_path = target.with_name(target.name + ".tmp")
+            shutil.copy2(path, tmp_path)
+            tmp_path.replace(target)
+        self.publish(job, {"event": "log", "line": f"Results published to {self.publish_dir}"})
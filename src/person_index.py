@@ -0,0 +1,78 @@
+import numpy as np
+
+
+class PersonIndex:
+    """
+    Registry of person names -> bit positions, shared by steps 02/03.
+
+    Candidate sets are Python ints (bit i set = person i). Intersections are bitwise ANDs,
+    and because positions follow the sorted name order, decode() returns names already
+    sorted -- the same order the JSON files have always used.
+
+    Missing names (NaN cells in the sheets) are not registered.
+    """
+    def __init__(self, names):
+        self.names = sorted({n for n in names if n == n}) # n == n drops NaN
+        self.positions = {name: i for i, name in enumerate(self.names)}
+        self._names_array = np.array(self.names, dtype=object)
+        self._num_bytes = max(1, (len(self.names) + 7) // 8)
+        self._role_masks = {}
+
+    @classmethod
+    def from_sources(cls, team_members=(), *name_lists):
+        """Registry covering the team plus every name that appears in name_lists."""
+        names = {m['name'] for m in team_members}
+        for name_list in name_lists:
+            names.update(name_list)
+        return cls(names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.positions
+
+    def encode(self, names, ignore_unknown=False):
+        """Names -> bitmask. Unknown names raise KeyError unless ignore_unknown is set."""
+        mask = 0
+        positions = self.positions
+        for name in names:
+            pos = positions.get(name)
+            if pos is None:
+                if ignore_unknown or name != name:
+                    continue
+                raise KeyError(f"Unknown person: {name}")
+            mask |= 1 << pos
+        return mask
+
+    def decode(self, mask):
+        """Bitmask -> sorted list of names."""
+        if not mask:
+            return []
+        bits = np.unpackbits(
+            np.frombuffer(mask.to_bytes(self._num_bytes, 'little'), dtype=np.uint8),
+            bitorder='little'
+        )
+        return self._names_array[np.flatnonzero(bits)].tolist()
+
+    @staticmethod
+    def count(mask):
+        return bin(mask).count("1")
+
+    def role_mask(self, role, member_map):
+        """
+        Team members eligible for a group role ('leader', 'follower' or 'any').
+        Only registered team members are included (unknown names never pass role filtering).
+        """
+        if role not in self._role_masks:
+            mask = 0
+            for name, mem in member_map.items():
+                pos = self.positions.get(name)
+                if pos is None:
+                    continue
+                if role == 'any' \
+                        or (role == 'leader' and (mem['role'] == 'leader' or mem['both'])) \
+                        or (role == 'follower' and (mem['role'] == 'follower' or mem['both'])):
+                    mask |= 1 << pos
+            self._role_masks[role] = mask
+        return self._role_masks[role]
@@ -0,0 +1,418 @@
+"""
+Incremental pipeline runner for steps 01-05.
+
+The steps form a DAG of nodes, each with declared inputs and outputs under data/.
+A node runs only if an input's content hash changed since its last successful run,
+an output is missing or was modified, or it is always run (download, solve).
+Independent nodes (task/calendar availability, several months) run concurrently.
+
+Usage (from the project root):
+    python src/pipeline.py solve january_2026          # Everything the solve needs, then the solve
+    python src/pipeline.py aggregate january_2026 february_2026 --jobs 4
+    python src/pipeline.py export --dry-run            # Prefix from penalty_config.json
+    python src/pipeline.py convert "January 2026" --download --workbook book.xlsx
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Add project root to sys.path to allow running as script
+root_dir = str(Path(__file__).resolve().parent.parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from src.interchange import data_format, find_data
+
+SRC_DIR = Path(__file__).resolve().parent
+DATA_DIR = Path("data")
+STATE_DIR = DATA_DIR / "cache" / "pipeline"
+
+# Target -> last node kind it brings up to date
+TARGETS = ["convert", "aggregate", "solve", "export"]
+
+
+@dataclass
+class Node:
+    """
+    One unit of work. Paths are relative to the working directory; .json paths may exist in
+    any interchange format. config_keys: penalty_config.json keys the node depends on.
+    lock: nodes sharing a lock never run at the same time (shared files, the solver's cores).
+    """
+    name: str
+    run: object
+    inputs: list = field(default_factory=list)
+    outputs: list = field(default_factory=list)
+    deps: list = field(default_factory=list)
+    code: list = field(default_factory=list)
+    config_keys: list = field(default_factory=list)
+    always: bool = False
+    lock: str = None
+
+
+def load_config():
+    path = DATA_DIR / "penalty_config.json"
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def default_prefix(config):
+    # Same fallback as the step scripts
+    scope = config.get("scope", {})
+    if "month" in scope and "year" in scope:
+        return f"{scope['month'].lower()}_{scope['year']}"
+    return scope.get("prefix", "january_2026")
+
+
+def resolve(path):
+    """The file that holds a declared path: for .json, the newest interchange format written."""
+    path = Path(path)
+    if path.suffix == ".json":
+        located = find_data(path)
+        return located[0] if located else None
+    return path if path.exists() else None
+
+
+class HashMemo:
+    """SHA-256 of files, reusing a recorded hash while size and mtime are unchanged."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.known = {}
+
+    def remember(self, records):
+        with self.lock:
+            for record in records.values():
+                if record:
+                    self.known[record["file"]] = record
+
+    def record(self, path):
+        """{"file", "sha256", "size", "mtime_ns"} for a declared path, or None if it does not exist."""
+        actual = resolve(path)
+        if actual is None:
+            return None
+        stat = actual.stat()
+        with self.lock:
+            known = self.known.get(str(actual))
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return known
+        h = hashlib.sha256()
+        with open(actual, 'rb') as f:
+            while chunk := f.read(1024 * 1024):
+                h.update(chunk)
+        record = {"file": str(actual), "sha256": h.hexdigest(), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        with self.lock:
+            self.known[str(actual)] = record
+        return record
+
+
+def build_nodes(prefixes, download_month=None, workbook_path=None, refresh=False):
+    """{name: Node} for the given month prefixes (e.g. "january_2026")."""
+    # Step modules are imported when a node runs, so an up-to-date check does not load pandas/OR-Tools
+    raw_dir = DATA_DIR / "raw"
+    processed_dir = DATA_DIR / "processed"
+    results_dir = DATA_DIR / "results"
+    fmt_key = ["interchange_format"]
+    shared = ["interchange.py"]
+
+    def fmt():
+        processed_dir.mkdir(parents=True, exist_ok=True)
+        return data_format(load_config())
+
+    nodes = {}
+    download_deps = []
+    if download_month:
+        def run_download():
+            from src.step_01_download_data import download_data
+            if not download_data(download_month, workbook_path=workbook_path, refresh=refresh, chain=False):
+                raise RuntimeError("Download failed")
+        prefix = download_month.lower().replace(" ", "_")
+        nodes["download"] = Node(
+            "download", run_download,
+            outputs=[raw_dir / "task_availability.csv", raw_dir / "calendar_availability.csv", raw_dir / f"{prefix}.csv"],
+            always=True
+        )
+        download_deps = ["download"]
+
+    def run_tasks():
+        from src.step_02_convert_data import convert_task_availability
+        convert_task_availability(raw_dir, processed_dir, fmt())
+
+    def run_calendar():
+        from src.step_02_convert_data import convert_calendar_availability
+        convert_calendar_availability(raw_dir, processed_dir, fmt())
+
+    nodes["tasks"] = Node(
+        "tasks", run_tasks,
+        inputs=[raw_dir / "task_availability.csv"],
+        outputs=[processed_dir / "tasks.json"],
+        deps=download_deps, code=["step_02_convert_data.py"] + shared, config_keys=fmt_key
+    )
+    nodes["calendar"] = Node(
+        "calendar", run_calendar,
+        inputs=[raw_dir / "calendar_availability.csv"],
+        outputs=[processed_dir / "calendar.json"],
+        deps=download_deps, code=["step_02_convert_data.py", "time_slots.py"] + shared, config_keys=fmt_key
+    )
+
+    for prefix in prefixes:
+        def run_schedule(prefix=prefix):
+            from src.step_02_convert_data import convert_schedule
+            if not convert_schedule(prefix, raw_dir, processed_dir, fmt()):
+                raise RuntimeError(f"No schedule for {prefix}")
+
+        def run_groups(prefix=prefix):
+            from src.step_03_aggregate_groups import aggregate_groups
+            aggregate_groups(prefix)
+
+        def run_solve(prefix=prefix):
+            from src.step_04_run_solver import run_solver
+            run_solver(prefix)
+
+        def run_export(prefix=prefix):
+            from src.step_05_export_csv import export_csv_for_month
+            export_csv_for_month(prefix)
+
+        nodes[f"schedule:{prefix}"] = Node(
+            f"schedule:{prefix}", run_schedule,
+            inputs=[raw_dir / f"{prefix}.csv", processed_dir / "tasks.json", processed_dir / "calendar.json"],
+            outputs=[processed_dir / f"{prefix}_tasks.json", processed_dir / f"{prefix}_task_rows.json"],
+            deps=["tasks", "calendar"], code=["step_02_convert_data.py", "time_slots.py", "person_index.py"] + shared,
+            config_keys=fmt_key
+        )
+        nodes[f"groups:{prefix}"] = Node(
+            f"groups:{prefix}", run_groups,
+            inputs=[processed_dir / f"{prefix}_tasks.json", DATA_DIR / "task_families.json", DATA_DIR / "team_members.json"],
+            outputs=[processed_dir / f"{prefix}_groups.json"],
+            deps=[f"schedule:{prefix}"],
+            code=["step_03_aggregate_groups.py", "records.py", "time_slots.py", "person_index.py"] + shared,
+            config_keys=fmt_key,
+            lock="task_families" # Step 03 may rewrite task_families.json
+        )
+        # Always runs: a solve is what the user asked for, and step 04's own cache returns proven optima (of the same MODEL_VERSION)
+        nodes[f"solve:{prefix}"] = Node(
+            f"solve:{prefix}", run_solve,
+            inputs=[processed_dir / f"{prefix}_groups.json", DATA_DIR / "team_members.json"],
+            outputs=[results_dir / f"{prefix}_assignments.json"],
+            deps=[f"groups:{prefix}"], always=True, lock="solver"
+        )
+        nodes[f"export:{prefix}"] = Node(
+            f"export:{prefix}", run_export,
+            inputs=[raw_dir / f"{prefix}.csv", processed_dir / f"{prefix}_groups.json",
+                    processed_dir / f"{prefix}_task_rows.json", results_dir / f"{prefix}_assignments.json"],
+            outputs=[results_dir / f"{prefix}_filled.csv"],
+            deps=[f"groups:{prefix}"], code=["step_05_export_csv.py", "step_02_convert_data.py", "records.py"] + shared
+        )
+    return nodes
+
+
+def target_nodes(target, prefixes):
+    kind = {"convert": "schedule", "aggregate": "groups", "solve": "solve", "export": "export"}[target]
+    return [f"{kind}:{prefix}" for prefix in prefixes]
+
+
+def required(nodes, targets):
+    """Targets and everything they depend on."""
+    needed = set()
+    stack = list(targets)
+    while stack:
+        name = stack.pop()
+        if name not in needed:
+            needed.add(name)
+            stack.extend(nodes[name].deps)
+    return needed
+
+
+class Pipeline:
+    """Runs nodes whose recorded state (data/cache/pipeline/{node}.json) no longer matches the files."""
+    def __init__(self, nodes, state_dir=STATE_DIR, force=False, jobs=None, hashes=None):
+        self.nodes = nodes
+        self.state_dir = Path(state_dir)
+        self.force = force
+        self.jobs = jobs or min(4, os.cpu_count() or 1)
+        # Shared across runs by the resident worker (src/worker.py)
+        self.hashes = hashes or HashMemo()
+        self.print_lock = threading.Lock()
+
+    def log(self, message):
+        with self.print_lock:
+            print(f"[pipeline] {message}", flush=True)
+
+    def _state_path(self, name):
+        return self.state_dir / f"{name.replace(':', '_')}.json"
+
+    def load_state(self, name):
+        try:
+            with open(self._state_path(name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save_state(self, name, state):
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        path = self._state_path(name)
+        tmp_path = path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=4, ensure_ascii=False)
+        tmp_path.replace(path)
+
+    def fingerprint(self, node):
+        """Current inputs of a node: file hashes (None for missing files), code hashes and config values."""
+        config = load_config()
+        return {
+            "inputs": {str(p): self.hashes.record(p) for p in node.inputs},
+            "code": {name: self.hashes.record(SRC_DIR / name) for name in node.code},
+            "config": {key: config.get(key) for key in node.config_keys}
+        }
+
+    @staticmethod
+    def _digests(records):
+        return {k: (r["sha256"] if r else None) for k, r in records.items()}
+
+    def reason(self, node, fingerprint):
+        """Why a node has to run, or None if it is up to date."""
+        if node.always:
+            return "always runs"
+        if self.force:
+            return "forced"
+        state = self.load_state(node.name)
+        if state is None:
+            return "no previous run"
+        for key in ("inputs", "code", "outputs"):
+            self.hashes.remember(state[key])
+        for key in ("inputs", "code"):
+            previous, current = self._digests(state[key]), self._digests(fingerprint[key])
+            changed = [k for k in current if previous.get(k) != current[k]]
+            if changed:
+                return f"changed: {', '.join(Path(k).name for k in changed)}"
+        if state["config"] != fingerprint["config"]:
+            return "config changed"
+        for path in node.outputs:
+            record = self.hashes.record(path)
+            previous = state["outputs"].get(str(path))
+            if record is None:
+                return f"missing: {Path(path).name}"
+            if not previous or previous["sha256"] != record["sha256"]:
+                return f"modified: {Path(path).name}"
+        return None
+
+    def run_node(self, node, dry_run=False, upstream_pending=False):
+        """
+        Returns "ran", "skipped" or "would run". Raises on failure.
+        upstream_pending (dry runs): a dependency would run, so this node would too.
+        """
+        fingerprint = self.fingerprint(node)
+        why = "a dependency would run" if upstream_pending else self.reason(node, fingerprint)
+        if why is None:
+            self.log(f"{node.name}: up to date")
+            return "skipped"
+        if dry_run:
+            self.log(f"{node.name}: would run ({why})")
+            return "would run"
+
+        missing = [str(p) for p, r in fingerprint["inputs"].items() if r is None]
+        if missing:
+            # Sources that are not there (e.g. no data/raw in a dev tree) with outputs that are: use those
+            if all(self.hashes.record(p) for p in node.outputs):
+                self.log(f"{node.name}: inputs missing ({', '.join(missing)}), keeping existing outputs")
+                return "skipped"
+            raise RuntimeError(f"{node.name}: missing inputs {', '.join(missing)}")
+
+        self.log(f"{node.name}: running ({why})")
+        started = time.perf_counter()
+        node.run()
+        outputs = {str(p): self.hashes.record(p) for p in node.outputs}
+        missing = [p for p, r in outputs.items() if r is None]
+        if missing:
+            raise RuntimeError(f"{node.name}: did not write {', '.join(missing)}")
+
+        # Recorded after the run: a node may rewrite one of its inputs (step 03 fixes task_families.json)
+        state = self.fingerprint(node)
+        state["outputs"] = outputs
+        self.save_state(node.name, state)
+        self.log(f"{node.name}: done in {time.perf_counter() - started:.2f}s")
+        return "ran"
+
+    def run(self, targets, dry_run=False):
+        """
+        Brings targets up to date, running ready nodes concurrently (up to jobs).
+        Returns {node name: "ran" | "skipped" | "would run" | "failed" | "blocked"}.
+        """
+        needed = required(self.nodes, targets)
+        results = {}
+        running = {}
+        locks_held = set()
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while len(results) < len(needed):
+                for name in sorted(needed - set(results) - set(running.values())):
+                    node = self.nodes[name]
+                    dep_results = [results.get(d) for d in node.deps]
+                    if any(r in ("failed", "blocked") for r in dep_results):
+                        results[name] = "blocked"
+                        self.log(f"{name}: blocked by a failed dependency")
+                        continue
+                    if None in dep_results or (node.lock and node.lock in locks_held):
+                        continue
+                    if node.lock:
+                        locks_held.add(node.lock)
+                    upstream_pending = "would run" in dep_results
+                    running[pool.submit(self.run_node, node, dry_run, upstream_pending)] = name
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    if self.nodes[name].lock:
+                        locks_held.discard(self.nodes[name].lock)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        results[name] = "failed"
+                        self.log(f"{name}: failed: {e}")
+        return results
+
+
+def main(argv=None, hashes=None):
+    parser = argparse.ArgumentParser(description="Run pipeline steps whose inputs changed.")
+    parser.add_argument("target", choices=TARGETS, help="Last step to bring up to date.")
+    parser.add_argument("prefixes", nargs="*", help="Month prefixes (january_2026 or \"January 2026\"); default from penalty_config.json.")
+    parser.add_argument("--force", action="store_true", help="Run every node, changed or not.")
+    parser.add_argument("--dry-run", action="store_true", help="Only print what would run.")
+    parser.add_argument("--jobs", type=int, default=None, help="Nodes run at the same time (default: up to 4).")
+    parser.add_argument("--download", action="store_true", help="Download the workbook first (step 01, first month).")
+    parser.add_argument("--workbook", default=None, help="With --download: local .xlsx instead of the download.")
+    parser.add_argument("--refresh", action="store_true", help="With --download: ignore a recent cached download.")
+    parser.add_argument("--events-fd", type=int, default=None, help="Write solver progress events (JSON lines) to this file descriptor.")
+    args = parser.parse_args(argv)
+    if args.events_fd is not None:
+        from src import progress
+        progress.set_sink(progress.fd_sink(args.events_fd))
+
+    prefixes = [p.lower().replace(" ", "_") for p in args.prefixes] or [default_prefix(load_config())]
+    download_month = None
+    if args.download:
+        # Step 01 takes the sheet name: "january_2026" -> "January 2026"
+        download_month = prefixes[0].replace("_", " ").title()
+
+    nodes = build_nodes(prefixes, download_month, args.workbook, args.refresh)
+    targets = target_nodes(args.target, prefixes) + (["download"] if download_month else [])
+    results = Pipeline(nodes, force=args.force, jobs=args.jobs, hashes=hashes).run(targets, dry_run=args.dry_run)
+
+    counts = {}
+    for status in results.values():
+        counts[status] = counts.get(status, 0) + 1
+    print(f"[pipeline] {', '.join(f'{n} {s}' for s, n in sorted(counts.items()))}")
+    return 1 if any(s in ("failed", "blocked") for s in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
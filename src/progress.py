@@ -0,0 +1,47 @@
+"""
+Machine-readable progress of a solve, as typed events (one JSON object per line).
+
+Events, each a dict with an "event" field:
+- model_built:    groups, variables, constraints, objective_terms, seconds
+- stage:          name, seconds (model build sections add variables/constraints/objective_terms)
+- solution:       solution, time, objective, penalties, breakdown (rule -> cost)
+- bound:          time, bound
+- result_written: paths, final (false for the live saves during the search)
+- finished:       status, objective, best_bound, wall_time, cached
+
+Nothing is built or emitted until a sink is set. The resident worker (src/worker.py)
+forwards the events on its event stream; `--events-fd N` (pipeline.py, step 04) writes
+them to an inherited file descriptor, away from the human-readable output on stdout.
+"""
+import json
+import os
+import threading
+
+_sink = None
+
+
+def set_sink(sink):
+    """Sets the callable that receives every event (None: off). Returns the previous one."""
+    global _sink
+    previous, _sink = _sink, sink
+    return previous
+
+
+def enabled():
+    return _sink is not None
+
+
+def emit(event, **fields):
+    if _sink is not None:
+        _sink({"event": event, **fields})
+
+
+def fd_sink(fd):
+    """Sink writing JSON lines to file descriptor fd (may be called from solver threads)."""
+    stream = os.fdopen(fd, "w", encoding="utf-8", buffering=1)
+    lock = threading.Lock()
+
+    def write(event):
+        with lock:
+            stream.write(json.dumps(event, ensure_ascii=False) + "\n")
+    return write
@@ -0,0 +1,200 @@
+from dataclasses import dataclass, field, fields
+
+
+def _require(data, key, kind, owner):
+    value = data.get(key)
+    if not isinstance(value, kind):
+        raise ValueError(f"{owner}: '{key}' must be {kind.__name__}, got {value!r}")
+    return value
+
+
+def _list(data, key, owner):
+    value = data.get(key)
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise ValueError(f"{owner}: '{key}' must be a list, got {value!r}")
+    return value
+
+
+def _number(data, key, owner, default=0):
+    value = data.get(key, default)
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{owner}: '{key}' must be a number, got {value!r}")
+    return value
+
+
+def _to_dict(record):
+    return {f.name: getattr(record, f.name) for f in fields(record) if f.init}
+
+
+@dataclass(slots=True)
+class Task:
+    """One schedule row ({prefix}_tasks.json, written by step 02)."""
+    id: str
+    name: str
+    week: int = None
+    day: str = None
+    repeat_index: int = 1
+    time_slot: str = None
+    assignee: str = None
+    candidates: list = field(default_factory=list)
+    effort: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data):
+        owner = f"Task {data.get('id')!r}"
+        return cls(
+            id=_require(data, 'id', str, owner),
+            name=_require(data, 'name', str, owner),
+            week=data.get('week'),
+            day=data.get('day'),
+            repeat_index=_number(data, 'repeat_index', owner, 1),
+            time_slot=data.get('time_slot'),
+            assignee=data.get('assignee'),
+            candidates=_list(data, 'candidates', owner),
+            effort=_number(data, 'effort', owner, 0.0)
+        )
+
+    to_dict = _to_dict
+
+
+@dataclass(slots=True)
+class Group:
+    """
+    One assignable group ({prefix}_groups.json, written by step 03).
+
+    Derived fields (computed once on decode, not part of the file):
+    - candidates:          filtered_candidates_list, or candidates_list when that is empty.
+    - priority_candidates: filtered_priority_candidates_list, or priority_candidates_list.
+    - solver_candidates:   who the solver creates variables for -- the assignee alone, else the
+                           filtered priority list, else the filtered candidates (each deduplicated).
+    """
+    id: str
+    name: str
+    week: int = None
+    day: str = None
+    family: str = None
+    role: str = None
+    repeat_index: int = 1
+    effort: float = 0
+    task_count: int = 1
+    note: str = None
+    assignee: str = None
+    tasks: list = field(default_factory=list)
+    candidates_list: list = field(default_factory=list)
+    filtered_candidates_list: list = field(default_factory=list)
+    priority_candidates_list: list = field(default_factory=list)
+    filtered_priority_candidates_list: list = field(default_factory=list)
+    exclusive_groups: list = field(default_factory=list)
+    overlap_cliques: list = field(default_factory=list)
+    cooldown_refs: list = field(default_factory=list)
+    intra_cooldown_refs: list = field(default_factory=list)
+    cooldown_groups: list = field(default_factory=list) # Older files: explicit member lists
+    intra_cooldown_groups: list = field(default_factory=list)
+    candidates: list = field(init=False)
+    priority_candidates: list = field(init=False)
+    solver_candidates: list = field(init=False)
+
+    def __post_init__(self):
+        self.candidates = self.filtered_candidates_list or self.candidates_list
+        self.priority_candidates = self.filtered_priority_candidates_list or self.priority_candidates_list
+        if self.assignee:
+            self.solver_candidates = [self.assignee]
+        elif self.filtered_priority_candidates_list:
+            self.solver_candidates = list(set(self.filtered_priority_candidates_list))
+        else:
+            self.solver_candidates = list(set(self.filtered_candidates_list))
+
+    @classmethod
+    def from_dict(cls, data):
+        owner = f"Group {data.get('id')!r}"
+        return cls(
+            id=_require(data, 'id', str, owner),
+            name=_require(data, 'name', str, owner),
+            week=data.get('week'),
+            day=data.get('day'),
+            family=data.get('family'),
+            role=data.get('role'),
+            repeat_index=_number(data, 'repeat_index', owner, 1),
+            effort=_number(data, 'effort', owner, 0),
+            task_count=_number(data, 'task_count', owner, 1),
+            note=data.get('note'),
+            assignee=data.get('assignee'),
+            tasks=_list(data, 'tasks', owner),
+            candidates_list=_list(data, 'candidates_list', owner),
+            filtered_candidates_list=_list(data, 'filtered_candidates_list', owner),
+            priority_candidates_list=_list(data, 'priority_candidates_list', owner),
+            filtered_priority_candidates_list=_list(data, 'filtered_priority_candidates_list', owner),
+            exclusive_groups=_list(data, 'exclusive_groups', owner),
+            overlap_cliques=_list(data, 'overlap_cliques', owner),
+            cooldown_refs=_list(data, 'cooldown_refs', owner),
+            intra_cooldown_refs=_list(data, 'intra_cooldown_refs', owner),
+            cooldown_groups=_list(data, 'cooldown_groups', owner),
+            intra_cooldown_groups=_list(data, 'intra_cooldown_groups', owner)
+        )
+
+    @classmethod
+    def of(cls, group):
+        """A Group as-is, or a group dict decoded."""
+        return group if isinstance(group, cls) else cls.from_dict(group)
+
+    to_dict = _to_dict
+
+
+@dataclass(slots=True)
+class TeamMember:
+    """One entry of team_members.json."""
+    name: str
+    role: str = None
+    both: bool = False
+
+    @classmethod
+    def from_dict(cls, data):
+        owner = f"Team member {data.get('name')!r}"
+        return cls(
+            name=_require(data, 'name', str, owner),
+            role=data.get('role'),
+            both=bool(data.get('both', False))
+        )
+
+    to_dict = _to_dict
+
+
+@dataclass(slots=True)
+class Assignment:
+    """One solver result ({prefix}_assignments.json: group ID -> assignment)."""
+    group_name: str = None
+    assignee: str = None
+    method: str = "automatic"
+
+    @classmethod
+    def from_dict(cls, data):
+        # Older files map the group ID straight to the assignee's name
+        if data is None or isinstance(data, str):
+            return cls(assignee=data)
+        return cls(
+            group_name=data.get('group_name'),
+            assignee=data.get('assignee'),
+            method=data.get('method', 'automatic')
+        )
+
+    to_dict = _to_dict
+
+
+def decode_tasks(data):
+    return [Task.from_dict(t) for t in data]
+
+
+def decode_groups(data):
+    return [Group.from_dict(g) for g in data]
+
+
+def decode_team(data):
+    return [TeamMember.from_dict(m) for m in data]
+
+
+def decode_assignments(data):
+    return {g_id: Assignment.from_dict(a) for g_id, a in data.items()}
@@ -0,0 +1,216 @@
+"""
+What-if batch solving: one month's instance solved under several config variants at once.
+
+Variants are penalty_config.json overrides (ladder order, disabled_rules, effort_threshold,
+penalty_ratio, ...). The baseline (the current config) is always the first scenario. The
+instance is loaded once and handed to each pool process once; the variants then solve in
+parallel, the cores split between them. The comparison, written to
+data/results/scenarios/{prefix}_scenarios.json and printed as a table, has per scenario:
+- violations and cost per rule (costs use each scenario's own ladder weights; compare violations),
+- the groups whose assignee differs from the baseline.
+
+Usage (from the project root):
+    python src/scenarios.py january_2026 --effort-threshold 6 8 10 --penalty-ratio 5 10
+    python src/scenarios.py --swap-adjacent --time-limit 30
+    python src/scenarios.py --disable "Preferred Pair" --disable "Effort Equalization"
+    python src/scenarios.py --variants my_variants.json   # [{"name": ..., "ladder": [...], ...}]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to sys.path to allow running as script
+root_dir = str(Path(__file__).resolve().parent.parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from src.interchange import load_data, save_data
+from src.pipeline import default_prefix, load_config
+from src.records import decode_assignments
+
+DATA_DIR = Path("data")
+
+# Config keys a variant may override
+VARIANT_KEYS = ["ladder", "disabled_rules", "effort_threshold", "penalty_ratio", "preferred_pairs", "time_limit_seconds"]
+
+# Per-scenario time limit when penalty_config.json has none (0 = no limit is no option for a batch)
+DEFAULT_TIME_LIMIT = 60.0
+
+
+def build_variants(config, variants=None, effort_thresholds=(), penalty_ratios=(), disable=(), swap_adjacent=False):
+    """
+    [(name, overrides)] for the requested variants, baseline first.
+    effort_thresholds x penalty_ratios form a grid; disable and swap_adjacent add one variant per rule / swap.
+    """
+    result = [("baseline", {})]
+    for variant in variants or []:
+        unknown = set(variant) - set(VARIANT_KEYS) - {"name"}
+        if unknown:
+            raise ValueError(f"Unknown variant keys: {', '.join(sorted(unknown))}")
+        overrides = {k: v for k, v in variant.items() if k != "name"}
+        result.append((variant.get("name") or f"variant {len(result)}", overrides))
+
+    for threshold in effort_thresholds or [None]:
+        for ratio in penalty_ratios or [None]:
+            overrides = {}
+            if threshold is not None:
+                overrides["effort_threshold"] = threshold
+            if ratio is not None:
+                overrides["penalty_ratio"] = ratio
+            if overrides:
+                result.append((", ".join(f"{k}={v:g}" for k, v in overrides.items()), overrides))
+
+    disabled = list(config.get("disabled_rules", []))
+    for rule in disable:
+        result.append((f"without {rule}", {"disabled_rules": disabled + [rule]}))
+
+    if swap_adjacent:
+        ladder = [r for r in config.get("ladder", []) if r not in disabled]
+        for i in range(len(ladder) - 1):
+            swapped = list(ladder)
+            swapped[i], swapped[i + 1] = swapped[i + 1], swapped[i]
+            result.append((f"swap {i + 1}<->{i + 2}", {"ladder": swapped}))
+    return result
+
+
+# --- Pool processes: the instance arrives once per process, then one solve per variant ---
+_instance = None
+
+
+def _init_worker(groups, team_members):
+    global _instance
+    _instance = (groups, team_members)
+
+
+def _solve_variant(name, config):
+    from src.solver.solver import SATSolver
+    groups, team_members = _instance
+    solver = SATSolver(groups, team_members, config, log=lambda line: None, events=lambda event: None)
+    assignments, penalties = solver.solve()
+    stats = solver.solve_stats or {}
+
+    violations, costs = {}, {}
+    for p in penalties:
+        violations[p["rule"]] = violations.get(p["rule"], 0) + 1
+        costs[p["rule"]] = costs.get(p["rule"], 0) + p["cost"]
+    return {
+        "name": name,
+        "status": stats.get("status"),
+        "objective": stats.get("objective"),
+        "best_bound": stats.get("best_bound"),
+        "wall_time": stats.get("stats", {}).get("wall_time"),
+        "violations": violations,
+        "costs": costs,
+        "assignments": {g_id: a.assignee for g_id, a in decode_assignments(assignments).items()}
+    }
+
+
+def run_scenarios(groups, team_members, config, variants, max_workers=None):
+    """Solves every (name, overrides) variant of config in a process pool. Returns the comparison dict."""
+    cores = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers or cores, len(variants)))
+    search_workers = max(1, cores // max_workers)
+
+    # Pool functions by their importable name: this file may run as __main__ (e.g. through the GUI's dispatcher)
+    from src import scenarios as module
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=module._init_worker, initargs=(groups, team_members)) as pool:
+        futures = [
+            pool.submit(module._solve_variant, name, {**config, **overrides, "num_search_workers": search_workers})
+            for name, overrides in variants
+        ]
+        scenarios = []
+        for (name, overrides), future in zip(variants, futures):
+            result = future.result()
+            result["overrides"] = overrides
+            scenarios.append(result)
+            print(f"[scenarios] {name}: {result['status']}, objective = {result['objective']}", flush=True)
+
+    baseline = scenarios[0]["assignments"]
+    for scenario in scenarios:
+        scenario["changed"] = {
+            g_id: [baseline.get(g_id), assignee]
+            for g_id, assignee in scenario["assignments"].items() if baseline.get(g_id) != assignee
+        }
+
+    # Rules in baseline ladder order, then any others that were violated
+    rules = list(config.get("ladder", []))
+    for scenario in scenarios:
+        rules += [r for r in scenario["violations"] if r not in rules]
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "wall_time": round(time.perf_counter() - started, 3),
+        "rules": rules,
+        "scenarios": scenarios
+    }
+
+
+def format_table(comparison):
+    """Violations per rule (rows) and scenario (columns), then objective and changed assignments."""
+    names = [s["name"] for s in comparison["scenarios"]]
+    rows = [["Rule"] + names]
+    for rule in comparison["rules"]:
+        rows.append([rule] + [str(s["violations"].get(rule, 0)) for s in comparison["scenarios"]])
+    rows.append(["Objective"] + [str(round(s["objective"])) if s["objective"] is not None else "-" for s in comparison["scenarios"]])
+    rows.append(["Status"] + [s["status"] or "-" for s in comparison["scenarios"]])
+    rows.append(["Changed assignments"] + [str(len(s["changed"])) for s in comparison["scenarios"]])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join("  ".join(cell.ljust(w) for cell, w in zip(row, widths)) for row in rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve one month under several config variants in parallel and compare.")
+    parser.add_argument("prefix", nargs="?", default=None, help="Month prefix (default from penalty_config.json).")
+    parser.add_argument("--variants", default=None, help="JSON file with a list of variants ({\"name\", \"ladder\", \"disabled_rules\", ...}).")
+    parser.add_argument("--effort-threshold", type=float, nargs="+", default=[], help="Effort thresholds to try.")
+    parser.add_argument("--penalty-ratio", type=float, nargs="+", default=[], help="Penalty ratios to try (grid with --effort-threshold).")
+    parser.add_argument("--disable", action="append", default=[], help="One variant with this rule disabled (repeatable).")
+    parser.add_argument("--swap-adjacent", action="store_true", help="One variant per swap of two adjacent ladder rules.")
+    parser.add_argument("--time-limit", type=float, default=None, help="Seconds per scenario (default time_limit_seconds, else 60).")
+    parser.add_argument("--jobs", type=int, default=None, help="Scenarios solved at the same time (default: one per core).")
+    parser.add_argument("--skip-update", action="store_true", help="Use the groups as they are (no pipeline run first).")
+    args = parser.parse_args(argv)
+
+    config = load_config()
+    prefix = args.prefix.lower().replace(" ", "_") if args.prefix else default_prefix(config)
+    config["time_limit_seconds"] = args.time_limit or config.get("time_limit_seconds") or DEFAULT_TIME_LIMIT
+
+    variants = None
+    if args.variants:
+        with open(args.variants, 'r', encoding='utf-8') as f:
+            variants = json.load(f)
+    variants = build_variants(config, variants, args.effort_threshold, args.penalty_ratio, args.disable, args.swap_adjacent)
+    if len(variants) == 1:
+        print("Only the baseline to solve; add variants (see --help).")
+
+    if not args.skip_update:
+        from src.pipeline import main as run_pipeline
+        if run_pipeline(["aggregate", prefix]) != 0:
+            print("Preparing the groups failed.")
+            return 1
+
+    groups = load_data(DATA_DIR / "processed" / f"{prefix}_groups.json")
+    with open(DATA_DIR / "team_members.json", 'r', encoding='utf-8') as f:
+        team_members = json.load(f)
+
+    print(f"Solving {len(variants)} scenarios of {prefix} ({config['time_limit_seconds']:g} s each)...", flush=True)
+    comparison = run_scenarios(groups, team_members, config, variants, args.jobs)
+    comparison["prefix"] = prefix
+
+    out_dir = DATA_DIR / "results" / "scenarios"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / f"{prefix}_scenarios.json"
+    save_data(comparison, out_path)
+    print(format_table(comparison))
+    print(f"Comparison saved to {out_path} ({comparison['wall_time']:.1f} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from ortools.sat import cp_model_pb2
+
+
+def canonical_hash(*parts):
+    """
+    Stable SHA-256 of JSON-serializable inputs.
+    Keys are sorted and whitespace is fixed so that re-saving a file with a
+    different indent (or key order) does not change the hash.
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        blob = json.dumps(part, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+        h.update(blob.encode('utf-8'))
+        h.update(b'\x00')  # Part separator
+    return h.hexdigest()
+
+
+class SolverCache:
+    """
+    Persistent cache of solved models, keyed by a hash of (groups, team, solver settings).
+
+    Each entry is stored as two files in cache_dir:
+    - {key}.pb:   Serialized CpModelProto of the built model.
+    - {key}.json: Status, objective, best bound, raw solution vector and the extracted results.
+
+    LRU eviction uses the modification time of the .json file (touched on every hit).
+    """
+    def __init__(self, cache_dir, max_entries=20):
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def make_key(self, groups, team_members, settings):
+        return canonical_hash(groups, team_members, settings)
+
+    def _meta_path(self, key):
+        return self.cache_dir / f"{key}.json"
+
+    def _model_path(self, key):
+        return self.cache_dir / f"{key}.pb"
+
+    def get(self, key):
+        """Returns the entry metadata dict or None. Marks the entry as recently used."""
+        meta_path = self._meta_path(key)
+        if not meta_path.exists():
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            # Corrupt entry (e.g. interrupted write): treat as a miss
+            return None
+
+        now = time.time()
+        os.utime(meta_path, (now, now))
+        return entry
+
+    def load_model(self, key):
+        model_path = self._model_path(key)
+        if not model_path.exists():
+            return None
+        proto = cp_model_pb2.CpModelProto()
+        with open(model_path, 'rb') as f:
+            proto.ParseFromString(f.read())
+        return proto
+
+    def put(self, key, model, status, objective, best_bound, solution, assignments, penalties):
+        entry = {
+            "status": status,
+            "objective": objective,
+            "best_bound": best_bound,
+            "solution": list(solution),
+            "assignments": assignments,
+            "penalties": penalties,
+            "created": time.time()
+        }
+
+        # Atomic writes: save to tmp, then rename
+        model_path = self._model_path(key)
+        tmp_model = model_path.with_suffix('.pb.tmp')
+        model.ExportToFile(str(tmp_model)) # Binary CpModelProto
+        tmp_model.replace(model_path)
+
+        meta_path = self._meta_path(key)
+        tmp_meta = meta_path.with_suffix('.json.tmp')
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        tmp_meta.replace(meta_path)
+
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries beyond max_entries."""
+        entries = sorted(self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for meta_path in entries[self.max_entries:]:
+            key = meta_path.stem
+            for path in (meta_path, self._model_path(key)):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
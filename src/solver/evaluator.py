@@ -0,0 +1,575 @@
+"""
+Objective evaluator: scores any assignment map without building a CP model.
+
+ObjectiveEvaluator(groups, team_members, config) precomputes the instance structure once
+(person x group candidate/exemption/forced matrices, group x day and group x family one-hots,
+cooldown pairs and streak chains); evaluate(assignments) then scores one schedule with a few
+matrix products. It reproduces SATSolver:
+- penalties: the same list, order, rule names and details strings as extract_solution
+  (which leaves out "Inefficient Day (< 2 Tasks)" and "Preferred Pair"),
+- costs:     cost per ladder rule, as in the live "Breakdown" (those two included; a rule the
+             instance gives no cost term, e.g. Preferred Pair without pairs, is left out),
+- total:     the objective value of the schedule. (The model only bounds each Inefficient Day
+             indicator from below, so a CP-SAT incumbent can report a higher objective until
+             the search drops the slack; here every day is counted exactly.)
+
+A hand-edited schedule may give a group to someone outside its solver candidates: the
+assignment is scored as if they were one, and reported in `violations` with the hard
+constraints it breaks (manual assignee overridden, exclusive groups, overlap cliques).
+
+    evaluator = ObjectiveEvaluator(groups, team_members, config)
+    result = evaluator.evaluate(assignments)        # {group_id: assignee or Assignment dict}
+    result.total, result.costs, result.penalties
+
+    X = evaluator.assignment_matrix(assignments)    # Local search: edit X, rescore
+    total, costs = evaluator.score(X)
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from src.person_index import PersonIndex
+from src.records import Group, TeamMember, decode_assignments
+from src.solver.penalties import SolverPenalties
+
+COST_CAP = 10000000000000000 # Same cap as the solver's cost tables
+
+# Streak length -> multiple of the cooldown penalty (on top of the pairwise penalties)
+STREAK_MULTIPLIERS = {3: 1, 4: 4, 5: 12}
+MAX_STREAK = 5
+
+
+def _geometric_table(penalty, size, start):
+    """[0, ..., 0, P, 3P, 9P, ...]: entry i costs P * 3^(i - start) from i = start on (capped)."""
+    return np.array([0 if i < start else min(penalty * 3 ** (i - start), COST_CAP) for i in range(size + 1)], dtype=np.int64)
+
+
+def _one_hot(indices, size):
+    """Rows = len(indices), columns = size; index -1 is an all-zero row."""
+    indices = np.asarray(indices, dtype=np.int64)
+    matrix = np.zeros((len(indices), size), dtype=np.int64)
+    rows = np.flatnonzero(indices >= 0)
+    matrix[rows, indices[rows]] = 1
+    return matrix
+
+
+@dataclass(slots=True)
+class Evaluation:
+    """Score of one assignment map (see the module docstring)."""
+    assignments: dict # group_id -> {"group_name", "assignee", "method"} (as in the solver's results)
+    penalties: list
+    costs: dict # Ladder rule -> cost, in ladder order
+    total: int
+    violations: list = field(default_factory=list)
+
+
+class ObjectiveEvaluator:
+    def __init__(self, groups, team_members, config):
+        self.group_records = [Group.of(g) for g in groups]
+        self.team_records = [m if isinstance(m, TeamMember) else TeamMember.from_dict(m) for m in team_members]
+        self.group_ids = [g.id for g in self.group_records]
+        self.group_position = {g_id: i for i, g_id in enumerate(self.group_ids)}
+        self.group_map = {g.id: g for g in self.group_records}
+        groups = self.group_records
+
+        # Config, as SATSolver reads it
+        disabled = set(config.get('disabled_rules', []))
+        self.rule_definitions = [r for r in config.get('ladder', []) if r not in disabled]
+        self.effort_threshold = config.get('effort_threshold', 8.0)
+        self.preferred_pairs = config.get('preferred_pairs', [])
+        penalties = SolverPenalties(self.rule_definitions, config.get('penalty_ratio', 10))
+        self.P = {rule: penalties.get_penalty_by_name(rule) for rule in [
+            "Unassigned Group", "Underworked Team Member (< Threshold)", "Multi-Day Weekdays (e.g. Tue+Wed)",
+            "Inefficient Day (< 2 Tasks)", "Multi-Day General (Weekday+Sunday)", "Intra-Week Cooldown (Same Week)",
+            "Cooldown (Adjacent Weeks)", "Role Diversity (Assignments in each capable family)",
+            "Teaching/Assisting Preference", "Teaching/Assisting Equality", "Effort Equalization", "Preferred Pair"
+        ]}
+        self.target_effort = int(self.effort_threshold * 10)
+
+        # People: the team plus everyone named in a group (sorted, so team order matches the solver's report)
+        names = {m.name for m in self.team_records}
+        for g in groups:
+            names.update(g.candidates_list, g.filtered_candidates_list, g.priority_candidates_list,
+                         g.filtered_priority_candidates_list, g.solver_candidates)
+            if g.assignee:
+                names.add(g.assignee)
+        self.people = PersonIndex(names)
+        pos = self.people.positions
+        num_groups, num_people = len(groups), len(self.people)
+        self.team = np.zeros(num_people, dtype=bool)
+        self.team[[pos[m.name] for m in self.team_records]] = True
+        self.report_order = [pos[name] for name in sorted(m.name for m in self.team_records)]
+
+        # Person x group structure (rows = groups)
+        self.candidates = np.zeros((num_groups, num_people), dtype=bool) # Solver variables exist
+        self.exempt = np.zeros((num_groups, num_people), dtype=bool) # Manual / prepass (cooldown exemption)
+        self.manual_intent = np.zeros((num_groups, num_people), dtype=bool) # Forced-day detection
+        for i, g in enumerate(groups):
+            sc = g.solver_candidates
+            self.candidates[i, [pos[p] for p in sc]] = True
+            exempt = set(g.filtered_priority_candidates_list)
+            if g.assignee:
+                exempt.add(g.assignee)
+            if len(sc) == 1:
+                exempt.add(sc[0])
+            self.exempt[i, [pos[p] for p in exempt]] = True
+            intent = {p for p in sc if p == g.assignee or p in g.priority_candidates or (len(sc) == 1 and sc[0] == p)}
+            self.manual_intent[i, [pos[p] for p in intent]] = True
+        self.forced = self._forced_matrix()
+
+        self.scaled_effort = np.array([int(round(g.effort * 10)) for g in groups], dtype=np.int64)
+        self.task_count = np.array([g.task_count for g in groups], dtype=np.int64)
+
+        # Days (G{week}_{day}_... ids) and weekday weeks
+        day_index = {}
+        day_of, forced_day_of = [], []
+        for g in groups:
+            parts = g.id.split('_')
+            key = f"{parts[0]}_{parts[1]}" if len(parts) >= 2 else None
+            if len(parts) >= 3 and key not in day_index:
+                day_index[key] = len(day_index)
+            day_of.append(day_index[key] if len(parts) >= 3 else -1)
+            forced_day_of.append(key)
+        self.day_keys = list(day_index)
+        self.day_groups = _one_hot(day_of, len(day_index))
+        self.forced_day_groups = _one_hot([day_index.get(k, -1) if k else -1 for k in forced_day_of], len(day_index))
+        self.day_tasks = self.day_groups * self.task_count[:, None]
+        self.weekdays = np.zeros(len(day_index), dtype=bool)
+        self.sundays = np.zeros(len(day_index), dtype=bool)
+        weekday_weeks = defaultdict(list)
+        for d, key in enumerate(self.day_keys):
+            try:
+                d_num = int(key.split('_')[1])
+            except ValueError:
+                continue
+            if d_num != 7 and d_num != 0:
+                self.weekdays[d] = True
+                weekday_weeks[key.split('_')[0].replace('G', '')].append(d)
+            elif d_num == 7:
+                self.sundays[d] = True
+        self.weekday_weeks = [(w, np.array(days)) for w, days in weekday_weeks.items() if len(days) >= 2]
+        self.weekday_table = _geometric_table(self.P["Multi-Day Weekdays (e.g. Tue+Wed)"], len(day_index), 2)
+
+        # Families
+        family_index = {}
+        for g in groups:
+            family_index.setdefault(g.family if g.family is not None else 'Unknown', len(family_index))
+        self.families = list(family_index)
+        self.family_groups = _one_hot([family_index[g.family if g.family is not None else 'Unknown'] for g in groups], len(family_index))
+        self.diversity_table = _geometric_table(self.P["Role Diversity (Assignments in each capable family)"], len(family_index), 1)
+        self.teaching = np.array([g.family == 'Teaching' for g in groups], dtype=bool)
+        self.assisting = np.array([g.family == 'Assisting' for g in groups], dtype=bool)
+        self.equality_table = _geometric_table(self.P["Teaching/Assisting Equality"], num_groups, 2)
+
+        # Preferred pairs over logical groups (name, week, day)
+        logical_index = {}
+        for g in groups:
+            logical_index.setdefault((g.name, g.week, g.day), len(logical_index))
+        self.logical_groups = _one_hot([logical_index[(g.name, g.week, g.day)] for g in groups], len(logical_index))
+        team_names = {m.name for m in self.team_records}
+        self.pairs = [(pos[p1], pos[p2]) for p1, p2 in self.preferred_pairs if p1 in team_names and p2 in team_names]
+
+        self._build_cooldown_items()
+        self.cost_rules = self._cost_rules()
+
+    def _forced_matrix(self):
+        """SATSolver._is_forced as a group x person matrix (manual, priority, single option, N-for-N)."""
+        pos = self.people.positions
+        context = defaultdict(list)
+        for g in self.group_records:
+            if g.week is not None:
+                context[(g.name, g.week)].append(g)
+        n_for_n = set()
+        for grps in context.values():
+            if len({p for g in grps for p in g.candidates}) == len(grps):
+                n_for_n.update(g.id for g in grps)
+
+        forced = np.zeros((len(self.group_records), len(self.people)), dtype=bool)
+        for i, g in enumerate(self.group_records):
+            people = set(g.priority_candidates)
+            if g.assignee:
+                people.add(g.assignee)
+            if len(g.candidates) == 1 or g.id in n_for_n:
+                people.update(g.candidates)
+            forced[i, [pos[p] for p in people]] = True
+        return forced
+
+    def _family_week_groups(self):
+        index = defaultdict(list)
+        for g in self.group_records:
+            index[(g.family, g.week)].append(g)
+        return index
+
+    def _build_cooldown_items(self):
+        """
+        Cooldown pairs, streak chains and intra-week pairs in the solver's creation order
+        (which is the order extract_solution reports them in).
+        """
+        family_week = self._family_week_groups()
+        P_COOLDOWN = self.P["Cooldown (Adjacent Weeks)"]
+        P_INTRA = self.P["Intra-Week Cooldown (Same Week)"]
+        cooldown, intra = [], [] # (group positions, cost, details)
+        graph = {}
+        for group in self.group_records:
+            g_id = group.id
+            graph.setdefault(g_id, [])
+            if P_INTRA > 0:
+                targets = list(group.intra_cooldown_groups)
+                for family, week in group.intra_cooldown_refs:
+                    targets.extend([g.id, g.name] for g in family_week.get((family, week), []) if g.id != group.id and g.name != group.name)
+                for target in targets:
+                    t_id = target[0]
+                    if g_id < t_id and t_id in self.group_map:
+                        intra.append(([self.group_position[g_id], self.group_position[t_id]], P_INTRA,
+                                      f" Intra-week: {group.name} & {self.group_map[t_id].name}"))
+            if P_COOLDOWN > 0:
+                targets = list(group.cooldown_groups)
+                for family, week in group.cooldown_refs:
+                    targets.extend([g.id, g.name] for g in family_week.get((family, week), []))
+                for target in targets:
+                    t_id = target[0]
+                    if t_id in self.group_map and g_id < t_id:
+                        graph[g_id].append(t_id)
+                        other = self.group_map[t_id]
+                        cooldown.append(([self.group_position[g_id], self.group_position[t_id]], P_COOLDOWN,
+                                         f"{group.name} (W{group.week}) & {other.name} (W{other.week})"))
+
+        if P_COOLDOWN > 0:
+            def find_chains(current_id, chain):
+                for nid in graph.get(current_id, []):
+                    new_chain = chain + [nid]
+                    length = len(new_chain)
+                    if length >= 3:
+                        chain_str = " -> ".join(f"W{self.group_map[cid].week}" for cid in new_chain)
+                        cooldown.append(([self.group_position[cid] for cid in new_chain], P_COOLDOWN * STREAK_MULTIPLIERS[length],
+                                         f"Geometric Streak ({length} weeks): {chain_str}"))
+                    if length < MAX_STREAK:
+                        find_chains(nid, new_chain)
+
+            for start in graph:
+                find_chains(start, [start])
+
+        self.cooldown_items = self._item_arrays(cooldown)
+        self.intra_items = self._item_arrays(intra)
+
+    def _item_arrays(self, items):
+        """(members padded with -1, costs, details, exempt_all) for a list of (group positions, cost, details)."""
+        width = max((len(m) for m, _, _ in items), default=2)
+        members = np.full((len(items), width), -1, dtype=np.int64)
+        for k, (m, _, _) in enumerate(items):
+            members[k, :len(m)] = m
+        costs = np.array([c for _, c, _ in items], dtype=np.int64)
+        # Skipped when every group of the item is exempt for the person
+        padded_exempt = np.vstack([self.exempt, np.ones((1, self.exempt.shape[1]), dtype=bool)])
+        exempt_all = padded_exempt[members].all(axis=1) if items else np.zeros((0, len(self.people)), dtype=bool)
+        return members, costs, [d for _, _, d in items], exempt_all
+
+    def _cost_rules(self):
+        """Rules the solver gives at least one cost term (the keys of its live breakdown)."""
+        P = self.P
+        C = self.candidates
+        team = self.team
+        has_team = bool(team.any())
+        dated = self.day_groups.any(axis=1)
+        eligible_family = team[:, None] & ((C.T.astype(np.int64) @ self.family_groups) > 0)
+        with_terms = {
+            "Unassigned Group": bool(self.group_records),
+            "Underworked Team Member (< Threshold)": has_team,
+            "Multi-Day Weekdays (e.g. Tue+Wed)": has_team and bool(self.weekday_weeks),
+            "Inefficient Day (< 2 Tasks)": bool((team & C[dated].any(axis=0)).any()),
+            "Multi-Day General (Weekday+Sunday)": has_team,
+            "Intra-Week Cooldown (Same Week)": bool(self._items(self.intra_items, C).any()),
+            "Cooldown (Adjacent Weeks)": bool(self._items(self.cooldown_items, C).any()),
+            "Role Diversity (Assignments in each capable family)": bool(eligible_family.any()),
+            "Teaching/Assisting Preference": bool((team & C[self.teaching | self.assisting].any(axis=0)).any()),
+            "Teaching/Assisting Equality": any((team & (C[mask].sum(axis=0) >= 2)).any() for mask in (self.teaching, self.assisting)),
+            "Effort Equalization": has_team,
+            "Preferred Pair": any(((C[:, [p1, p2]].T.astype(np.int64) @ self.logical_groups) > 0).any() for p1, p2 in self.pairs)
+        }
+        return {rule for rule, present in with_terms.items() if present and P[rule] > 0}
+
+    # --- Assignments ---
+    def assignment_matrix(self, assignments):
+        """{group_id: assignee name / Assignment dict / None} -> group x person bool matrix."""
+        X = np.zeros((len(self.group_records), len(self.people)), dtype=bool)
+        for g_id, assignment in decode_assignments(assignments).items():
+            if g_id not in self.group_position:
+                raise ValueError(f"Unknown group in assignments: {g_id!r}")
+            person = assignment.assignee
+            if person is None:
+                continue
+            if person not in self.people:
+                raise ValueError(f"Unknown person {person!r} assigned to {g_id!r}")
+            X[self.group_position[g_id], self.people.positions[person]] = True
+        if (X.sum(axis=1) > 1).any():
+            raise ValueError("A group can have one assignee only")
+        return X
+
+    def _items(self, items, X):
+        """Item x person matrix: every group of the item assigned to the person, not all of them exempt."""
+        members, _, _, exempt_all = items
+        if not len(members):
+            return np.zeros((0, X.shape[1]), dtype=bool)
+        padded = np.vstack([X, np.ones((1, X.shape[1]), dtype=bool)])
+        return padded[members].all(axis=1) & ~exempt_all
+
+    def _rules(self, X):
+        """Per-rule arrays for one assignment matrix (shared by score() and evaluate())."""
+        P = self.P
+        team = self.team
+        Xi = X.astype(np.int64)
+        exists = self.candidates | X # Variables the solver would have, hand-edited assignees included
+        r = {"X": X}
+
+        r["unassigned"] = ~X.any(axis=1)
+        r["effort"] = self.scaled_effort @ Xi
+        r["underworked"] = team & (r["effort"] < self.target_effort)
+
+        worked = (Xi.T @ self.day_groups) > 0
+        r["inefficient"] = team[:, None] & worked & ((Xi.T @ self.day_tasks) < 2)
+        forced_day = ((Xi * self.manual_intent).T @ self.forced_day_groups) > 0
+        pure_auto = worked & ~forced_day
+        r["weekday_counts"] = np.stack([worked[:, days].sum(axis=1) for _, days in self.weekday_weeks], axis=1) \
+            if self.weekday_weeks else np.zeros((len(team), 0), dtype=np.int64)
+        triggered = np.stack([pure_auto[:, days].any(axis=1) for _, days in self.weekday_weeks], axis=1) \
+            if self.weekday_weeks else np.zeros((len(team), 0), dtype=bool)
+        r["weekday_costs"] = self.weekday_table[r["weekday_counts"]] * triggered * team[:, None]
+        r["multi_general"] = team & worked[:, self.weekdays].any(axis=1) & worked[:, self.sundays].any(axis=1)
+
+        capable = team[:, None] & ((exists.T.astype(np.int64) @ self.family_groups) > 0)
+        r["capable_families"] = capable
+        r["missed_families"] = capable & ((Xi.T @ self.family_groups) == 0)
+        r["diversity_costs"] = self.diversity_table[r["missed_families"].sum(axis=1)] * capable.any(axis=1)
+
+        r["cooldown"] = self._items(self.cooldown_items, X)
+        r["intra"] = self._items(self.intra_items, X)
+
+        capable_teaching = team & exists[self.teaching].any(axis=0)
+        capable_assisting = team & exists[self.assisting].any(axis=0)
+        has_teaching = X[self.teaching].any(axis=0)
+        has_assisting = X[self.assisting].any(axis=0)
+        P_TEACH = P["Teaching/Assisting Preference"]
+        r["teacher_full"] = capable_teaching & ~has_teaching & ~has_assisting
+        r["teacher_half"] = capable_teaching & ~has_teaching & has_assisting
+        r["assistant_full"] = capable_assisting & ~capable_teaching & ~has_assisting
+        r["teach_costs"] = np.where(r["teacher_full"] | r["assistant_full"], P_TEACH, np.where(r["teacher_half"], int(P_TEACH * 0.5), 0))
+
+        r["equality"] = []
+        for family, mask in (("Teaching", self.teaching), ("Assisting", self.assisting)):
+            if not mask.any():
+                continue
+            count = X[mask].sum(axis=0)
+            eligible = team & (exists[mask].sum(axis=0) >= 2)
+            has_auto = (X[mask] & ~self.forced[mask]).any(axis=0)
+            r["equality"].append((family, count, self.equality_table[count] * has_auto * eligible))
+
+        deviation = r["effort"] - self.target_effort
+        r["equalization_norm"] = (deviation * deviation) // 100
+        r["equalization_costs"] = r["equalization_norm"] * P["Effort Equalization"] * team
+
+        splits = 0
+        for p1, p2 in self.pairs:
+            active = ((exists[:, [p1, p2]].T.astype(np.int64) @ self.logical_groups) > 0).any(axis=0)
+            present = (Xi[:, [p1, p2]].T @ self.logical_groups) > 0
+            splits += int((active & (present[0] != present[1])).sum())
+        r["pair_splits"] = splits
+        return r
+
+    def _costs(self, r):
+        P = self.P
+        costs = {
+            "Unassigned Group": int(r["unassigned"].sum()) * P["Unassigned Group"],
+            "Underworked Team Member (< Threshold)": int(r["underworked"].sum()) * P["Underworked Team Member (< Threshold)"],
+            "Multi-Day Weekdays (e.g. Tue+Wed)": int(r["weekday_costs"].sum()),
+            "Inefficient Day (< 2 Tasks)": int(r["inefficient"].sum()) * P["Inefficient Day (< 2 Tasks)"],
+            "Multi-Day General (Weekday+Sunday)": int(r["multi_general"].sum()) * P["Multi-Day General (Weekday+Sunday)"],
+            "Intra-Week Cooldown (Same Week)": int(r["intra"].sum()) * P["Intra-Week Cooldown (Same Week)"],
+            "Cooldown (Adjacent Weeks)": int((r["cooldown"] * self.cooldown_items[1][:, None]).sum()),
+            "Role Diversity (Assignments in each capable family)": int(r["diversity_costs"].sum()),
+            "Teaching/Assisting Preference": int(r["teach_costs"].sum()),
+            "Teaching/Assisting Equality": sum(int(c.sum()) for _, _, c in r["equality"]),
+            "Effort Equalization": int(r["equalization_costs"].sum()),
+            "Preferred Pair": r["pair_splits"] * P["Preferred Pair"]
+        }
+        # Like the breakdown: only rules with cost terms (a hand edit outside the candidates can add some)
+        return {rule: costs[rule] for rule in self.rule_definitions if rule in self.cost_rules or costs.get(rule)}
+
+    def score(self, X):
+        """(total, {ladder rule: cost}) for a group x person assignment matrix."""
+        costs = self._costs(self._rules(X))
+        return sum(costs.values()), costs
+
+    def evaluate(self, assignments):
+        """Evaluation of an assignment map ({group_id: assignee name or Assignment dict})."""
+        X = self.assignment_matrix(assignments)
+        r = self._rules(X)
+        costs = self._costs(r)
+        return Evaluation(
+            assignments=self._results(X),
+            penalties=self._penalties(r),
+            costs=costs,
+            total=sum(costs.values()),
+            violations=self._violations(X)
+        )
+
+    def _results(self, X):
+        results = {}
+        names = self.people.names
+        for i, group in enumerate(self.group_records):
+            people = np.flatnonzero(X[i])
+            if not len(people):
+                results[group.id] = {"group_name": group.name, "assignee": None, "method": "unassigned"}
+            else:
+                p = people[0]
+                results[group.id] = {"group_name": group.name, "assignee": names[p],
+                                     "method": "manual" if self.forced[i, p] else "automatic"}
+        return results
+
+    def _penalties(self, r):
+        """The list extract_solution reports, in its order."""
+        P = self.P
+        names = self.people.names
+        penalties = []
+        for i in np.flatnonzero(r["unassigned"]):
+            group = self.group_records[i]
+            penalties.append({
+                "group_id": group.id,
+                "group_name": group.name,
+                "assignee": None,
+                "rule": "Unassigned Group",
+                "cost": P["Unassigned Group"],
+                "details": f"Group: {group.name} (ID: {group.id})"
+            })
+
+        cooldown_costs, cooldown_details = self.cooldown_items[1], self.cooldown_items[2]
+        intra_details = self.intra_items[2]
+        for p in self.report_order:
+            person = names[p]
+            if r["underworked"][p]:
+                penalties.append({
+                    "person_name": person,
+                    "rule": "Underworked Team Member (< Threshold)",
+                    "cost": P["Underworked Team Member (< Threshold)"],
+                    "details": f"Total Effort: {r['effort'][p] / 10.0} < {self.effort_threshold}"
+                })
+
+            if P["Multi-Day Weekdays (e.g. Tue+Wed)"] > 0:
+                weeks = [(w, int(r["weekday_counts"][p, k]), int(r["weekday_costs"][p, k]))
+                         for k, (w, _) in enumerate(self.weekday_weeks) if r["weekday_costs"][p, k] > 0]
+                if weeks:
+                    penalties.append({
+                        "person_name": person,
+                        "rule": "Multi-Day Weekdays (e.g. Tue+Wed)",
+                        "cost": sum(c for _, _, c in weeks),
+                        "details": "Geometric Penalty: " + ", ".join(f"W{w}: {n} days ({c} cost)" for w, n, c in weeks)
+                    })
+
+            if P["Multi-Day General (Weekday+Sunday)"] > 0 and r["multi_general"][p]:
+                penalties.append({
+                    "person_name": person,
+                    "rule": "Multi-Day General (Weekday+Sunday)",
+                    "cost": P["Multi-Day General (Weekday+Sunday)"],
+                    "details": "Worked on Weekday + Sunday"
+                })
+
+            if P["Role Diversity (Assignments in each capable family)"] > 0 and r["diversity_costs"][p] > 0:
+                missed = [self.families[f] for f in np.flatnonzero(r["missed_families"][p])]
+                penalties.append({
+                    "person_name": person,
+                    "rule": "Role Diversity (Cascading)",
+                    "cost": int(r["diversity_costs"][p]),
+                    "details": f"Missed {len(missed)} families: {', '.join(missed)}"
+                })
+
+            for k in np.flatnonzero(r["cooldown"][:, p]):
+                penalties.append({
+                    "person_name": person,
+                    "rule": "Cooldown (Adjacent Weeks / Geometric Streak)",
+                    "cost": int(cooldown_costs[k]),
+                    "details": cooldown_details[k]
+                })
+
+            for k in np.flatnonzero(r["intra"][:, p]):
+                penalties.append({
+                    "person_name": person,
+                    "rule": "Intra-Week Cooldown (Same Week)",
+                    "cost": P["Intra-Week Cooldown (Same Week)"],
+                    "details": intra_details[k]
+                })
+
+            if r["teach_costs"][p] > 0:
+                if r["teacher_full"][p]:
+                    details = "Teacher assigned neither Teaching nor Assisting"
+                elif r["teacher_half"][p]:
+                    details = "Teacher assigned only Assisting (Preferred Teaching)"
+                else:
+                    details = "Assistant assigned no Assisting tasks"
+                penalties.append({
+                    "person_name": person,
+                    "rule": "Teaching/Assisting Preference",
+                    "cost": int(r["teach_costs"][p]),
+                    "details": details
+                })
+
+            for family, count, family_costs in r["equality"]:
+                if family_costs[p] > 0:
+                    penalties.append({
+                        "person_name": person,
+                        "rule": "Teaching/Assisting Equality",
+                        "cost": int(family_costs[p]),
+                        "details": f"Hoarding {count[p]} assignments in {family}"
+                    })
+
+            if r["equalization_costs"][p] > 0:
+                scaled_diff = int(r["effort"][p]) - self.target_effort
+                penalties.append({
+                    "person_name": person,
+                    "rule": "Effort Equalization",
+                    "cost": int(r["equalization_costs"][p]),
+                    "details": f"Deviation {scaled_diff / 10.0:.1f} from {self.effort_threshold} (SqDiff {scaled_diff * scaled_diff}, Norm {r['equalization_norm'][p]})"
+                })
+        return penalties
+
+    def _violations(self, X):
+        """Hard constraints the solver would not have allowed."""
+        names = self.people.names
+        violations = []
+
+        def add(group, person, constraint, details):
+            violations.append({"group_id": group.id, "assignee": person, "constraint": constraint, "details": details})
+
+        for i, group in enumerate(self.group_records):
+            for p in np.flatnonzero(X[i] & ~self.candidates[i]):
+                add(group, names[p], "Candidates", f"{names[p]} is not a candidate for {group.name}")
+            if group.assignee and not X[i, self.people.positions[group.assignee]]:
+                add(group, group.assignee, "Manual Assignment", f"{group.name} is manually assigned to {group.assignee}")
+            for excl in group.exclusive_groups:
+                j = self.group_position.get(excl[0])
+                if j is None or j <= i:
+                    continue
+                other = self.group_records[j]
+                for p in np.flatnonzero(X[i] & X[j]):
+                    if group.assignee == names[p] and other.assignee == names[p]:
+                        continue
+                    add(group, names[p], "Exclusive Groups", f"{group.name} and {other.name} ({other.id})")
+
+        cliques = defaultdict(list)
+        for i, group in enumerate(self.group_records):
+            for clique_id in group.overlap_cliques:
+                cliques[clique_id].append(i)
+        for clique_id, members in cliques.items():
+            for p in np.flatnonzero(X[members].any(axis=0)):
+                person = names[p]
+                assigned = [self.group_records[i] for i in members if X[i, p]]
+                manual = [g for g in assigned if g.assignee == person]
+                # Groups manually given to the person together count once
+                if len(assigned) - max(0, len(manual) - 1) > 1:
+                    add(assigned[0], person, "Overlap Clique",
+                        f"Overlapping groups ({clique_id}): " + ", ".join(g.name for g in assigned))
+        return violations
+
+
+def evaluate(groups, team_members, config, assignments):
+    """One-off evaluation (build an ObjectiveEvaluator to score many schedules of one instance)."""
+    return ObjectiveEvaluator(groups, team_members, config).evaluate(assignments)
@@ -0,0 +1,27 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+def solve_many(solvers, max_workers=None, **solve_kwargs):
+    """
+    Solves independent SATSolver instances concurrently in one process.
+
+    CP-SAT releases the GIL while it searches, so a thread pool gives real parallelism.
+    The cores are split between the running solves: instances left at the default
+    num_search_workers (0) get cores // max_workers CP-SAT threads each.
+    Give each instance its own log/events sinks to tell their output apart.
+
+    Returns [(assignments, penalties)] in the order of solvers; the first failure is raised.
+    """
+    solvers = list(solvers)
+    if not solvers:
+        return []
+    cores = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers or cores, len(solvers)))
+    for solver in solvers:
+        if solver.num_search_workers <= 0:
+            solver.num_search_workers = max(1, cores // max_workers)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(solver.solve, **solve_kwargs) for solver in solvers]
+        return [future.result() for future in futures]
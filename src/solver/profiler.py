@@ -0,0 +1,68 @@
+import time
+
+
+class ModelBuildProfiler:
+    """
+    Records wall time and model growth for each rule section of SATSolver.solve().
+
+    Usage: call start(name) at the top of each section; the previous section is closed
+    automatically. A section name may appear more than once (e.g. rules whose
+    variables and objective terms are built in different places); totals are summed.
+    """
+    def __init__(self, model, objective_terms):
+        self.model = model
+        self.objective_terms = objective_terms
+        self.sections = {} # name -> {seconds, variables, constraints, objective_terms}
+        self._current = None
+        self._started_at = None
+        self._snapshot = None
+
+    def _counts(self):
+        proto = self.model.Proto()
+        return (len(proto.variables), len(proto.constraints), len(self.objective_terms))
+
+    def start(self, name):
+        self.stop()
+        self._current = name
+        self._started_at = time.perf_counter()
+        self._snapshot = self._counts()
+
+    def stop(self):
+        if self._current is None:
+            return
+        elapsed = time.perf_counter() - self._started_at
+        n_vars, n_cons, n_terms = self._counts()
+
+        entry = self.sections.setdefault(self._current, {
+            "seconds": 0.0,
+            "variables": 0,
+            "constraints": 0,
+            "objective_terms": 0
+        })
+        entry["seconds"] += elapsed
+        entry["variables"] += n_vars - self._snapshot[0]
+        entry["constraints"] += n_cons - self._snapshot[1]
+        entry["objective_terms"] += n_terms - self._snapshot[2]
+
+        self._current = None
+
+    def report(self):
+        """JSON-serializable report in section order, plus totals."""
+        rows = [{"section": name, **values} for name, values in self.sections.items()]
+        for row in rows:
+            row["seconds"] = round(row["seconds"], 4)
+        totals = {
+            "seconds": round(sum(r["seconds"] for r in rows), 4),
+            "variables": sum(r["variables"] for r in rows),
+            "constraints": sum(r["constraints"] for r in rows),
+            "objective_terms": sum(r["objective_terms"] for r in rows)
+        }
+        return {"sections": rows, "totals": totals}
+
+    def format_table(self):
+        report = self.report()
+        lines = [f"{'Section':<16}{'Time (s)':>10}{'Vars':>10}{'Cons':>10}{'Terms':>10}"]
+        lines.append("-" * len(lines[0]))
+        for row in report["sections"] + [{"section": "Total", **report["totals"]}]:
+            lines.append(f"{row['section']:<16}{row['seconds']:>10.3f}{row['variables']:>10}{row['constraints']:>10}{row['objective_terms']:>10}")
+        return "\n".join(lines)
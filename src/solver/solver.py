@@ -1,32 +1,112 @@
+import ortools
 from ortools.sat.python import cp_model
 from src.solver.penalties import SolverPenalties
+from src.solver.profiler import ModelBuildProfiler
+from src.records import Group, decode_groups, decode_team
+from src import progress
+import json
 import math
+import threading
+import time
 from collections import defaultdict
+from pathlib import Path
+import numpy as np
+
+# Bump when the model (constraints, penalty terms, result extraction) changes so that cached results are not reused
+MODEL_VERSION = 1
 
 class SolutionPrinter(cp_model.CpSolverSolutionCallback):
-    def __init__(self, penalty_vars=None, callback=None):
+    """
+    Reports each improving solution.
+    - Cost per ladder rule and the active penalty count are evaluated in one vectorized
+      pass over the solution vector (rule_costs: rule -> ([var indices], [coefficients])).
+    - progress_callback runs for every solution (keep it cheap, e.g. the convergence trace).
+    - Printing and callback (which may extract/save results) are throttled to one call
+      per `interval` seconds; flush() reports the last solution if it was held back.
+    - Each report is also a "solution" event passed to emit(event, **fields) when given;
+      the "Breakdown:" line is then left out (only machine consumers read it).
+    - Printed lines go to log (the owning SATSolver's sink).
+    """
+    def __init__(self, penalty_vars=None, callback=None, rule_costs=None, interval=0.0, progress_callback=None,
+                 log=None, emit=None):
         cp_model.CpSolverSolutionCallback.__init__(self)
+        self.log = log or _print_line
+        self.emit = emit
         self.__solution_count = 0
         self.penalty_vars = penalty_vars if penalty_vars else []
         self.callback = callback
+        self.progress_callback = progress_callback
+        self.interval = interval
+        self.active_penalties = 0 # Count for the latest solution (read by callbacks)
+        self.breakdown = {} # Rule -> cost for the latest solution
+
+        self.penalty_index = np.array([v.Index() for v in self.penalty_vars], dtype=np.int64)
+        self.rule_costs = {
+            rule: (np.array(indices, dtype=np.int64), np.array(coefs, dtype=np.int64))
+            for rule, (indices, coefs) in (rule_costs or {}).items()
+        }
+        self._last_report = None
+        self._latest = None # Snapshot of the latest solution (callback getters are invalid after Solve)
+        self._pending = False
 
     def OnSolutionCallback(self):
         self.__solution_count += 1
-        
-        active_penalties = 0
-        if self.penalty_vars:
-            # Count how many penalty variables (bool or int > 0) are triggered
-            for var in self.penalty_vars:
-                if self.Value(var) > 0:
-                    active_penalties += 1
-        
-        print(f'Solution {self.__solution_count}, time = {self.WallTime():.2f} s, objective = {int(self.ObjectiveValue())}, penalties = {active_penalties}', flush=True)
-        
+
+        # One copy of the solution vector instead of a Value() call per variable
+        values = np.asarray(self.Response().solution, dtype=np.int64)
+        self.active_penalties = int(np.count_nonzero(values[self.penalty_index])) if len(self.penalty_index) else 0
+        self.breakdown = {rule: int(values[indices] @ coefs) for rule, (indices, coefs) in self.rule_costs.items()}
+
+        now = self.WallTime()
+        self._latest = {
+            "solution": self.__solution_count,
+            "time": now,
+            "objective": round(self.ObjectiveValue()),
+            "penalties": self.active_penalties,
+            "breakdown": self.breakdown
+        }
+
+        if self.progress_callback:
+            self.progress_callback(self)
+
+        if self._last_report is not None and now - self._last_report < self.interval:
+            self._pending = True
+            return
+        self._last_report = now
+        self._report()
+
         if self.callback:
             self.callback(self)
 
+    def _report(self):
+        s = self._latest
+        self._pending = False
+        self.log(f'Solution {s["solution"]}, time = {s["time"]:.2f} s, objective = {s["objective"]}, penalties = {s["penalties"]}')
+        if self.emit is not None:
+            self.emit("solution", **s)
+        else:
+            # Structured per-rule costs for scripts reading stdout (one JSON object per line)
+            self.log(f'Breakdown: {json.dumps(s["breakdown"], ensure_ascii=False)}')
+
+    def flush(self):
+        """Print the last solution if the throttle held it back (search ended first)."""
+        if self._pending:
+            self._report()
+
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parent.parent.parent / "data" / "penalty_config.json"
+
+
+def load_config(path=DEFAULT_CONFIG_PATH):
+    """penalty_config.json as a dict. SATSolver reads the project's copy (not the working directory's) when given no config."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _print_line(line):
+    print(line, flush=True)
+
+
 class SATSolver:
-    # ... (init and methods remain) ...
 
     def extract_solution(self, provider):
         """
@@ -42,12 +122,11 @@ class SATSolver:
         P_INTRA_COOLDOWN = self.penalties.get_penalty_by_name("Intra-Week Cooldown (Same Week)")
         TARGET_EFFORT_SCALED = int(self.effort_threshold * 10)
         
-        all_persons = sorted(self.team_members, key=lambda x: x['name'])
-        all_persons = [p['name'] for p in all_persons]
+        all_persons = sorted(m.name for m in self.team_records)
 
         # Collect Assignments
-        for group in self.groups:
-            g_id = group['id']
+        for group in self.group_records:
+            g_id = group.id
             assigned_person = None
             method = "unassigned"
             
@@ -57,15 +136,14 @@ class SATSolver:
                 
                 incurred_penalties.append({
                     "group_id": g_id,
-                    "group_name": group['name'],
+                    "group_name": group.name,
                     "assignee": None,
                     "rule": "Unassigned Group",
                     "cost": P_UNASSIGNED,
-                    "details": f"Group: {group['name']} (ID: {g_id})"
+                    "details": f"Group: {group.name} (ID: {g_id})"
                 })
             else:
-                candidates = self.get_group_candidates(group)
-                for p in candidates:
+                for p in group.solver_candidates:
                     if (g_id, p) in self.assignments:
                         if provider.Value(self.assignments[(g_id, p)]) == 1:
                             assigned_person = p
@@ -77,7 +155,7 @@ class SATSolver:
                     method = "automatic"
             
             results[g_id] = {
-                "group_name": group['name'],
+                "group_name": group.name,
                 "assignee": assigned_person,
                 "method": method
             }
@@ -240,17 +318,13 @@ class SATSolver:
         
         # N-for-N Logic
         context_groups = defaultdict(list)
-        for g in self.groups:
+        for g in self.group_records:
             # Group by Context: Name, Week
-            # Note: We need to handle potential missing keys safely
-            w = g.get('week')
-            n = g.get('name')
-            
-            if w is None or n is None:
+            if g.week is None:
                 continue
                 
             # Relaxed Key: Ignore Day to catch cross-day constraints in the same week
-            key = (n, w)
+            key = (g.name, g.week)
             context_groups[key].append(g)
             
         forced_n_for_n_ids = set()
@@ -260,40 +334,33 @@ class SATSolver:
             
             all_candidates = set()
             for g in grps:
-                # Prefer filtered list if present (solver usually gets this)
-                cands = g.get('filtered_candidates_list')
-                if not cands: 
-                    cands = g.get('candidates_list', [])
-                all_candidates.update(cands)
+                all_candidates.update(g.candidates)
                 
             # Logic: If N slots need filling and distinct candidates == N, they are locked.
             if len(all_candidates) == n_groups:
                 for g in grps:
-                    forced_n_for_n_ids.add(g['id'])
+                    forced_n_for_n_ids.add(g.id)
 
         # Build Map
-        for group in self.groups:
-            g_id = group['id']
+        for group in self.group_records:
+            g_id = group.id
             
             # Candidates to check
-            p_list = group.get('filtered_priority_candidates_list')
-            if not p_list: p_list = group.get('priority_candidates_list', [])
-            
-            cands = group.get('filtered_candidates_list')
-            if not cands: cands = group.get('candidates_list', [])
+            p_list = group.priority_candidates
+            cands = group.candidates
             
             # Use intersection of candidates and team_members logic effectively
             # Iterate potential people who might be assigned
             
             possible_assignees = set(cands)
             if p_list: possible_assignees.update(p_list)
-            if group.get('assignee'): possible_assignees.add(group['assignee'])
+            if group.assignee: possible_assignees.add(group.assignee)
             
             for person in possible_assignees:
                 is_forced = False
                 
                 # 1. Explicit
-                if group.get('assignee') == person:
+                if group.assignee == person:
                     is_forced = True
                 
                 # 2. Priority
@@ -317,53 +384,40 @@ class SATSolver:
     def _is_forced(self, group_id, person_name):
         return self.forced_assignment_map.get((group_id, person_name), False)
 
-    def solve(self, solution_callback=None):
-        self.model = cp_model.CpModel()
-        
-        # ... (Variables and Constraints setup - same as before) ...
-        # NOTE: I am not including the entire body here due to size limits in this tool,
-        # but in a real edit I would keep the constraint setup logic.
-        # Since I'm using MultiReplace or big Replace, I should be careful.
-        # The tool input effectively replaces the extracted parts.
-        
-        # Wait, I cannot replace the *entire* solve method efficiently if I don't provide the body.
-        # The instruction was "Update solve to use extract_solution".
-        # I need to see exactly where to splice.
-        pass
-    def __init__(self, groups, team_members, config=None):
-        self.groups = groups
+    def __init__(self, groups, team_members, config=None, log=None, events=None):
+        """
+        config: penalty_config.json contents (None: read DEFAULT_CONFIG_PATH).
+        log: callable(line) for the human-readable output (default: print to stdout).
+        events: callable(event dict) for progress events (default: the process-wide
+        sink of src/progress.py). Instances share no state, so several can solve in
+        parallel threads (see src/solver/parallel.py); each runs one solve at a time.
+        """
+        self.log = log or _print_line
+        self._events = events
+        self.groups = groups # As given (dicts); also what the cache key is computed from
         self.team_members = team_members
-        self.member_map = {m['name']: m for m in team_members}
-        self.group_map = {g['id']: g for g in groups}
+        self.group_records = decode_groups(groups)
+        self.team_records = decode_team(team_members)
+        self.member_map = {m.name: m for m in self.team_records}
+        self.group_map = {g.id: g for g in self.group_records}
+        self._family_week_index = None # (family, week) -> groups, built on first cooldown lookup
         
         # Pre-calculate Forced Assignments for N-for-N detection and Priority
         self.forced_assignment_map = {}
         self._precalculate_forced_assignments()
         
         # Define Rules for Ladder
-        self.disabled_rules = set()
-
-        if config:
-            ladder_raw = config.get('ladder', [])
-            self.disabled_rules = set(config.get('disabled_rules', []))
-            self.preferred_pairs = config.get('preferred_pairs', [])
-            self.time_limit = config.get('time_limit_seconds', 30.0)
-            self.effort_threshold = config.get('effort_threshold', 8.0)
-            self.penalty_ratio = config.get('penalty_ratio', 10)
-        else:
-            # Loaded from data/penalty_config.json
-            import json
-            from pathlib import Path
-            
-            config_path = Path('data') / 'penalty_config.json'
-            with open(config_path, 'r') as f:
-                t = json.load(f)
-                ladder_raw = t['ladder']
-                self.disabled_rules = set(t.get('disabled_rules', []))
-                self.preferred_pairs = t.get('preferred_pairs', [])
-                self.time_limit = t.get('time_limit_seconds', 30.0)
-                self.effort_threshold = t.get('effort_threshold', 8.0)
-                self.penalty_ratio = t.get('penalty_ratio', 10)
+        if config is None:
+            config = load_config()
+        ladder_raw = config.get('ladder', [])
+        self.disabled_rules = set(config.get('disabled_rules', []))
+        self.preferred_pairs = config.get('preferred_pairs', [])
+        self.time_limit = config.get('time_limit_seconds', 30.0)
+        self.effort_threshold = config.get('effort_threshold', 8.0)
+        self.penalty_ratio = config.get('penalty_ratio', 10)
+        self.dump_model_stats = config.get('dump_model_stats', False)
+        self.progress_interval = config.get('progress_interval_seconds', 0.5)
+        self.num_search_workers = config.get('num_search_workers', 0) # 0: CP-SAT default (all cores)
         
         # Filter out disabled rules from the active ladder
         self.rule_definitions = [r for r in ladder_raw if r not in self.disabled_rules]
@@ -379,9 +433,92 @@ class SATSolver:
         self.unassigned_vars = {} # group_id -> BoolVar
         self.effort_vars = {} # person_name -> IntVar (Scaled x10)
         self.underworked_vars = {} # person_name -> BoolVar
+        self.build_profile = None # Filled by solve()
+        self.solve_stats = None # Final status/objective/bound/search stats, filled by solve()
+        self._solve_lock = threading.Lock()
+        self._stop_lock = threading.Lock()
+        self._stop_requested = False
+        self._search = None # CpSolver while the search runs (for stop())
+
+    def emit(self, event, **fields):
+        """Progress event to this instance's sink, or else the process-wide one (src/progress.py)."""
+        if self._events is not None:
+            self._events({"event": event, **fields})
+        else:
+            progress.emit(event, **fields)
+
+    def events_enabled(self):
+        return self._events is not None or progress.enabled()
+
+    def stop(self):
+        """
+        Ends the search early and keeps the best solution found so far (CP-SAT StopSearch).
+        Safe to call from any thread; before the search starts, it stops at the first solution.
+        """
+        with self._stop_lock:
+            self._stop_requested = True
+            if self._search is not None:
+                self._search.StopSearch()
+
+    def solver_settings(self):
+        """Config values that change the model or its objective, with the model and OR-Tools versions (used for cache keys)."""
+        return {
+            "model_version": MODEL_VERSION,
+            "ortools_version": ortools.__version__,
+            "ladder": self.rule_definitions,
+            "penalty_ratio": self.penalty_ratio,
+            "effort_threshold": self.effort_threshold,
+            "preferred_pairs": self.preferred_pairs
+        }
+
+    def solve(self, solution_callback=None, log_search_progress=False, cache=None, progress_callback=None):
+        """
+        Builds the model and searches. Returns (assignments, penalties); ({}, []) without a solution.
+        One solve per instance at a time: a second concurrent call raises RuntimeError.
+        """
+        if not self._solve_lock.acquire(blocking=False):
+            raise RuntimeError("SATSolver.solve is already running on this instance; use one instance per thread")
+        try:
+            return self._solve(solution_callback, log_search_progress, cache, progress_callback)
+        finally:
+            with self._stop_lock:
+                self._stop_requested = False # A stop applies to the solve it interrupted
+            self._solve_lock.release()
+
+    def _solve(self, solution_callback, log_search_progress, cache, progress_callback):
+        # 0. Cache Lookup
+        # A proven optimal entry is returned as-is; anything else seeds the search below.
+        cache_key = None
+        cached = None
+        if cache is not None:
+            cache_key = cache.make_key(self.groups, self.team_members, self.solver_settings())
+            cached = cache.get(cache_key)
+            if cached and cached.get('status') == 'OPTIMAL':
+                self.log(f"Cache hit: reusing proven optimal solution (objective = {int(cached['objective'])})")
+                self.solve_stats = {
+                    "status": "OPTIMAL",
+                    "objective": cached['objective'],
+                    "best_bound": cached['best_bound'],
+                    "cached": True,
+                    "stats": {}
+                }
+                return cached['assignments'], cached['penalties']
 
-    def solve(self, solution_callback=None, log_search_progress=False):
         self.model = cp_model.CpModel()
+        objective_terms = []
+        all_cost_vars = [] # Track variables responsible for costs for live reporting
+        rule_costs = {} # Rule -> ([var indices], [coefficients]) for the live per-rule breakdown
+
+        def add_cost(rule, var, coef=1):
+            objective_terms.append(var * coef)
+            all_cost_vars.append(var)
+            indices, coefs = rule_costs.setdefault(rule, ([], []))
+            indices.append(var.Index())
+            coefs.append(coef)
+        
+        # Per-rule build profile (time, variables, constraints, objective terms)
+        profiler = ModelBuildProfiler(self.model, objective_terms)
+        profiler.start("Base")
         
         # ----------------------
         # 1. Variables
@@ -398,19 +535,18 @@ class SATSolver:
 
         # Filter persons: Include ALL team members to ensure penalties (like Min Effort) 
         # apply even if they have 0 availability.
-        all_persons = {m['name'] for m in self.team_members}
+        all_persons = {m.name for m in self.team_records}
         
         # Assignment Variables
-        for group in self.groups:
-            candidates = self.get_group_candidates(group)
-            for person in candidates:
-                self.assignments[(group['id'], person)] = self.model.NewBoolVar(f"x_{group['id']}_{person}")
+        for group in self.group_records:
+            for person in group.solver_candidates:
+                self.assignments[(group.id, person)] = self.model.NewBoolVar(f"x_{group.id}_{person}")
             
-            self.unassigned_vars[group['id']] = self.model.NewBoolVar(f"unassigned_{group['id']}")
+            self.unassigned_vars[group.id] = self.model.NewBoolVar(f"unassigned_{group.id}")
 
         # Effort Variables (Scaled x10)
         # Calculate dynamic upper bound based on total available effort
-        total_effort = sum(group.get('effort', 0) for group in self.groups)
+        total_effort = sum(group.effort for group in self.group_records)
         max_scaled_effort = int(math.ceil(total_effort * 10))
         
         for person in all_persons:
@@ -420,10 +556,9 @@ class SATSolver:
         # 2. Constraints (Hard)
         
         # Coverage & Hard Priority
-        for group in self.groups:
-            g_id = group['id']
-            priority_list = group.get('filtered_priority_candidates_list', [])
-            all_candidates = self.get_group_candidates(group)
+        for group in self.group_records:
+            g_id = group.id
+            all_candidates = group.solver_candidates
             
             # Constraint: Sum(Assignees) + Unassigned == 1
             possible_vars = [self.assignments[(g_id, p)] for p in all_candidates if (g_id, p) in self.assignments]
@@ -434,68 +569,91 @@ class SATSolver:
             
 
         # Mutual Exclusion
-        group_map = {g['id']: g for g in self.groups}
+        group_map = self.group_map
         
         # Build assignments_by_day for penalty logic
         self.assignments_by_day = {}
-        for group in self.groups:
+        for group in self.group_records:
              # Construct day_key consistent with penalty logic: G{Week}_{DayOfWeek}
              # Use ID splitting to be safe and consistent with loop below
-             parts = group['id'].split('_')
+             parts = group.id.split('_')
              if len(parts) >= 2:
                  # parts[0] is G{Week}, parts[1] is {Day}
                  d_key = f"{parts[0]}_{parts[1]}"
                  if d_key not in self.assignments_by_day:
                      self.assignments_by_day[d_key] = []
-                 self.assignments_by_day[d_key].append(group['id'])
+                 self.assignments_by_day[d_key].append(group.id)
 
         # Build preassignments map for penalty logic
         self.preassignments = set()
-        for group in self.groups:
-            if group.get('assignee'):
-                self.preassignments.add((group['id'], group['assignee']))
+        for group in self.group_records:
+            if group.assignee:
+                self.preassignments.add((group.id, group.assignee))
                 
-        for group in self.groups:
-            g_id = group['id']
-            manual_assignee = group.get('assignee')
+        for group in self.group_records:
+            g_id = group.id
+            manual_assignee = group.assignee
             
             if manual_assignee:
                  if (g_id, manual_assignee) in self.assignments:
                      self.model.Add(self.assignments[(g_id, manual_assignee)] == 1)
             
-            for excl in group.get('exclusive_groups', []):
+            for excl in group.exclusive_groups:
                 excl_id = excl[0]
                 if excl_id not in group_map: continue
                 
                 excl_group = group_map[excl_id]
                 
-                candidates_g = self.get_group_candidates(group)
-                candidates_e = self.get_group_candidates(excl_group)
-                common = set(candidates_g).intersection(candidates_e)
+                common = set(group.solver_candidates).intersection(excl_group.solver_candidates)
                 
                 for p in common:
                     if (g_id, p) in self.assignments and (excl_id, p) in self.assignments:
                         # Check for Manual Override
                         # If the user manually assigned 'p' to BOTH groups, we allow it.
-                        is_manual_g = (group.get('assignee') == p)
-                        is_manual_e = (excl_group.get('assignee') == p)
+                        is_manual_g = (group.assignee == p)
+                        is_manual_e = (excl_group.assignee == p)
                         
                         if is_manual_g and is_manual_e:
                             continue 
                             
                         self.model.Add(self.assignments[(g_id, p)] + self.assignments[(excl_id, p)] <= 1)
 
+        # Time-Overlap Cliques: at most one group of each clique per person
+        clique_groups = defaultdict(list)
+        for group in self.group_records:
+            for clique_id in group.overlap_cliques:
+                clique_groups[clique_id].append(group)
+
+        for clique_id, members in clique_groups.items():
+            people = set()
+            for group in members:
+                people.update(group.solver_candidates)
+            for p in people:
+                clique_vars = []
+                manual_var = None
+                for group in members:
+                    var = self.assignments.get((group.id, p))
+                    if var is None: continue
+                    # Manual Override: groups manually given to p together stay allowed,
+                    # one of them still excludes everything else in the clique
+                    if group.assignee == p:
+                        if manual_var is not None: continue
+                        manual_var = var
+                    clique_vars.append(var)
+                if len(clique_vars) > 1:
+                    self.model.AddAtMostOne(clique_vars)
+
         # 3. Soft Constraints (Min Effort)
+        profiler.start("Underworked")
         
         # Calculate Effort per Person
         # scaled_effort = floor(effort * 10)
         for person in all_persons:
             contributions = []
-            for group in self.groups:
-                if (group['id'], person) in self.assignments:
-                    g_effort_val = group.get('effort', 0)
-                    scaled_val = int(round(g_effort_val * 10))
-                    contributions.append(self.assignments[(group['id'], person)] * scaled_val)
+            for group in self.group_records:
+                if (group.id, person) in self.assignments:
+                    scaled_val = int(round(group.effort * 10))
+                    contributions.append(self.assignments[(group.id, person)] * scaled_val)
             
             if contributions:
                 self.model.Add(self.effort_vars[person] == sum(contributions))
@@ -512,23 +670,21 @@ class SATSolver:
 
 
         # 4. Objective Function & Penalty Tracking
-        objective_terms = []
-        all_cost_vars = [] # Track variables responsible for costs for live reporting
         
         P_UNASSIGNED = self.penalties.get_penalty_by_name("Unassigned Group")
         P_UNDERWORKED = self.penalties.get_penalty_by_name("Underworked Team Member (< Threshold)")
         
         # Term 1: Unassigned Groups
+        profiler.start("Unassigned")
         if P_UNASSIGNED > 0:
-            for group in self.groups:
-                objective_terms.append(self.unassigned_vars[group['id']] * P_UNASSIGNED)
-                all_cost_vars.append(self.unassigned_vars[group['id']])
+            for group in self.group_records:
+                add_cost("Unassigned Group", self.unassigned_vars[group.id], P_UNASSIGNED)
             
         # Term 2: Underworked People
+        profiler.start("Underworked")
         if P_UNDERWORKED > 0:
             for person in all_persons:
-                objective_terms.append(self.underworked_vars[person] * P_UNDERWORKED)
-                all_cost_vars.append(self.underworked_vars[person])
+                add_cost("Underworked Team Member (< Threshold)", self.underworked_vars[person], P_UNDERWORKED)
 
         # Term 3: Multi-Day Weekdays (e.g. Tue+Wed) -> "First Rule"
         P_MULTI_WEEKDAY = self.penalties.get_penalty_by_name("Multi-Day Weekdays (e.g. Tue+Wed)")
@@ -553,6 +709,7 @@ class SATSolver:
         P_TEACH_EQUALITY = self.penalties.get_penalty_by_name("Teaching/Assisting Equality")
         
         # --- Teaching/Assisting Preference Logic ---
+        profiler.start("Teaching")
         if P_TEACH_PREF > 0 or P_TEACH_EQUALITY > 0:
             # Shared: Identify Teaching/Assisting Groups and Candidates
             # 1. Group Classification
@@ -563,14 +720,13 @@ class SATSolver:
             capable_teaching = set()
             capable_assisting = set()
             
-            for group in self.groups:
-                fam = group.get('family', '')
-                if fam == 'Teaching':
-                    teaching_groups_ids.append(group['id'])
-                    capable_teaching.update(self.get_group_candidates(group))
-                elif fam == 'Assisting':
-                    assisting_groups_ids.append(group['id'])
-                    capable_assisting.update(self.get_group_candidates(group))
+            for group in self.group_records:
+                if group.family == 'Teaching':
+                    teaching_groups_ids.append(group.id)
+                    capable_teaching.update(group.solver_candidates)
+                elif group.family == 'Assisting':
+                    assisting_groups_ids.append(group.id)
+                    capable_assisting.update(group.solver_candidates)
 
             # --- Teaching/Assisting Preference Logic ---
             if P_TEACH_PREF > 0:
@@ -610,10 +766,8 @@ class SATSolver:
                         self.model.AddBoolAnd([has_teaching.Not(), has_assisting.Not()]).OnlyEnforceIf(is_full_bad)
                         self.model.AddBoolOr([has_teaching, has_assisting]).OnlyEnforceIf(is_full_bad.Not())
                         
-                        objective_terms.append(is_half_bad * P_HALF)
-                        objective_terms.append(is_full_bad * P_TEACH_PREF)
-                        all_cost_vars.append(is_half_bad)
-                        all_cost_vars.append(is_full_bad)
+                        add_cost("Teaching/Assisting Preference", is_half_bad, P_HALF)
+                        add_cost("Teaching/Assisting Preference", is_full_bad, P_TEACH_PREF)
                         
                         # Debug logic remains similar but simplified context
                         if person not in self.debug_vars: self.debug_vars[person] = {}
@@ -631,8 +785,7 @@ class SATSolver:
                         self.model.Add(has_assisting == 0).OnlyEnforceIf(is_bad)
                         self.model.Add(has_assisting == 1).OnlyEnforceIf(is_bad.Not())
                         
-                        objective_terms.append(is_bad * P_TEACH_PREF)
-                        all_cost_vars.append(is_bad)
+                        add_cost("Teaching/Assisting Preference", is_bad, P_TEACH_PREF)
                         
                         if person not in self.debug_vars: self.debug_vars[person] = {}
                         self.debug_vars[person]['teach_pref'] = {
@@ -696,8 +849,7 @@ class SATSolver:
                                  
                              final_cost_var = self.model.NewIntVar(0, max(costs), f"equality_final_cost_{fam_name}_{person}")
                              self.model.AddMultiplicationEquality(final_cost_var, [base_cost_var, has_auto])
-                             objective_terms.append(final_cost_var)
-                             all_cost_vars.append(final_cost_var)
+                             add_cost("Teaching/Assisting Equality", final_cost_var)
                              
                              if person not in self.debug_vars: self.debug_vars[person] = {}
                              if 'equality' not in self.debug_vars[person]: self.debug_vars[person]['equality'] = []
@@ -711,18 +863,19 @@ class SATSolver:
         # --- Role Diversity Logic ---
         # "For each defined family in groups we want each person to do at least one assignment 
         # (if they're marked as a candidate for any)"
+        profiler.start("Diversity")
         if P_DIVERSITY > 0:
             # 1. Group Groups by Family
             family_groups = {}
             family_candidates = {} # family -> set of persons capable
             
-            for group in self.groups:
-                fam = group.get('family', 'Unknown')
+            for group in self.group_records:
+                fam = group.family if group.family is not None else 'Unknown'
                 if fam not in family_groups:
                     family_groups[fam] = []
                     family_candidates[fam] = set()
-                family_groups[fam].append(group['id'])
-                family_candidates[fam].update(self.get_group_candidates(group))
+                family_groups[fam].append(group.id)
+                family_candidates[fam].update(group.solver_candidates)
             
             # 2. Collect Missed Families per Person
             person_missed_vars = {} # person -> list of bool vars (one per family)
@@ -778,8 +931,7 @@ class SATSolver:
                     div_cost_var = self.model.NewIntVar(0, max(costs), f"div_cost_{person}")
                     self.model.AddElement(missed_count, costs, div_cost_var)
                     
-                    objective_terms.append(div_cost_var)
-                    all_cost_vars.append(div_cost_var)
+                    add_cost("Role Diversity (Assignments in each capable family)", div_cost_var)
                     
                     # Save for debug reporting (override the dict logic partly or augment it?)
                     # We still keep 'diversity' dict for details, but maybe store cost var too
@@ -788,6 +940,7 @@ class SATSolver:
 
 
         # --- Cooldown Logic ---
+        profiler.start("Cooldown")
         # 1. Build Cooldown Graph (Directed: Earlier -> Later)
         cooldown_graph = {} # id -> list of next_ids
         
@@ -797,19 +950,17 @@ class SATSolver:
         # Capture pairwise vars for reporting
         self.cooldown_penalty_vars = {} # (person, rule_name) -> list of vars
         
-        for group in self.groups:
-            g_id = group['id']
+        for group in self.group_records:
+            g_id = group.id
             if g_id not in cooldown_graph: cooldown_graph[g_id] = []
             
             # Intra-Week Cooldowns (Handle separately as they are not "geometric" across weeks usually)
             if P_INTRA_COOLDOWN > 0:
-                for target in group.get('intra_cooldown_groups', []):
+                for target in self.get_intra_cooldown_targets(group):
                     t_id = target[0]
                     # Enforce ordering to avoid double counting
                     if g_id < t_id and t_id in self.group_map:
-                         candidates_g = set(self.get_group_candidates(group))
-                         candidates_t = set(self.get_group_candidates(self.group_map[t_id]))
-                         common = candidates_g.intersection(candidates_t)
+                         common = set(group.solver_candidates).intersection(set(self.group_map[t_id].solver_candidates))
                          
                          for person in common:
                              # Exemption Check: If BOTH are exempt (Manual/Prepass), skip penalty
@@ -824,20 +975,19 @@ class SATSolver:
                                  penalty_var = self.model.NewBoolVar(f'intra_pool_{g_id}_{t_id}_{person}')
                                  self.model.AddBoolAnd([var_g, var_t]).OnlyEnforceIf(penalty_var)
                                  self.model.AddBoolOr([var_g.Not(), var_t.Not()]).OnlyEnforceIf(penalty_var.Not())
-                                 objective_terms.append(penalty_var * P_INTRA_COOLDOWN)
-                                 all_cost_vars.append(penalty_var)
+                                 add_cost("Intra-Week Cooldown (Same Week)", penalty_var, P_INTRA_COOLDOWN)
                                  
                                  # Track
                                  if person not in self.debug_vars: self.debug_vars[person] = {}
                                  if 'intra_cooldown' not in self.debug_vars[person]: self.debug_vars[person]['intra_cooldown'] = []
                                  self.debug_vars[person]['intra_cooldown'].append({
                                      'var': penalty_var,
-                                     'details': f" Intra-week: {group['name']} & {self.group_map[t_id]['name']}"
+                                     'details': f" Intra-week: {group.name} & {self.group_map[t_id].name}"
                                  })
 
             # General Cooldowns (Adjacent Weeks) -> Build Graph
             if P_COOLDOWN > 0:
-                for target in group.get('cooldown_groups', []):
+                for target in self.get_cooldown_targets(group):
                     t_id = target[0]
                     if t_id in self.group_map:
                         # Directed Edge: Only add if g_id is "before" t_id (e.g. Week 15 -> Week 16)
@@ -847,9 +997,7 @@ class SATSolver:
                             cooldown_graph[g_id].append(t_id)
                             
                             # Add Base Pairwise Penalty (Length 2)
-                            candidates_g = set(self.get_group_candidates(group))
-                            candidates_t = set(self.get_group_candidates(self.group_map[t_id]))
-                            common = candidates_g.intersection(candidates_t)
+                            common = set(group.solver_candidates).intersection(set(self.group_map[t_id].solver_candidates))
                             
                             for person in common:
                                 # Exemption Check: If BOTH are exempt, skip penalty
@@ -864,8 +1012,7 @@ class SATSolver:
                                     penalty_var = self.model.NewBoolVar(f'pool_{g_id}_{t_id}_{person}')
                                     self.model.AddBoolAnd([var_g, var_t]).OnlyEnforceIf(penalty_var)
                                     self.model.AddBoolOr([var_g.Not(), var_t.Not()]).OnlyEnforceIf(penalty_var.Not())
-                                    objective_terms.append(penalty_var * P_COOLDOWN)
-                                    all_cost_vars.append(penalty_var)
+                                    add_cost("Cooldown (Adjacent Weeks)", penalty_var, P_COOLDOWN)
                                     
                                     # Track
                                     if person not in self.debug_vars: self.debug_vars[person] = {}
@@ -873,12 +1020,13 @@ class SATSolver:
                                     self.debug_vars[person]['cooldown'].append({
                                         'var': penalty_var,
                                         'cost': P_COOLDOWN,
-                                        'details': f"{group['name']} (W{group['week']}) & {self.group_map[t_id]['name']} (W{self.group_map[t_id]['week']})"
+                                        'details': f"{group.name} (W{group.week}) & {self.group_map[t_id].name} (W{self.group_map[t_id].week})"
                                     })
 
         # 2. Geometric Penalties (Streaks > 2)
         # Find paths of length 3, 4, 5
         # DFS to find chains
+        profiler.start("Chains")
         if P_COOLDOWN > 0:
             def find_chains(current_id, current_chain):
                 # current_chain contains [id1, id2, ..., current_id]
@@ -906,9 +1054,9 @@ class SATSolver:
                         
                         # Apply constraint for this specific person on this chain
                         # Need intersection of candidates for ALL groups in chain
-                        common = set(self.get_group_candidates(self.group_map[new_chain[0]]))
+                        common = set(self.group_map[new_chain[0]].solver_candidates)
                         for cid in new_chain[1:]:
-                             common.intersection_update(self.get_group_candidates(self.group_map[cid]))
+                             common.intersection_update(self.group_map[cid].solver_candidates)
                         
                         for person in common:
                             # Exemption Check: If ALL in chain are exempt, skip penalty
@@ -928,15 +1076,14 @@ class SATSolver:
                                 self.model.AddBoolAnd(vars_in_chain).OnlyEnforceIf(chain_var)
                                 self.model.AddBoolOr([v.Not() for v in vars_in_chain]).OnlyEnforceIf(chain_var.Not())
                                 
-                                objective_terms.append(chain_var * extra_cost)
-                                all_cost_vars.append(chain_var)
+                                add_cost("Cooldown (Adjacent Weeks)", chain_var, extra_cost)
                                 
                                 # Track
                                 if person not in self.debug_vars: self.debug_vars[person] = {}
                                 if 'cooldown' not in self.debug_vars[person]: self.debug_vars[person]['cooldown'] = []
                                 
                                 # Format details
-                                names = [f"W{self.group_map[cid]['week']}" for cid in new_chain]
+                                names = [f"W{self.group_map[cid].week}" for cid in new_chain]
                                 chain_str = " -> ".join(names)
                                 
                                 self.debug_vars[person]['cooldown'].append({
@@ -952,6 +1099,8 @@ class SATSolver:
             # Initiate DFS from all nodes
             for start_node in cooldown_graph:
                 find_chains(start_node, [start_node]) 
+        
+        profiler.start("Multi-Day")
         for person in all_persons:
             if person not in self.debug_vars:
                 self.debug_vars[person] = {}
@@ -970,13 +1119,13 @@ class SATSolver:
             # Hoist: Build Day -> Group Map ONCE
             day_to_group_ids = {} # day_key -> list of gids
             
-            for group in self.groups:
-                 parts = group['id'].split('_')
+            for group in self.group_records:
+                 parts = group.id.split('_')
                  if len(parts) >= 3:
                      day_key = f"{parts[0]}_{parts[1]}" # Week_Day
                      if day_key not in day_to_group_ids:
                          day_to_group_ids[day_key] = []
-                     day_to_group_ids[day_key].append(group['id'])
+                     day_to_group_ids[day_key].append(group.id)
 
             for person in all_persons:
                  # Gather days worked
@@ -1004,7 +1153,7 @@ class SATSolver:
                              inefficient_var = self.model.NewBoolVar(f"inefficient_{person}_{day_key}")
                              
                              # Count total tasks
-                             total_tasks = sum(self.assignments[(gid, person)] * self.group_map[gid].get('task_count', 1) 
+                             total_tasks = sum(self.assignments[(gid, person)] * self.group_map[gid].task_count 
                                              for gid in g_ids if (gid, person) in self.assignments)
                              
                              is_low_tasks = self.model.NewBoolVar(f"is_low_tasks_{person}_{day_key}")
@@ -1013,8 +1162,7 @@ class SATSolver:
                              
                              self.model.AddBoolOr([inefficient_var, worked_var.Not(), is_low_tasks.Not()])
                              
-                             objective_terms.append(inefficient_var * P_INEFFICIENT)
-                             all_cost_vars.append(inefficient_var)
+                             add_cost("Inefficient Day (< 2 Tasks)", inefficient_var, P_INEFFICIENT)
                      
                      days_worked_vars.append(worked_var)
                      
@@ -1077,7 +1225,7 @@ class SATSolver:
                                  if d_key in self.assignments_by_day:
                                      for g_id in self.assignments_by_day[d_key]:
                                          grp = self.group_map[g_id]
-                                         candidates = self.get_group_candidates(grp)
+                                         candidates = grp.solver_candidates
                                          
                                          if person in candidates:
                                              is_manual_intent = False
@@ -1087,10 +1235,7 @@ class SATSolver:
                                                  is_manual_intent = True
                                              
                                              # B. Priority (Filtered)
-                                             p_list = grp.get('filtered_priority_candidates_list')
-                                             if not p_list:
-                                                 p_list = grp.get('priority_candidates_list', [])
-                                             
+                                             p_list = grp.priority_candidates
                                              if p_list and person in p_list:
                                                  is_manual_intent = True
                                                  
@@ -1130,8 +1275,7 @@ class SATSolver:
                                  
                                  self.model.AddMultiplicationEquality(final_cost_var, [raw_cost_var, trigger])
 
-                             objective_terms.append(final_cost_var)
-                             all_cost_vars.append(final_cost_var)
+                             add_cost("Multi-Day Weekdays (e.g. Tue+Wed)", final_cost_var)
                              
                              self.debug_vars[person]['multi_weekday'].append({
                                  'week': w_str,
@@ -1158,13 +1302,13 @@ class SATSolver:
                      self.model.AddBoolAnd([has_weekday, has_sunday]).OnlyEnforceIf(multi_general)
                      self.model.AddBoolOr([has_weekday.Not(), has_sunday.Not()]).OnlyEnforceIf(multi_general.Not())
                      
-                     objective_terms.append(multi_general * P_MULTI_GENERAL)
-                     all_cost_vars.append(multi_general)
+                     add_cost("Multi-Day General (Weekday+Sunday)", multi_general, P_MULTI_GENERAL)
                      self.debug_vars[person]['multi_general'] = multi_general
         
                      self.debug_vars[person]['multi_general'] = multi_general
         
         # Term 10: Effort Equalization
+        profiler.start("Equalization")
         P_EQUALIZATION = self.penalties.get_penalty_by_name("Effort Equalization")
         
         if P_EQUALIZATION > 0:
@@ -1191,8 +1335,7 @@ class SATSolver:
                 cost_var = self.model.NewIntVar(0, max(cost_table), f"effort_cost_{person}")
                 self.model.AddElement(effort_var, cost_table, cost_var)
                 
-                objective_terms.append(cost_var * P_EQUALIZATION)
-                all_cost_vars.append(cost_var)
+                add_cost("Effort Equalization", cost_var, P_EQUALIZATION)
                 
                 # Debug
                 if person not in self.debug_vars: self.debug_vars[person] = {}
@@ -1219,21 +1362,21 @@ class SATSolver:
         # Actually solver likely checks `is_preferred_pair_split`.
         P_PAIR_SPLIT = self.penalties.get_penalty_by_name("Preferred Pair")
         
+        profiler.start("Preferred Pair")
         if P_PAIR_SPLIT > 0 and self.preferred_pairs:
             # 1. Group IDs by Logical Group (Name, Week, Day)
             logical_groups = {} # (Name, Week, Day) -> [GroupIDs]
-            for g in self.groups:
-                # Assuming standard group naming/ID structure isn't needed if we use attributes
-                key = (g['name'], g['week'], g['day'])
+            for g in self.group_records:
+                key = (g.name, g.week, g.day)
                 if key not in logical_groups:
                     logical_groups[key] = []
-                logical_groups[key].append(g['id'])
+                logical_groups[key].append(g.id)
             
             # 2. Iterate Pairs and Logical Groups
             for p1_name, p2_name in self.preferred_pairs:
                 # Verify names exist to avoid errors
                 if p1_name not in self.member_map or p2_name not in self.member_map:
-                    print(f"Warning: Preferred pair [{p1_name}, {p2_name}] contains unknown members.")
+                    self.log(f"Warning: Preferred pair [{p1_name}, {p2_name}] contains unknown members.")
                     continue
                     
                 for key, g_ids in logical_groups.items():
@@ -1274,8 +1417,7 @@ class SATSolver:
                     self.model.Add(p1_present != p2_present).OnlyEnforceIf(split_var)
                     self.model.Add(p1_present == p2_present).OnlyEnforceIf(split_var.Not())
                     
-                    objective_terms.append(split_var * P_PAIR_SPLIT)
-                    all_cost_vars.append(split_var)
+                    add_cost("Preferred Pair", split_var, P_PAIR_SPLIT)
                     
                     # Debug logic (attach to P1 for visibility)
                     if p1_name not in self.debug_vars: self.debug_vars[p1_name] = {}
@@ -1284,6 +1426,28 @@ class SATSolver:
                     # self.debug_vars[p1_name][f'split_{p2_name}'] = split_var
 
         self.model.Minimize(sum(objective_terms))
+        profiler.stop()
+        self.build_profile = profiler.report()
+        if self.events_enabled():
+            for section in self.build_profile["sections"]:
+                self.emit("stage", name=section["section"], **{k: v for k, v in section.items() if k != "section"})
+            self.emit("model_built", groups=len(self.group_records), **self.build_profile["totals"])
+        self.log("Model Build Profile:")
+        self.log(profiler.format_table())
+        if self.dump_model_stats:
+            self.build_profile["model_stats"] = self.model.ModelStats()
+            self.log(self.build_profile["model_stats"])
+
+        # Warm Start: Map the cached incumbent onto the rebuilt model by variable name.
+        # (Variable creation order follows set iteration, so indices can differ between runs.)
+        if cached and cached.get('solution'):
+            cached_model = cache.load_model(cache_key)
+            if cached_model is not None and len(cached_model.variables) == len(cached['solution']):
+                cached_values = {v.name: val for v, val in zip(cached_model.variables, cached['solution'])}
+                for idx, var_proto in enumerate(self.model.Proto().variables):
+                    if var_proto.name in cached_values:
+                        self.model.AddHint(self.model.GetIntVarFromProtoIndex(idx), cached_values[var_proto.name])
+                self.log(f"Cache hit: starting from cached incumbent (objective = {int(cached['objective'])}, bound = {int(cached['best_bound'])})")
 
         # 5. Solve
         solver = cp_model.CpSolver()
@@ -1291,16 +1455,77 @@ class SATSolver:
             solver.parameters.max_time_in_seconds = self.time_limit
         if log_search_progress:
             solver.parameters.log_search_progress = True
+            # To this instance's log, not the process's stdout
+            solver.parameters.log_to_stdout = False
+            solver.log_callback = self.log
+        if self.num_search_workers > 0:
+            solver.parameters.num_workers = self.num_search_workers
             
-        solution_printer = SolutionPrinter(all_cost_vars, callback=solution_callback)
-        status = solver.Solve(self.model, solution_printer)
+        solution_printer = SolutionPrinter(
+            all_cost_vars,
+            callback=solution_callback,
+            rule_costs=rule_costs,
+            interval=self.progress_interval,
+            progress_callback=progress_callback,
+            log=self.log,
+            emit=self.emit if self.events_enabled() else None
+        )
+        if self.events_enabled():
+            search_started = time.perf_counter()
+            solver.best_bound_callback = lambda bound: self.emit(
+                "bound", time=round(time.perf_counter() - search_started, 3), bound=bound)
+        with self._stop_lock:
+            if self._stop_requested:
+                # Stopped during the model build: still return a solution
+                solver.parameters.stop_after_first_solution = True
+            self._search = solver
+        try:
+            status = solver.Solve(self.model, solution_printer)
+        finally:
+            with self._stop_lock:
+                self._search = None
+        solution_printer.flush()
+        self.emit("stage", name="Search", seconds=round(solver.WallTime(), 4))
+        
+        has_solution = status == cp_model.OPTIMAL or status == cp_model.FEASIBLE
+        self.solve_stats = {
+            "status": solver.StatusName(status),
+            "objective": solver.ObjectiveValue() if has_solution else None,
+            "best_bound": solver.BestObjectiveBound() if has_solution else None,
+            "cached": False,
+            "stopped": self._stop_requested,
+            "stats": {
+                "wall_time": solver.WallTime(),
+                "user_time": solver.UserTime(),
+                "deterministic_time": solver.ResponseProto().deterministic_time,
+                "num_conflicts": solver.NumConflicts(),
+                "num_branches": solver.NumBranches(),
+                "num_booleans": solver.NumBooleans()
+            }
+        }
         
         if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
-            print(f"Solution Found! Status: {solver.StatusName(status)}")
-            print(f"Objective Value: {int(solver.ObjectiveValue())}")
-            return self.extract_solution(solver)
+            self.log(f"Solution Found! Status: {solver.StatusName(status)}")
+            self.log(f"Objective Value: {int(solver.ObjectiveValue())}")
+            assignments, penalties = self.extract_solution(solver)
+
+            # Only overwrite a cached entry if we did at least as well
+            if cache is not None and (not cached or solver.ObjectiveValue() <= cached.get('objective', float('inf'))):
+                # Hint is search input, not part of the model identity
+                self.model.ClearHints()
+                cache.put(
+                    cache_key,
+                    self.model,
+                    solver.StatusName(status),
+                    solver.ObjectiveValue(),
+                    solver.BestObjectiveBound(),
+                    list(solver.ResponseProto().solution),
+                    assignments,
+                    penalties
+                )
+            return assignments, penalties
         else:
-             print("No solution found.")
+             self.log("No solution found.")
              return {}, []
 
     def is_exempt_assignment(self, group, person):
@@ -1309,17 +1534,18 @@ class SATSolver:
         - Manual: Explicitly assigned.
         - Prepass: Priority candidate or Single candidate (Forced).
         """
+        group = Group.of(group)
         # Manual
-        if group.get('assignee') == person:
+        if group.assignee == person:
             return True
         
         # Priority
         # Use filtered priority list as that's what the solver sees as 'priority'
-        if person in group.get('filtered_priority_candidates_list', []):
+        if person in group.filtered_priority_candidates_list:
             return True
             
         # Forced (Single Candidate)
-        candidates = self.get_group_candidates(group)
+        candidates = group.solver_candidates
         if len(candidates) == 1 and candidates[0] == person:
             return True
             
@@ -1331,18 +1557,37 @@ class SATSolver:
         Optimization: If 'assignee' is set, return ONLY that person.
         Optimization: If 'filtered_priority_candidates_list' exists and is not empty, use ONLY that.
         Otherwise, use 'filtered_candidates_list'.
+        (Precomputed on decode as Group.solver_candidates.)
         """
-        # 1. Manual Assignment (Highest Priority)
-        m = group.get('assignee')
-        if m:
-            return [m]
-        
-        # 2. Filtered Priority List (Strict)
-        # Note: If this list exists, we ignore standard candidates completely.
-        # This prunes the search space significantly.
-        priority_candidates = group.get('filtered_priority_candidates_list', [])
-        if priority_candidates:
-            return list(set(priority_candidates))
-            
-        # 3. Standard Candidates
-        return list(set(group.get('filtered_candidates_list', [])))
+        return Group.of(group).solver_candidates
+
+    def family_week_groups(self, family, week):
+        """Groups of one (family, week), in input order."""
+        if self._family_week_index is None:
+            self._family_week_index = defaultdict(list)
+            for g in self.group_records:
+                self._family_week_index[(g.family, g.week)].append(g)
+        return self._family_week_index.get((family, week), [])
+
+    def get_cooldown_targets(self, group):
+        """
+        [id, name] links to the family's groups in adjacent weeks.
+        Step 03 writes them as [family, week] references ('cooldown_refs'), expanded here;
+        explicit 'cooldown_groups' lists (older files) are still honoured.
+        """
+        group = Group.of(group)
+        targets = list(group.cooldown_groups)
+        for family, week in group.cooldown_refs:
+            targets.extend([g.id, g.name] for g in self.family_week_groups(family, week))
+        return targets
+
+    def get_intra_cooldown_targets(self, group):
+        """Same as get_cooldown_targets for 'intra_cooldown_refs': the family's other-named groups of the week."""
+        group = Group.of(group)
+        targets = list(group.intra_cooldown_groups)
+        for family, week in group.intra_cooldown_refs:
+            targets.extend(
+                [g.id, g.name] for g in self.family_week_groups(family, week)
+                if g.id != group.id and g.name != group.name
+            )
+        return targets
@@ -0,0 +1,105 @@
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+
+def relative_gap(objective, bound):
+    """|objective - bound| relative to the objective (0.0 means proven optimal)."""
+    if objective is None or bound is None:
+        return None
+    return abs(objective - bound) / max(1.0, abs(objective))
+
+
+def trace_path(traces_dir, prefix):
+    """Unique per run: timestamp to the microsecond plus the process id."""
+    return Path(traces_dir) / f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{os.getpid()}.jsonl"
+
+
+def prune_traces(traces_dir, max_files):
+    """Keeps the max_files most recently written traces, deletes older ones."""
+    traces = sorted(Path(traces_dir).glob("*.jsonl"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in traces[max_files:]:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ConvergenceTrace:
+    """
+    Writes one JSON object per line describing how a solve converged:
+    - "run":      metadata written on open (prefix, solver settings, OR-Tools version).
+    - "solution": one per improving solution (time, objective, bound, per-rule costs, stats).
+    - "summary":  final status, gap and time-to-quality metrics.
+    """
+    def __init__(self, path, metadata=None):
+        self.path = path
+        self.solutions = []
+        self.started = time.time()
+        self._file = open(path, 'w', encoding='utf-8')
+        self._write({"event": "run", "started": self.started, **(metadata or {})})
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def record_solution(self, printer, breakdown=None, active_penalties=None):
+        """printer: the CpSolverSolutionCallback that found the solution."""
+        objective = printer.ObjectiveValue()
+        bound = printer.BestObjectiveBound()
+        record = {
+            "event": "solution",
+            "index": len(self.solutions) + 1,
+            "wall_time": printer.WallTime(),
+            "objective": objective,
+            "best_bound": bound,
+            "gap": relative_gap(objective, bound),
+            "active_penalties": active_penalties,
+            "breakdown": breakdown or {},
+            "stats": {
+                "num_conflicts": printer.NumConflicts(),
+                "num_branches": printer.NumBranches(),
+                "num_booleans": printer.NumBooleans(),
+                "deterministic_time": printer.DeterministicTime()
+            }
+        }
+        self.solutions.append(record)
+        self._write(record)
+
+    def summarize(self, final_stats=None):
+        """Time-to-quality metrics relative to the last (best) solution."""
+        final_stats = final_stats or {}
+        summary = {
+            "event": "summary",
+            "num_solutions": len(self.solutions),
+            "status": final_stats.get("status"),
+            "final_objective": final_stats.get("objective"),
+            "final_bound": final_stats.get("best_bound"),
+            "final_gap": relative_gap(final_stats.get("objective"), final_stats.get("best_bound")),
+            "time_to_first_solution": None,
+            "time_to_within_5pct": None,
+            "time_to_within_1pct": None,
+            "stats": final_stats.get("stats", {})
+        }
+        if not self.solutions:
+            return summary
+
+        final = self.solutions[-1]["objective"]
+        if summary["final_objective"] is None:
+            summary["final_objective"] = final
+        summary["time_to_first_solution"] = self.solutions[0]["wall_time"]
+
+        for key, tolerance in [("time_to_within_5pct", 0.05), ("time_to_within_1pct", 0.01)]:
+            for rec in self.solutions:
+                if abs(rec["objective"] - final) <= tolerance * max(1.0, abs(final)):
+                    summary[key] = rec["wall_time"]
+                    break
+        return summary
+
+    def close(self, final_stats=None):
+        summary = self.summarize(final_stats)
+        self._write(summary)
+        self._file.close()
+        return summary
@@ -1,8 +1,19 @@
 
-import pandas as pd
+import json
+import shutil
 import ssl
+import sys
 import time
 import random
+import urllib.request
+from pathlib import Path
+
+# Add project root to sys.path to allow running as script
+root_dir = str(Path(__file__).resolve().parent.parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from src.workbook_cache import WorkbookCache, read_sheets
 
 # Define the Google Sheet URL
 SHEET_ID = "1s1hdDGjMQTjT1P5zO3xMX__hM1V-5Y9rEGt8uUg5_B0" 
@@ -16,72 +27,115 @@ import sys
 # "Task Availability" and "Calendar Availability" are fixed. 
 # The third one is dynamic.
 
-def download_data(target_month_str=None):
+# Downloaded workbooks are kept in data/cache/workbooks, keyed by content hash.
+# By default every run downloads, so a Download after editing the sheet sees the edit (sheets of an
+# unchanged workbook are still not parsed again). penalty_config.json "workbook_cache_minutes" > 0
+# reuses a download younger than that instead (e.g. preparing several months in a row); --refresh ignores it.
+DEFAULT_CACHE_MINUTES = 0
+
+def parse_args(argv):
+    """(month string or None, local workbook path or None, refresh) from the command line."""
+    args = list(argv)
+    workbook_path = None
+    refresh = False
+    if "--refresh" in args:
+        args.remove("--refresh")
+        refresh = True
+    if "--workbook" in args:
+        i = args.index("--workbook")
+        workbook_path = args[i + 1] if i + 1 < len(args) else None
+        del args[i:i + 2]
+    # Expected format "January 2026" (or split: script.py January 2026)
+    target_month_str = " ".join(args) if args else None
+    return target_month_str, workbook_path, refresh
+
+def cache_minutes(data_dir):
+    config_path = data_dir / "penalty_config.json"
+    if config_path.exists():
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get("workbook_cache_minutes", DEFAULT_CACHE_MINUTES)
+        except (OSError, ValueError):
+            pass
+    return DEFAULT_CACHE_MINUTES
+
+def download_workbook(cache, max_age):
+    """Key of the workbook to use: a recent cached download, else a fresh one streamed to the cache."""
+    key = cache.latest(max_age) if max_age > 0 else None
+    if key:
+        print(f"Using workbook downloaded less than {max_age // 60} minutes ago ({key[:12]})")
+        return key
+    
+    # Add cache busting to force fresh download
+    timestamp = int(time.time())
+    url = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=xlsx&cache_bust={timestamp}"
+    print(f"Downloading data from {url}...")
+    
+    # Bypass SSL verification
+    ctx = ssl.create_default_context()
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE
+    
+    # Streamed to disk in chunks; the workbook is never held in memory whole
+    with urllib.request.urlopen(url, context=ctx) as response:
+        key = cache.fetch(response, url)
+    print(f"Downloaded to {cache.workbook_path(key)}")
+    return key
+
+def download_data(target_month_str=None, workbook_path=None, refresh=False, chain=True):
+    """
+    Saves the three sheets to data/raw and (chain) runs step 02 on them.
+    Returns False if the download or parse failed.
+    """
     if target_month_str is None:
-        if len(sys.argv) > 1:
-            target_month_str = sys.argv[1] # Expected format "January 2026" or "March 2026"
-            # If arguments are split (e.g. python script.py January 2026)
-            if len(sys.argv) > 2:
-                target_month_str = f"{sys.argv[1]} {sys.argv[2]}"
-        else:
+        target_month_str, arg_workbook, arg_refresh = parse_args(sys.argv[1:])
+        workbook_path = workbook_path or arg_workbook
+        refresh = refresh or arg_refresh
+        if target_month_str is None:
             target_month_str = "January 2026"
 
     print(f"Target Sheet: {target_month_str}")
     
     sheet_names = ["Task Availability", "Calendar Availability", target_month_str]
+    data_dir = Path("data")
 
     try:
-        # Add cache busting to force fresh download
-        timestamp = int(time.time())
-        url = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=xlsx&cache_bust={timestamp}"
-        print(f"Downloading data from {url}...")
-        
-        # Bypass SSL verification
-        ctx = ssl.create_default_context()
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
-        
-        # Explicit Download to temp file
-        import tempfile
-        import os
-        import urllib.request
+        cache = WorkbookCache(data_dir / "cache" / "workbooks")
+        if workbook_path:
+            # Offline: a local .xlsx instead of the download
+            key = cache.add_file(workbook_path)
+            print(f"Using local workbook {workbook_path} ({key[:12]})")
+        else:
+            key = download_workbook(cache, 0 if refresh else cache_minutes(data_dir) * 60)
         
-        with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as tmp_file:
-            temp_path = tmp_file.name
-            
-        try:
-            # Open URL manually with context
-            with urllib.request.urlopen(url, context=ctx) as response, open(temp_path, 'wb') as out_file:
-                 out_file.write(response.read())
-            
-            print(f"Downloaded to temporary file: {temp_path}")
-            
-            # Read the Excel file from local path
-            data = pd.read_excel(temp_path, sheet_name=sheet_names, engine='openpyxl')
-            
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-                pass # Clean up handled by os.remove
-
+        # Parse only the sheets not already parsed from this exact workbook, in one read-only pass
+        missing = [name for name in sheet_names if not cache.sheet_path(key, name).exists()]
+        if missing:
+            data = read_sheets(cache.workbook_path(key), missing)
+            for name, df in data.items():
+                print(f"\n--- {name} ---")
+                print(f"Shape: {df.shape}")
+                sheet_path = cache.sheet_path(key, name)
+                sheet_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = sheet_path.with_suffix('.csv.tmp')
+                df.to_csv(tmp_path, index=False, encoding='utf-8')
+                tmp_path.replace(sheet_path)
         
-        for name, df in data.items():
-            print(f"\n--- {name} ---")
-            # print(df.head())
-            print(f"Shape: {df.shape}")
-            
-            # Save to CSV for verification
-            from pathlib import Path
-            output_dir = Path("data") / "raw"
-            output_dir.mkdir(parents=True, exist_ok=True)
-
+        output_dir = data_dir / "raw"
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for name in sheet_names:
+            if name not in missing:
+                print(f"\n--- {name} --- (parsed before, from cache)")
             filename = output_dir / f"{name.replace(' ', '_').lower()}.csv"
-            df.to_csv(filename, index=False, encoding='utf-8')
+            shutil.copyfile(cache.sheet_path(key, name), filename)
             print(f"Saved to {filename}")
             
     except Exception as e:
         print(f"Error downloading data: {e}")
-        return # Stop if download fails
+        return False # Stop if download fails
+
+    if not chain:
+        return True
 
     # --- Chain Step 2: Convert Data ---
     print("\n--- Running Step 2: Convert Data ---")
@@ -108,6 +162,7 @@ def download_data(target_month_str=None):
              print(f"Error running Step 2: {e}")
     except Exception as e:
         print(f"Error running Step 2: {e}")
+    return True
 
 if __name__ == "__main__":
     download_data()
@@ -1,8 +1,20 @@
 
 import pandas as pd
 import json
+import sys
 from pathlib import Path
 import numpy as np
+import bisect
+import hashlib
+
+# Add project root to sys.path to allow running as script
+root_dir = str(Path(__file__).resolve().parent.parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from src.person_index import PersonIndex
+from src.time_slots import AvailabilityIndex, parse_slot, format_slot, merge_intervals
+from src.interchange import data_format, load_data, save_data
 
 
 def process_task_availability(task_df):
@@ -39,213 +51,214 @@ def process_calendar_availability(cal_df):
     dates_row = cal_df.iloc[4]
     days_row = cal_df.iloc[5]
     
-    # Extract data part (from row 7 onwards)
-    data_df = cal_df.iloc[6:].reset_index(drop=True)
+    col_start_index = 4
+    num_cols = cal_df.shape[1]
     
     calendar_data = {}
     
-    # Propagation Logic
-    PROPAGATION_MAP = {
-        "All": ["All", "19-00", "19-22", "20-22", "21-00", "19-21", "19-20", "20-21", "21-22", "22-00"],
-        "19-00": ["19-00", "19-22", "20-22", "21-00", "19-21", "19-20", "20-21", "21-22", "22-00"],
-        "19-22": ["19-22", "19-21", "20-22", "19-20", "20-21", "21-22"],
-        "19-21": ["19-21", "19-20", "20-21"],
-        "19-20": ["19-20"],
-        "20-22": ["20-22", "20-21", "21-22"],
-        "21-00": ["21-00", "21-22", "22-00"],
-        "20-21": ["20-21"],
-        "21-22": ["21-22"],
-        "22-00": ["22-00"],
-    }
-
-    col_start_index = 4
-    num_cols = cal_df.shape[1]
+    # 1. Column metadata: the week label is only written on the first column of each week
+    weeks = weeks_row.iloc[col_start_index:num_cols].ffill()
+    days = days_row.iloc[col_start_index:num_cols]
+    dates = dates_row.iloc[col_start_index:num_cols]
     
-    current_week = None
+    # Skip if no valid week/day info
+    valid = weeks.notna() & weeks.map(bool) & days.notna()
+    valid_positions = [i for i, ok in enumerate(valid.tolist()) if ok]
+    col_weeks = weeks.iloc[valid_positions].tolist()
+    col_days = days.iloc[valid_positions].tolist()
     
-    for col_idx in range(col_start_index, num_cols):
-        # Get metadata for this column
-        week_val = weeks_row.iloc[col_idx]
-        if pd.notna(week_val):
-            current_week = week_val
-            
-        date_val = dates_row.iloc[col_idx]
-        if pd.notna(date_val):
-            date_val = pd.to_datetime(date_val).strftime('%Y-%m-%d')
-        day_val = days_row.iloc[col_idx]
-        
-        # Skip if no valid week/day info
-        if not current_week or pd.isna(day_val):
-            continue
-            
-        # Initialize structure
-        if current_week not in calendar_data:
-            calendar_data[current_week] = {}
-        
-        if day_val not in calendar_data[current_week]:
-            calendar_data[current_week][day_val] = {
+    # Initialize structure in column order (the first column of a day provides its date)
+    for pos, week_val, day_val in zip(valid_positions, col_weeks, col_days):
+        if week_val not in calendar_data:
+            calendar_data[week_val] = {}
+        if day_val not in calendar_data[week_val]:
+            date_val = dates.iloc[pos]
+            if pd.notna(date_val):
+                date_val = pd.to_datetime(date_val).strftime('%Y-%m-%d')
+            calendar_data[week_val][day_val] = {
                 "date": date_val,
-                "time_slots": {}
+                "intervals": {}
             }
-            
-        # Collect candidates for this slot
-        for _, row in data_df.iterrows():
-            candidate_name = row[1] # Name column
-            availability = row[col_idx]
-            
-            if pd.isna(availability):
-                continue
-                
-            # Normalize availability string
-            raw_slot = str(availability).strip()
-            
-            # Get propagated slots
-            target_slots = PROPAGATION_MAP.get(raw_slot, [])
-            if not target_slots:
-                continue
-
-            for slot in target_slots:
-                if slot not in calendar_data[current_week][day_val]["time_slots"]:
-                     calendar_data[current_week][day_val]["time_slots"][slot] = []
-                calendar_data[current_week][day_val]["time_slots"][slot].append(candidate_name)
     
-    # Sort time slots for consistency
-    for week_key in calendar_data:
-        for day_key in calendar_data[week_key]:
-            slots = calendar_data[week_key][day_key]["time_slots"]
-            # Sort keys: "All" first/last or just alphabetical? 
-            # Alphabetical: 20-21, 20-22, 21-00, 21-22, 22-00, All
-            # This seems consistent.
-            sorted_slots = dict(sorted(slots.items()))
-            calendar_data[week_key][day_key]["time_slots"] = sorted_slots
-
-    return calendar_data
-
-def process_schedule(jan_df, tasks_data, calendar_data):
-    jan_tasks_data = []
-    occurrence_tracker = {}
+    if not valid_positions:
+        return calendar_data
     
-    # helper structures for ID generation
-    # key: (week, day) -> value: {task_name: task_num}
-    daily_task_registry = {} 
+    # 2. Melt the data part (from row 7 onwards) into one row per filled cell, column-major
+    # so that names keep the column -> row order of the sheet
+    data_df = cal_df.iloc[6:, [col_start_index + pos for pos in valid_positions]]
+    values = data_df.to_numpy(dtype=object).T # (columns, people)
+    names = cal_df.iloc[6:, 1].to_numpy(dtype=object)
+    col_pos, row_pos = np.nonzero(pd.notna(values))
     
-    # Map strict day names to numbers
-    DAY_NUM_MAP = {
-        "Monday": 1, "Tuesday": 2, "Wednesday": 3, "Thursday": 4,
-        "Friday": 5, "Saturday": 6, "Sunday": 7
-    }
+    long_df = pd.DataFrame({
+        "col": col_pos,
+        "row": row_pos,
+        "raw_slot": pd.Series(values[col_pos, row_pos], dtype=object).astype(str).str.strip()
+    })
+    
+    # 3. Parse each distinct value once (values that are not a time range drop out)
+    spans = {v: parse_slot(v) for v in long_df["raw_slot"].unique()}
+    long_df["span"] = long_df["raw_slot"].map(spans)
+    long_df = long_df[long_df["span"].notna() & pd.notna(names[long_df["row"].to_numpy()])]
+    
+    # 4. Collect intervals per (week, day, person), in order of first appearance
+    col_weeks = np.array(col_weeks, dtype=object)
+    col_days = np.array(col_days, dtype=object)
+    person_spans = {}
+    for week_val, day_val, name, span in zip(
+        col_weeks[long_df["col"].to_numpy()], col_days[long_df["col"].to_numpy()],
+        names[long_df["row"].to_numpy()], long_df["span"]
+    ):
+        person_spans.setdefault((week_val, day_val, name), []).append(span)
+    
+    # 5. One merged interval list per person ("19-21" and "20-22" -> "19-22")
+    for (week_val, day_val, name), person_intervals in person_spans.items():
+        calendar_data[week_val][day_val]["intervals"][name] = [format_slot(iv) for iv in merge_intervals(person_intervals)]
+    
+    return calendar_data
 
-    # Day mapping (Full to Short) for Calendar Lookup
-    DAY_SHORT_MAP = {
-        "Monday": "Mon", "Tuesday": "Tue", "Wednesday": "Wed", "Thursday": "Thu",
-        "Friday": "Fri", "Saturday": "Sat", "Sunday": "Sun"
-    }
+# Map strict day names to numbers
+DAY_NUM_MAP = {
+    "Monday": 1, "Tuesday": 2, "Wednesday": 3, "Thursday": 4,
+    "Friday": 5, "Saturday": 6, "Sunday": 7
+}
 
-    # Create a map for quick task capability lookup
-    task_candidate_map = {t['name']: set(t['candidates']) for t in tasks_data}
-
-    for _, row in jan_df.iterrows():
-        # Clean data
-        week = row.get('Week')
-        if pd.notna(week) and isinstance(week, float) and week.is_integer():
-            week = int(week)
-            
-        day = row.get('Day')
-        time_slot = row.get('Time')
-        name = row.get('TODO')
-        assignee = row.get('Assignee')
-        effort_val = row.get('EFFORT')
-        
-        # Handle NaNs
-        if pd.isna(assignee): assignee = None
-        if pd.isna(day): day = None
-        if pd.isna(time_slot): time_slot = None
-        
-        effort = 0.0
+# Day mapping (Full to Short) for Calendar Lookup
+DAY_SHORT_MAP = {
+    "Monday": "Mon", "Tuesday": "Tue", "Wednesday": "Wed", "Thursday": "Thu",
+    "Friday": "Fri", "Saturday": "Sat", "Sunday": "Sun"
+}
+
+def clean_week(week):
+    # 18.0 -> 18 (pandas reads the Week column as float when it has blanks)
+    if pd.notna(week) and isinstance(week, float) and week.is_integer():
+        return int(week)
+    return week
+
+def week_number(week):
+    return int(week) if (week is not None and week != "") else 0
+
+def schedule_columns(jan_df):
+    """
+    Cleaned columns of the month sheet for rows with a task name (empty rows are skipped).
+    Returns a DataFrame (object dtype, original row order) with:
+    row, week, day, time_slot, name, assignee, effort, task_norm, week_num, day_num.
+    row is the 0-based position of the row in the sheet.
+    """
+    names_mask = jan_df['TODO'].notna() if 'TODO' in jan_df.columns else pd.Series(False, index=jan_df.index)
+    rows = jan_df.loc[names_mask]
+    
+    def values(col, na_to_none=False):
+        if col not in rows.columns:
+            return [None] * len(rows)
+        series = rows[col]
+        if na_to_none:
+            series = series.astype(object).where(series.notna(), None)
+        return series.tolist()
+    
+    def parse_effort(effort_val):
         if pd.notna(effort_val):
             try:
-                effort = float(effort_val)
+                return float(effort_val)
             except ValueError:
-                effort = 0.0
-            
-        # Skip empty task names
-        if pd.isna(name): continue
-        
-        # --- ID Generation Logic ---
-        week_num = int(week) if (week is not None and week != "") else 0
-        day_num = DAY_NUM_MAP.get(day, 0)
-        
-        # Determine Task Num for this (Week, Day) context
-        context_key = (week_num, day_num)
-        if context_key not in daily_task_registry:
-            daily_task_registry[context_key] = {}
-        
-        task_norm_name = str(name).strip()
-        
-        if task_norm_name not in daily_task_registry[context_key]:
-            daily_task_registry[context_key][task_norm_name] = len(daily_task_registry[context_key]) + 1
-            
-        task_num = daily_task_registry[context_key][task_norm_name]
+                return 0.0
+        return 0.0
+    
+    week = [clean_week(w) for w in values('Week')]
+    names = values('TODO')
+    
+    # Handle NaNs
+    cols = pd.DataFrame({
+        "row": np.flatnonzero(names_mask.to_numpy()).tolist(),
+        "week": week,
+        "day": values('Day', na_to_none=True),
+        "time_slot": values('Time', na_to_none=True),
+        "name": names,
+        "assignee": values('Assignee', na_to_none=True),
+        "effort": [parse_effort(e) for e in values('EFFORT')],
+        "task_norm": [str(n).strip() for n in names],
+        "week_num": [week_number(w) for w in week],
+    }, dtype=object)
+    cols["day_num"] = [DAY_NUM_MAP.get(d, 0) for d in cols["day"]]
+    return cols
 
-        # Key for repetition tracking
-        key = (week, day, time_slot, name)
-        
-        if key not in occurrence_tracker:
-            occurrence_tracker[key] = 0
-        occurrence_tracker[key] += 1
-        
-        repeat_index = occurrence_tracker[key]
-        
-        # Generate ID String: T{Week}_{Day}_{TaskNum}_{Repeat}
-        task_id = f"T{week_num}_{day_num}_{task_num}_{repeat_index}"
+def assign_task_ids(cols):
+    """
+    Adds task_num, repeat_index and id (T{Week}_{Day}_{TaskNum}_{Repeat}) to schedule_columns() output.
+    - task_num: order of first appearance of the (stripped) task name within its (week_num, day_num).
+    - repeat_index: running count of the raw (week, day, time_slot, name) combination.
+    """
+    context = ["week_num", "day_num"]
+    first_seen = cols.drop_duplicates(context + ["task_norm"])[context + ["task_norm"]].copy()
+    first_seen["task_num"] = first_seen.groupby(context, sort=False).cumcount() + 1
+    task_num = cols[context + ["task_norm"]].merge(first_seen, on=context + ["task_norm"], how="left")["task_num"]
+    
+    cols["task_num"] = task_num.to_numpy()
+    cols["repeat_index"] = (cols.groupby(["week", "day", "time_slot", "name"], sort=False, dropna=False).cumcount() + 1).to_numpy()
+    cols["id"] = [
+        f"T{w}_{d}_{t}_{r}"
+        for w, d, t, r in zip(cols["week_num"], cols["day_num"], cols["task_num"].tolist(), cols["repeat_index"].tolist())
+    ]
+    return cols
 
-        # --- Candidates Intersection Logic ---
-        eligible_candidates = []
-        
-        # 1. Get candidates capable of doing this task
-        capable_candidates = task_candidate_map.get(task_norm_name, set())
-        
-        if day is None:
-             eligible_candidates = list(capable_candidates)
-             eligible_candidates.sort()
+def task_row_ids(cols, row_count):
+    """Task ID per sheet row (None for rows without a task), from assign_task_ids() output."""
+    row_ids = [None] * row_count
+    for row, task_id in zip(cols["row"], cols["id"]):
+        row_ids[row] = task_id
+    return row_ids
+
+def file_digest(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+def process_schedule(jan_df, tasks_data, calendar_data, cols=None):
+    # Capability and availability as bitmasks over one person registry
+    availability_index = AvailabilityIndex(calendar_data)
+    person_index = PersonIndex.from_sources((), (c for t in tasks_data for c in t['candidates']), availability_index.all_names())
+    availability_index.person_index = person_index
+    task_candidate_map = {t['name']: person_index.encode(t['candidates']) for t in tasks_data}
+    
+    # 1. Columnar cleaning and ID generation (callers that also need the row map pass cols in)
+    if cols is None:
+        cols = assign_task_ids(schedule_columns(jan_df))
+    
+    # 2. Availability lookup key per row (None when week/time is missing)
+    week_keys = {}
+    lookup_keys = []
+    for w, d, t in zip(cols["week"], cols["day"], cols["time_slot"]):
+        if w and t:
+            if w not in week_keys:
+                week_keys[w] = f"Week {w}"
+            lookup_keys.append((week_keys[w], DAY_SHORT_MAP.get(d, d), str(t).strip()))
         else:
-            # 2. Get candidates available at this time
-            available_candidates = set()
-            
-            if week and time_slot:
-                week_key = f"Week {week}"
-                short_day = DAY_SHORT_MAP.get(day, day)
-                
-                if week_key in calendar_data:
-                    week_data = calendar_data[week_key]
-                    if short_day in week_data:
-                        day_data = week_data[short_day]
-                        if "time_slots" in day_data:
-                             normalized_slot = str(time_slot).strip()
-                             if normalized_slot in day_data["time_slots"]:
-                                 available_candidates = set(day_data["time_slots"][normalized_slot])
-            
-            # 3. Intersect
-            if capable_candidates and available_candidates:
-                eligible_candidates = list(capable_candidates.intersection(available_candidates))
-            elif not capable_candidates:
-                 pass
-            elif not available_candidates:
-                 pass
-
-            # Force Assignee Override: If manually assigned, they MUST be a candidate
-            if assignee and assignee not in eligible_candidates:
-                # Add if they are at least technically capable (in task definition)? 
-                # Or force even if not capable? 
-                # User request: "Manual assignments... take precedent over time/task unavailability"
-                # This implies "time" (available) and "task" (capable?) or just "task unavailability" meaning "busy elsewhere"?
-                # Usually "task unavailability" implies capability.
-                # But safer to assume if user types a name, they want that person.
-                eligible_candidates.append(assignee)
-            
-            eligible_candidates.sort()
-
-        task_entry = {
+            lookup_keys.append(None)
+    
+    # 3. Candidates Intersection Logic (bitwise), decoded once per distinct (task, availability slot).
+    # Decoded lists are sorted, so per row only a manual assignee has to be inserted.
+    eligible_cache = {}
+    def eligible_for(task_norm_name, day, lookup_key):
+        cache_key = (task_norm_name, day is None, lookup_key)
+        if cache_key not in eligible_cache:
+            capable_candidates = task_candidate_map.get(task_norm_name, 0)
+            if day is None:
+                eligible_mask = capable_candidates
+            else:
+                eligible_mask = capable_candidates & availability_index.mask(*lookup_key) if lookup_key else 0
+            eligible_cache[cache_key] = person_index.decode(eligible_mask)
+        return eligible_cache[cache_key]
+    
+    jan_tasks_data = []
+    for task_id, name, repeat_index, week, day, time_slot, assignee, effort, task_norm_name, lookup_key in zip(
+        cols["id"], cols["name"], cols["repeat_index"].tolist(), cols["week"], cols["day"],
+        cols["time_slot"], cols["assignee"], cols["effort"], cols["task_norm"], lookup_keys
+    ):
+        eligible_candidates = list(eligible_for(task_norm_name, day, lookup_key))
+        # Force Assignee Override: If manually assigned, they MUST be a candidate
+        # ("Manual assignments... take precedent over time/task unavailability")
+        if day is not None and assignee and assignee not in eligible_candidates:
+            bisect.insort(eligible_candidates, assignee)
+        
+        jan_tasks_data.append({
             "id": task_id,
             "name": name,
             "repeat_index": repeat_index,
@@ -255,52 +268,46 @@ def process_schedule(jan_df, tasks_data, calendar_data):
             "assignee": assignee,
             "candidates": eligible_candidates,
             "effort": effort
-        }
-        jan_tasks_data.append(task_entry)
+        })
         
     return jan_tasks_data
 
-import sys
-
-def convert_data(target_month=None):
-    base_dir = Path(".")
-    raw_dir = base_dir / "data" / "raw"
-    processed_dir = base_dir / "data" / "processed"
-    processed_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Determine Target Month
-    if target_month is None:
-        if len(sys.argv) > 1:
-            target_month = sys.argv[1].lower().replace(" ", "_")
-        else:
-             target_month = "january_2026" # Default
-             
-    print(f"Target Month: {target_month}")
+def load_config(base_dir):
+    config_path = base_dir / "data" / "penalty_config.json"
+    if config_path.exists():
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
 
-    # --- Process Task Availability ---
+def convert_task_availability(raw_dir, processed_dir, fmt):
     print("Processing Task Availability...")
     task_df = pd.read_csv(raw_dir / "task_availability.csv", encoding='utf-8')
     tasks_data = process_task_availability(task_df)
 
     # Save tasks.json
     tasks_output_path = processed_dir / "tasks.json"
-    with open(tasks_output_path, "w", encoding='utf-8') as f:
-        json.dump(tasks_data, f, indent=4, ensure_ascii=False)
+    save_data(tasks_data, tasks_output_path, fmt, export_json=True)
     print(f"Saved tasks to {tasks_output_path}")
+    return tasks_data
 
-    # --- Process Calendar Availability ---
+def convert_calendar_availability(raw_dir, processed_dir, fmt):
     print("Processing Calendar Availability...")
     cal_df = pd.read_csv(raw_dir / "calendar_availability.csv", header=None, encoding='utf-8')
     calendar_data = process_calendar_availability(cal_df)
     
     # Save calendar.json
     calendar_output_path = processed_dir / "calendar.json"
-    with open(calendar_output_path, "w", encoding='utf-8') as f:
-        json.dump(calendar_data, f, indent=4, ensure_ascii=False)
+    save_data(calendar_data, calendar_output_path, fmt, export_json=True)
         
     print(f"Saved calendar to {calendar_output_path}")
+    return calendar_data
 
-    # --- Process Target Schedule ---
+def convert_schedule(target_month, raw_dir, processed_dir, fmt, tasks_data=None, calendar_data=None):
+    """
+    {target_month}.csv -> {target_month}_tasks.json and the row map.
+    tasks_data / calendar_data default to the saved tasks.json / calendar.json.
+    Returns False if the month's CSV does not exist.
+    """
     print(f"Processing {target_month} Schedule...")
     input_csv = raw_dir / f"{target_month}.csv"
     
@@ -310,16 +317,60 @@ def convert_data(target_month=None):
         found = list(raw_dir.glob("*_20*.csv"))
         if found:
             print(f"Found similar files: {[f.name for f in found]}")
-        return
+        return False
+
+    if tasks_data is None:
+        tasks_data = load_data(processed_dir / "tasks.json")
+    if calendar_data is None:
+        calendar_data = load_data(processed_dir / "calendar.json")
 
     jan_df = pd.read_csv(input_csv, encoding='utf-8')
-    jan_tasks_data = process_schedule(jan_df, tasks_data, calendar_data)
+    cols = assign_task_ids(schedule_columns(jan_df))
+    jan_tasks_data = process_schedule(jan_df, tasks_data, calendar_data, cols)
 
     # Save
     yan_output_path = processed_dir / f"{target_month}_tasks.json"
-    with open(yan_output_path, "w", encoding='utf-8') as f:
-        json.dump(jan_tasks_data, f, indent=4, ensure_ascii=False)
+    save_data(jan_tasks_data, yan_output_path, fmt, export_json=True)
     print(f"Saved monthly schedule to {yan_output_path}")
 
+    # Row -> task ID map for step 05, so the export never has to re-derive IDs.
+    # The digest lets step 05 notice a raw CSV that changed after this run.
+    task_rows = {
+        "source": input_csv.name,
+        "source_sha256": file_digest(input_csv),
+        "task_ids": task_row_ids(cols, len(jan_df))
+    }
+    task_rows_path = processed_dir / f"{target_month}_task_rows.json"
+    save_data(task_rows, task_rows_path, fmt, export_json=True)
+    print(f"Saved row map to {task_rows_path}")
+    return True
+
+def convert_data(target_month=None):
+    base_dir = Path(".")
+    raw_dir = base_dir / "data" / "raw"
+    processed_dir = base_dir / "data" / "processed"
+    processed_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Determine Target Month
+    if target_month is None:
+        if len(sys.argv) > 1:
+            target_month = sys.argv[1].lower().replace(" ", "_")
+        else:
+             target_month = "january_2026" # Default
+             
+    print(f"Target Month: {target_month}")
+
+    # Interchange format of the outputs (penalty_config.json "interchange_format")
+    fmt = data_format(load_config(base_dir))
+
+    # --- Process Task Availability ---
+    tasks_data = convert_task_availability(raw_dir, processed_dir, fmt)
+
+    # --- Process Calendar Availability ---
+    calendar_data = convert_calendar_availability(raw_dir, processed_dir, fmt)
+
+    # --- Process Target Schedule ---
+    convert_schedule(target_month, raw_dir, processed_dir, fmt, tasks_data, calendar_data)
+
 if __name__ == "__main__":
     convert_data()
@@ -1,7 +1,19 @@
+import hashlib
 import json
 import pathlib
+import sys
 from collections import defaultdict
 
+# Add project root to sys.path to allow running as script
+root_dir = str(pathlib.Path(__file__).resolve().parent.parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from src.person_index import PersonIndex
+from src.time_slots import parse_slot
+from src.interchange import data_format, data_path, loads, load_data, save_data
+from src.records import decode_tasks
+
 def load_json(path):
     with open(path, 'r', encoding='utf-8') as f:
         return json.load(f)
@@ -11,36 +23,51 @@ def save_json(data, path):
         json.dump(data, f, indent=4, ensure_ascii=False)
 
 
-def process_groups(tasks_list, task_families, team_members):
+def process_groups(tasks_list, task_families, team_members, detect_overlaps=True):
+    family_groups, standalone_groups, group_spans = build_groups(tasks_list, task_families, team_members)
+    groups_output = family_groups + standalone_groups
+    link_groups(groups_output, task_families, group_spans, detect_overlaps)
+    return groups_output
+
+def build_groups(tasks_list, task_families, team_members):
+    """
+    Creates the groups of every (week, day) context, without links.
+    Everything here depends only on the context's own tasks (IDs are numbered per context).
+    Returns (family_groups, standalone_groups, group_spans); group_spans maps group ID -> task intervals.
+    """
     # Team Member Lookup
     # Map Name -> {role: ..., both: ...}
     member_map = {m['name']: m for m in team_members}
 
+    tasks_list = decode_tasks(tasks_list)
+
+    # Candidate sets are intersected as bitmasks over one registry (team + every task candidate)
+    person_index = PersonIndex.from_sources(team_members, (c for t in tasks_list for c in t.candidates))
+
     # Group tasks by (Week, Day, Name)
     tasks_by_context = defaultdict(list)
     for task in tasks_list:
-        key = (task['week'], task['day'], task['name'])
+        key = (task.week, task.day, task.name)
         tasks_by_context[key].append(task)
     
     # Sort tasks by repeat_index to consume in order
     for key in tasks_by_context:
-        tasks_by_context[key].sort(key=lambda x: x['repeat_index'])
+        tasks_by_context[key].sort(key=lambda x: x.repeat_index)
 
     groups_output = []
     
-    # Store created groups for linking later
-    groups_by_day = defaultdict(list)
-    groups_by_family_week = defaultdict(list)
-    
     # Dictionary to keep track of group counts per Week/Day to generate IDs
     group_id_counters = defaultdict(int)
 
     # Create set of task IDs that are assigned to groups to track unassigned ones
     assigned_task_ids = set()
 
+    # Group ID -> time intervals of its tasks (for overlap detection)
+    group_spans = {}
+
     # Define contexts from tasks list
     # Include tasks with day=None (treated as "Any" or floating)
-    contexts = set((t['week'], t['day']) for t in tasks_list if t['week'])
+    contexts = set((t.week, t.day) for t in tasks_list if t.week)
     
     # Sort with safe key for None values
     sorted_contexts = sorted(list(contexts), key=lambda x: (x[0], x[1] if x[1] is not None else ""))
@@ -93,7 +120,7 @@ def process_groups(tasks_list, task_families, team_members):
                         if key in tasks_by_context:
                             # Mark all such tasks as "assigned" (consumed) so they are skipped later
                             for t in tasks_by_context[key]:
-                                assigned_task_ids.add(t['id'])
+                                assigned_task_ids.add(t.id)
                             # Optional: Remove from context map to be clean, though assigned_task_ids check is sufficient
                             del tasks_by_context[key]
                     continue
@@ -252,7 +279,7 @@ def process_groups(tasks_list, task_families, team_members):
                         
                         all_tasks_for_context = tasks_by_context[key]
                         for t in all_tasks_for_context:
-                            assigned_task_ids.add(t['id'])
+                            assigned_task_ids.add(t.id)
                             
                         # Optional: Remove from context map to be clean
                         # del tasks_by_context[key] 
@@ -284,8 +311,8 @@ def process_groups(tasks_list, task_families, team_members):
                             t_list = tasks_by_context[key]
                             if i < len(t_list): # Check if task exists for this index
                                 t = t_list[i]
-                                if t.get('assignee'):
-                                    inst_assignees.add(t['assignee'])
+                                if t.assignee:
+                                    inst_assignees.add(t.assignee)
                     
                     # Determine Role Requirement for this future/current instance
                     req_role = None
@@ -341,18 +368,18 @@ def process_groups(tasks_list, task_families, team_members):
                         
                         t = available_list.pop(0)
                         instance_tasks.append(t)
-                        assigned_task_ids.add(t['id'])
+                        assigned_task_ids.add(t.id)
                     
                     if missing_resource:
                         # Put back
                         for t in instance_tasks:
-                             k = (week, day, t['name'])
+                             k = (week, day, t.name)
                              tasks_by_context[k].insert(0, t)
-                             assigned_task_ids.remove(t['id'])
+                             assigned_task_ids.remove(t.id)
                         continue
 
                     # 2. Check Assignments
-                    assignees = set(t['assignee'] for t in instance_tasks if t['assignee'])
+                    assignees = set(t.assignee for t in instance_tasks if t.assignee)
                     
                     final_groups_for_instance = [] # Can be 1 group or 2 (split)
                     
@@ -368,8 +395,8 @@ def process_groups(tasks_list, task_families, team_members):
                         unassigned_tasks = []
                         
                         for t in instance_tasks:
-                            if t['assignee']:
-                                tasks_by_user[t['assignee']].append(t)
+                            if t.assignee:
+                                tasks_by_user[t.assignee].append(t)
                             else:
                                 unassigned_tasks.append(t)
                         
@@ -381,7 +408,7 @@ def process_groups(tasks_list, task_families, team_members):
                             leftover_tasks = []
                             
                             for t in unassigned_tasks:
-                                if user in t['candidates']:
+                                if user in t.candidates:
                                     propagated_tasks.append(t) # Propagate
                                 else:
                                     leftover_tasks.append(t) # Cannot propagate
@@ -515,11 +542,11 @@ def process_groups(tasks_list, task_families, team_members):
                         # role_mode = grp_data['role'] # IGNORE fragment role mode, use Instance Role
                         current_notes = grp_data.get('notes', [])
                         
-                        base_sets = [set(t['candidates']) for t in tasks_in_group]
-                        if base_sets:
-                            intersected = set.intersection(*base_sets)
-                        else:
-                            intersected = set()
+                        intersected = 0
+                        if tasks_in_group:
+                            intersected = person_index.encode(tasks_in_group[0].candidates)
+                            for t in tasks_in_group[1:]:
+                                intersected &= person_index.encode(t.candidates)
                         
                         final_role = chosen_role
                         
@@ -569,7 +596,7 @@ def process_groups(tasks_list, task_families, team_members):
                         if assignee:
                              current_notes.append(f"Role set to {final_role} (Instance-level).")
                         
-                        total_effort = sum(t.get('effort', 0.0) for t in tasks_in_group)
+                        total_effort = sum(t.effort for t in tasks_in_group)
                                 
                         new_group = {
                             "name": group_name,
@@ -578,14 +605,15 @@ def process_groups(tasks_list, task_families, team_members):
                             "family": fam_name,
                             "week": week,
                             "day": day,
-                            "tasks": [[t['id'], t['name']] for t in tasks_in_group],
+                            "tasks": [[t.id, t.name] for t in tasks_in_group],
                             "task_count": len(tasks_in_group),
                             "repeat_index": group_repeat_counter, 
                             "assignee": assignee,
                             "exclusive_groups": [],
-                            "cooldown_groups": [], 
-                            "intra_cooldown_groups": [],
-                            "candidates_list": sorted(list(intersected)),
+                            "cooldown_refs": [],
+                            "intra_cooldown_refs": [],
+                            "overlap_cliques": [],
+                            "candidates_list": person_index.decode(intersected),
                             "filtered_candidates_list": [], 
                             "priority_candidates_list": [], 
                             "filtered_priority_candidates_list": [],
@@ -594,10 +622,9 @@ def process_groups(tasks_list, task_families, team_members):
                         }
                         
                         # If TBD, we still finalize it with the Chosen Role
-                        finalize_candidate_lists(new_group, member_map, group_def)
+                        finalize_candidate_lists(new_group, member_map, group_def, person_index, intersected)
+                        group_spans[group_id] = [parse_slot(t.time_slot) for t in tasks_in_group]
                         groups_output.append(new_group)
-                        groups_by_day[(week, day)].append(new_group)
-                        groups_by_family_week[(fam_name, week)].append(new_group)
                             
                 # STRICT CONSUMPTION:
                 # Mark any remaining instances of required_tasks as assigned so they don't become standalone.
@@ -606,15 +633,17 @@ def process_groups(tasks_list, task_families, team_members):
                     key = (week, day, task_name)
                     if key in tasks_by_context:
                          for t in tasks_by_context[key]:
-                              assigned_task_ids.add(t['id'])
+                              assigned_task_ids.add(t.id)
+
+    family_count = len(groups_output)
 
     # --- 2. Standalone Groups (Unassigned Tasks) ---
-    remaining_tasks = [t for t in tasks_list if t['id'] not in assigned_task_ids]
-    remaining_tasks.sort(key=lambda x: (x['week'] or 0, x['day'] or "", x['name'], x['repeat_index']))
+    remaining_tasks = [t for t in tasks_list if t.id not in assigned_task_ids]
+    remaining_tasks.sort(key=lambda x: (x.week or 0, x.day or "", x.name, x.repeat_index))
     
     for t in remaining_tasks:
-        week = t['week']
-        day = t['day']
+        week = t.week
+        day = t.day
         # Allow day=None (treated as "Any" or floating)
         if not week: continue 
         
@@ -628,87 +657,204 @@ def process_groups(tasks_list, task_families, team_members):
         # Handle None day safely
         day_num = DAY_NUM_MAP.get(day, 0) if day else 0
         
-        group_id = f"G{week}_{day_num}_{gid_num}_{t['repeat_index']}"
+        group_id = f"G{week}_{day_num}_{gid_num}_{t.repeat_index}"
         
         new_group = {
-            "name": t['name'],
+            "name": t.name,
             "id": group_id,
             "role": "any",
-            "family": t['name'],
+            "family": t.name,
             "week": week,
             "day": day,
-            "tasks": [[t['id'], t['name']]],
-            "repeat_index": t['repeat_index'],
-            "assignee": t['assignee'],
+            "tasks": [[t.id, t.name]],
+            "repeat_index": t.repeat_index,
+            "assignee": t.assignee,
             "exclusive_groups": [],
-            "cooldown_groups": [],
-            "intra_cooldown_groups": [],
-            "candidates_list": t['candidates'],
-            "filtered_candidates_list": t['candidates'],
+            "cooldown_refs": [],
+            "intra_cooldown_refs": [],
+            "overlap_cliques": [],
+            "candidates_list": t.candidates,
+            "filtered_candidates_list": t.candidates,
             "priority_candidates_list": [],
             "filtered_priority_candidates_list": [],
-            "effort": t.get('effort', 0.0)
+            "effort": t.effort
         }
+        group_spans[group_id] = [parse_slot(t.time_slot)]
         groups_output.append(new_group)
-        groups_by_day[(week, day)].append(new_group)
-        groups_by_family_week[(t['name'], week)].append(new_group) 
 
-    groups_by_family_week[(t['name'], week)].append(new_group) 
+    return groups_output[:family_count], groups_output[family_count:], group_spans
 
+def link_groups(groups_output, task_families, group_spans, detect_overlaps=True):
+    """Deadlock relaxation, overlap cliques, exclusive links and cooldown references (in place)."""
     # --- 1.5 Global Priority Deadlock Resolution ---
     # Check for "Pigeonhole Deadlocks": N constrained groups for < N candidates
     resolve_priority_deadlocks(groups_output)
 
+    # --- 1.6 Time-Overlap Cliques ---
+    # Groups running at the same time can't share a person. Each clique is emitted once
+    # (as an ID on its members); explicit pairs it already covers are not repeated below.
+    clique_members = set()
+    if detect_overlaps:
+        for clique_id, members in find_overlap_cliques(groups_output, group_spans):
+            for g in members:
+                g['overlap_cliques'].append(clique_id)
+                clique_members.add((g['id'], clique_id))
+
+    def share_clique(a, b):
+        return any((b['id'], c) in clique_members for c in a['overlap_cliques'])
+
     # --- Linking Logic ---
+    # Indexes: explicit exclusives per (family, group definition), same-day groups per name,
+    # and the group names present per (family, week)
+    explicit_exclusives = {}
+    for fam in task_families:
+        for gdef in reversed(fam['groups']): # The first definition of a name wins
+            explicit_exclusives[(fam['name'], gdef['name'])] = gdef.get('exclusive', [])
+    
+    day_position = {}
+    groups_by_day_name = defaultdict(list)
+    day_counts = defaultdict(int)
+    for g in groups_output:
+        day_position[g['id']] = day_counts[(g['week'], g['day'])]
+        day_counts[(g['week'], g['day'])] += 1
+        groups_by_day_name[(g['week'], g['day'], g['name'])].append(g)
+    
     for group in groups_output:
         g_id = group['id']
         g_name = group['name']
         g_fam = group['family']
+        g_week = group['week']
         g_repeat = group.get('repeat_index', 0)
         
-        # 1. Exclusive Groups
-        explicit_exclusive_names = []
-        for fam in task_families:
-            if fam['name'] == g_fam:
-                for gdef in fam['groups']:
-                    if gdef['name'] == g_name:
-                        explicit_exclusive_names = gdef.get('exclusive', [])
-                        break
+        # 1. Exclusive Groups (explicit rules and same-name repeats), in same-day order
+        explicit_exclusive_names = explicit_exclusives.get((g_fam, g_name), [])
+        others = []
+        for name in set(explicit_exclusive_names) | {g_name}:
+            others.extend(groups_by_day_name.get((g_week, group['day'], name), []))
+        others.sort(key=lambda o: day_position[o['id']])
         
-        same_day_groups = groups_by_day.get((group['week'], group['day']), [])
-        for other in same_day_groups:
+        for other in others:
             if other['id'] == g_id: continue
             
-            if other['name'] in explicit_exclusive_names:
+            if other['name'] in explicit_exclusive_names and not share_clique(group, other):
                 group['exclusive_groups'].append([other['id'], other['name']])
                 
             if other['name'] == g_name:
                 other_repeat = other.get('repeat_index', 0)
-                if other_repeat != g_repeat:
+                if other_repeat != g_repeat and not share_clique(group, other):
                     group['exclusive_groups'].append([other['id'], other['name']])
 
-        # 2. Cooldowns
-        prev_week_groups = groups_by_family_week.get((g_fam, group['week'] - 1), [])
-        for other in prev_week_groups:
-             group['cooldown_groups'].append([other['id'], other['name']])
-             
-        next_week_groups = groups_by_family_week.get((g_fam, group['week'] + 1), [])
-        for other in next_week_groups:
-             group['cooldown_groups'].append([other['id'], other['name']])
-
-        # 3. Intra Cooldowns
-        curr_week_groups = groups_by_family_week.get((g_fam, group['week']), [])
-        for other in curr_week_groups:
-            if other['id'] == g_id: continue
-            if other['name'] == g_name: continue
-            group['intra_cooldown_groups'].append([other['id'], other['name']])
+    # 2./3. Cooldowns
+    assign_cooldown_refs(groups_output)
 
-    return groups_output
+def assign_cooldown_refs(groups, weeks=None):
+    """
+    Cooldown links as [family, week] references (expanded by the solver):
+    - cooldown_refs: every group of the family in the adjacent weeks.
+    - intra_cooldown_refs: the family's other-named groups of the same week.
+    weeks limits the update to groups of those weeks (the others keep their references).
+    """
+    family_week_names = defaultdict(set)
+    for g in groups:
+        family_week_names[(g['family'], g['week'])].add(g['name'])
+    
+    for group in groups:
+        g_fam = group['family']
+        g_week = group['week']
+        if weeks is not None and g_week not in weeks: continue
+        
+        group['cooldown_refs'] = [[g_fam, w] for w in (g_week - 1, g_week + 1) if (g_fam, w) in family_week_names]
+        names = family_week_names[(g_fam, g_week)]
+        group['intra_cooldown_refs'] = [[g_fam, g_week]] if (len(names) > 1 or group['name'] not in names) else []
+
+# --- Incremental Re-aggregation ---
+# Bump when the grouping logic changes so that saved states are not reused
+AGGREGATION_VERSION = 1
+
+def fingerprint(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def context_of(item):
+    return (item['week'], item['day'])
+
+def context_key(context):
+    """(week, day) -> JSON object key."""
+    return json.dumps(list(context))
+
+def context_fingerprints(tasks_list):
+    """Context key -> fingerprint of its tasks, in input order (tasks without a week make no groups)."""
+    by_context = defaultdict(list)
+    for t in tasks_list:
+        if t['week']:
+            by_context[context_of(t)].append(t)
+    return {context_key(context): fingerprint(tasks) for context, tasks in by_context.items()}
+
+def aggregation_state(groups, standalone_ids, fingerprints, inputs_fp):
+    """What reaggregate_groups() needs next time: per-context fingerprints and group IDs."""
+    contexts = {key: {"fingerprint": fp, "family_groups": [], "standalone_groups": []} for key, fp in fingerprints.items()}
+    keys = {}
+    for g in groups:
+        context = context_of(g)
+        if context not in keys:
+            keys[context] = context_key(context)
+        entry = contexts.get(keys[context])
+        if entry is not None:
+            entry["standalone_groups" if g['id'] in standalone_ids else "family_groups"].append(g['id'])
+    return {"version": AGGREGATION_VERSION, "inputs": inputs_fp, "contexts": contexts}
+
+def reaggregate_groups(tasks_list, task_families, team_members, previous_groups=None, previous_state=None, detect_overlaps=True):
+    """
+    Incremental process_groups(). Contexts (week, day) whose tasks are unchanged since previous_state
+    keep their groups from previous_groups, IDs included; only changed contexts are rebuilt, and
+    cooldown references are refreshed for the weeks around them. A change to the families or the
+    team falls back to a full rebuild.
+    Returns (groups, state, rebuilt): rebuilt is the set of rebuilt context keys, None for a full rebuild.
+    """
+    fingerprints = context_fingerprints(tasks_list)
+    inputs_fp = fingerprint({"version": AGGREGATION_VERSION, "families": task_families,
+                             "team": team_members, "detect_overlaps": detect_overlaps})
+
+    prev_contexts = None
+    if previous_state and previous_groups is not None \
+            and previous_state.get('version') == AGGREGATION_VERSION \
+            and previous_state.get('inputs') == inputs_fp:
+        prev_contexts = previous_state['contexts']
+
+    if prev_contexts is None:
+        family_groups, standalone_groups, group_spans = build_groups(tasks_list, task_families, team_members)
+        groups = family_groups + standalone_groups
+        link_groups(groups, task_families, group_spans, detect_overlaps)
+        return groups, aggregation_state(groups, {g['id'] for g in standalone_groups}, fingerprints, inputs_fp), None
+
+    changed = {key for key, fp in fingerprints.items() if prev_contexts.get(key, {}).get('fingerprint') != fp}
+    removed = set(prev_contexts) - set(fingerprints)
+
+    # 1. Rebuild changed contexts (everything but the cooldown references is per context)
+    changed_contexts = {tuple(json.loads(key)) for key in changed}
+    changed_tasks = [t for t in tasks_list if t['week'] and context_of(t) in changed_contexts]
+    family_groups, standalone_groups, group_spans = build_groups(changed_tasks, task_families, team_members)
+    link_groups(family_groups + standalone_groups, task_families, group_spans, detect_overlaps)
+
+    # 2. Reuse the unchanged ones as saved
+    previous_by_id = {g['id']: g for g in previous_groups}
+    for key, entry in prev_contexts.items():
+        if key in changed or key in removed: continue
+        family_groups.extend(previous_by_id[gid] for gid in entry['family_groups'])
+        standalone_groups.extend(previous_by_id[gid] for gid in entry['standalone_groups'])
+
+    # 3. Same order as a full run (stable sorts keep the order inside each context)
+    family_groups.sort(key=lambda g: (g['week'], g['day'] if g['day'] is not None else ""))
+    standalone_groups.sort(key=lambda g: (g['week'] or 0, g['day'] or "", g['name'], g['repeat_index']))
+    groups = family_groups + standalone_groups
+
+    # 4. Cooldown references of the touched weeks and their neighbours
+    touched_weeks = {json.loads(key)[0] for key in changed | removed}
+    assign_cooldown_refs(groups, weeks={w + d for w in touched_weeks for d in (-1, 0, 1)})
+
+    return groups, aggregation_state(groups, {g['id'] for g in standalone_groups}, fingerprints, inputs_fp), changed
 
 # Add project root to sys.path to allow imports
 # Assuming CWD is root
-import sys
-import pathlib
 if str(pathlib.Path.cwd()) not in sys.path:
     sys.path.append(str(pathlib.Path.cwd()))
 
@@ -720,6 +866,55 @@ DATA_DIR = pathlib.Path("data")
 RAW_DIR = DATA_DIR / "raw"
 PROCESSED_DIR = DATA_DIR / "processed"
 
+def find_overlap_cliques(groups, group_spans):
+    """
+    Maximal sets of same-day groups that run at a common moment.
+    Sort-and-sweep over the task intervals of each (week, day): interval ends sort before
+    starts at the same minute (touching slots don't overlap), and the active set is recorded
+    at the first end after a run of starts. Tasks without a parsable slot are ignored.
+    Returns [(clique_id, [groups])], clique IDs like C{Week}_{DayNum}_{n}.
+    """
+    DAY_NUM_MAP = {
+        "Monday": 1, "Tuesday": 2, "Wednesday": 3, "Thursday": 4,
+        "Friday": 5, "Saturday": 6, "Sunday": 7
+    }
+    events_by_day = defaultdict(list)
+    for pos, g in enumerate(groups):
+        if not g['day']: continue
+        for span in group_spans.get(g['id'], []):
+            if span:
+                events_by_day[(g['week'], g['day'])].append((span[0], 1, pos))
+                events_by_day[(g['week'], g['day'])].append((span[1], 0, pos))
+
+    cliques = []
+    for (week, day), events in events_by_day.items():
+        events.sort()
+        active = defaultdict(int) # group position -> open intervals
+        day_cliques = []
+        grew = False
+        for _, is_start, pos in events:
+            if is_start:
+                active[pos] += 1
+                grew = True
+                continue
+            if grew and len(active) > 1:
+                day_cliques.append(frozenset(active))
+            grew = False
+            active[pos] -= 1
+            if not active[pos]:
+                del active[pos]
+
+        # A group with several slots can repeat a clique (or a part of one)
+        kept = []
+        for members in sorted(set(day_cliques), key=lambda c: (-len(c), sorted(c))):
+            if not any(members <= k for k in kept):
+                kept.append(members)
+        kept.sort(key=min)
+        for n, members in enumerate(kept, start=1):
+            clique_id = f"C{week}_{DAY_NUM_MAP.get(day, 0)}_{n}"
+            cliques.append((clique_id, [groups[pos] for pos in sorted(members)]))
+    return cliques
+
 def ensure_family_consistency(task_families):
     """
     Ensures that exclusive relationships are bidirectional.
@@ -766,9 +961,10 @@ def ensure_family_consistency(task_families):
 
     return changes_made
 
-def aggregate_groups(source_prefix=None):
+def aggregate_groups(source_prefix=None, incremental=True):
     # Load Config to determine scope if not provided
     penalty_config_path = DATA_DIR / "penalty_config.json"
+    config = {}
     if penalty_config_path.exists():
         config = load_json(penalty_config_path)
         if not source_prefix:
@@ -786,7 +982,7 @@ def aggregate_groups(source_prefix=None):
 
     # Load Data
     tasks_filename = f"{source_prefix}_tasks.json"
-    tasks_list = load_json(PROCESSED_DIR / tasks_filename)
+    tasks_list = load_data(PROCESSED_DIR / tasks_filename)
     
     task_families_path = DATA_DIR / "task_families.json"
     task_families = load_json(task_families_path)
@@ -799,13 +995,29 @@ def aggregate_groups(source_prefix=None):
     
     team_members = load_json(DATA_DIR / "team_members.json")
 
-    groups_output = process_groups(tasks_list, task_families, team_members)
-    
     output_filename = f"{source_prefix}_groups.json"
     output_path = PROCESSED_DIR / output_filename
+    state_path = PROCESSED_DIR / f"{source_prefix}_groups_state.json"
     
-    save_json(groups_output, output_path)
-    save_json(groups_output, output_path)
+    fmt = data_format(config)
+    
+    # Previous run (only contexts whose tasks changed are rebuilt).
+    # The state records a hash of the groups file it belongs to; a file written by anything else is not reused.
+    previous_groups = previous_state = None
+    previous_path = data_path(output_path, fmt)
+    if incremental and previous_path.exists() and state_path.exists():
+        previous_state = load_json(state_path)
+        previous_blob = previous_path.read_bytes()
+        if previous_state.get('output') == hashlib.sha256(previous_blob).hexdigest():
+            previous_groups = loads(previous_blob, fmt)
+    
+    groups_output, state, rebuilt = reaggregate_groups(tasks_list, task_families, team_members, previous_groups, previous_state)
+    if rebuilt is not None:
+        print(f"Incremental: rebuilt {len(rebuilt)} of {len(state['contexts'])} week/day contexts")
+    
+    output_blob = save_data(groups_output, output_path, fmt, export_json=True)
+    state['output'] = hashlib.sha256(output_blob).hexdigest()
+    save_json(state, state_path)
     print(f"Aggregated {len(groups_output)} groups to {output_path}")
 
 def resolve_priority_deadlocks(groups):
@@ -869,34 +1081,15 @@ def resolve_priority_deadlocks(groups):
                         else:
                             g['note'] = note
 
-def finalize_candidate_lists(group, member_map, group_def = None):
-    # Role Filtering
-    role = group['role']
-    intersected = set(group['candidates_list'])
-    
-    role_filtered = []
-    for c_name in intersected:
-        mem = member_map.get(c_name)
-        if not mem: continue
-        
-        is_leader = (mem['role'] == 'leader')
-        is_follower = (mem['role'] == 'follower')
-        is_both = mem['both']
-        
-        keep = False
-        if role == 'any':
-            keep = True
-        elif role == 'leader':
-            if is_leader or is_both:
-                keep = True
-        elif role == 'follower':
-            if is_follower or is_both:
-                keep = True
-                
-        if keep:
-            role_filtered.append(c_name)
-            
-    group["filtered_candidates_list"] = sorted(role_filtered)
+def finalize_candidate_lists(group, member_map, group_def = None, person_index = None, candidates_mask = None):
+    # Bitmask over person_index; callers without one get a registry for this group only
+    if person_index is None:
+        person_index = PersonIndex.from_sources(member_map.values(), group['candidates_list'])
+    intersected = candidates_mask if candidates_mask is not None else person_index.encode(group['candidates_list'])
+
+    # Role Filtering (only known team members pass)
+    role_filtered = intersected & person_index.role_mask(group['role'], member_map)
+    group["filtered_candidates_list"] = person_index.decode(role_filtered)
     
     # Priority
     priority_assignees = []
@@ -904,22 +1097,19 @@ def finalize_candidate_lists(group, member_map, group_def = None):
         priority_assignees = group_def.get("PriorityAssignees", [])
         
     if priority_assignees:
-        p_set = set(priority_assignees)
-        p_list = list(intersected.intersection(p_set))
-        group["priority_candidates_list"] = sorted(p_list)
-        
-        fp_list = list(set(role_filtered).intersection(p_set))
+        # Priority names outside the registry cannot be candidates anyway
+        p_mask = person_index.encode(priority_assignees, ignore_unknown=True)
+        group["priority_candidates_list"] = person_index.decode(intersected & p_mask)
         
         # Removed inline relaxation.
         
-        group["filtered_priority_candidates_list"] = sorted(fp_list)
+        group["filtered_priority_candidates_list"] = person_index.decode(role_filtered & p_mask)
     else:
         group["priority_candidates_list"] = []
         group["filtered_priority_candidates_list"] = []
 
-
 if __name__ == "__main__":
-    prefix = None
-    if len(sys.argv) > 1:
-        prefix = sys.argv[1]
-    aggregate_groups(prefix)
+    # Usage: step_03_aggregate_groups.py [prefix] [--full]
+    args = [a for a in sys.argv[1:] if a != "--full"]
+    prefix = args[0] if args else None
+    aggregate_groups(prefix, incremental="--full" not in sys.argv)
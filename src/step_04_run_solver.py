@@ -1,14 +1,23 @@
 
+import argparse
 import json
 import pathlib
 import sys
+import threading
+import time
 
 # Add project root to sys.path to allow running as script
 # Assuming CWD is root
 if str(pathlib.Path.cwd()) not in sys.path:
     sys.path.append(str(pathlib.Path.cwd()))
 
-from src.solver.solver import SATSolver
+import ortools
+from src.solver.solver import SATSolver, load_config
+from src.solver.cache import SolverCache
+from src.solver.trace import ConvergenceTrace, prune_traces, trace_path
+from src.interchange import data_format, data_path, load_data, save_data
+from src import progress
+from src.records import decode_assignments
 
 # Pre-load Matplotlib to avoid font cache building delay during solve
 import matplotlib
@@ -20,20 +29,26 @@ def load_json(path):
     with open(path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def run_solver(source_prefix=None):
+def run_solver(source_prefix=None, results_dir=None, overrides=None, cancel=None):
+    """
+    results_dir: where results, profile and traces go (default data/results; solve jobs use their own).
+    overrides: penalty_config.json values replaced for this run (e.g. time_limit_seconds).
+    cancel: threading.Event; once set, the search stops and the best solution found is kept.
+    Returns the SATSolver.
+    """
     # Use CWD-relative data path
     base_dir = pathlib.Path(".")
     data_dir = base_dir / "data"
     processed_dir = data_dir / "processed"
-    results_dir = data_dir / "results"
+    results_dir = pathlib.Path(results_dir) if results_dir else data_dir / "results"
     
     # Ensure results directory exists
     results_dir.mkdir(parents=True, exist_ok=True)
     
-    # Load Config to determine scope if not provided
+    # Load Config to determine scope if not provided (the project's default without penalty_config.json)
     penalty_config_path = data_dir / "penalty_config.json"
+    config = {**(load_json(penalty_config_path) if penalty_config_path.exists() else load_config()), **(overrides or {})}
     if penalty_config_path.exists():
-        config = load_json(penalty_config_path)
         if not source_prefix:
             scope = config.get("scope", {})
             if "month" in scope and "year" in scope:
@@ -48,49 +63,112 @@ def run_solver(source_prefix=None):
              print("Config not found, defaulting to january_2026")
              
     # Default threshold if config not found
-    effort_threshold = config.get("effort_threshold", 8.0) if 'config' in locals() else 8.0
+    effort_threshold = config.get("effort_threshold", 8.0)
+    # Interchange format of groups/results (penalty_config.json "interchange_format")
+    data_fmt = data_format(config)
 
     groups_file = processed_dir / f"{source_prefix}_groups.json"
     team_file = data_dir / "team_members.json"
 
     print(f"Loading groups from {groups_file}...")
-    groups = load_json(groups_file)
+    load_started = time.perf_counter()
+    groups = load_data(groups_file)
     team_members = load_json(team_file)
 
     print("Initializing Solver...")
-    solver = SATSolver(groups, team_members)
+    solver = SATSolver(groups, team_members, config)
+    if cancel is not None:
+        threading.Thread(target=lambda: cancel.wait() and solver.stop(), daemon=True).start()
+    progress.emit("stage", name="Load", seconds=round(time.perf_counter() - load_started, 4))
     
-    # Callback wrapper to save results live
+    # Model/Result Cache (data/cache/solver). 0 entries disables it.
+    cache = None
+    cache_max_entries = config.get("cache_max_entries", 20)
+    if cache_max_entries > 0:
+        cache = SolverCache(data_dir / "cache" / "solver", max_entries=cache_max_entries)
+    
+    # Convergence Trace (one JSONL file per run, the newest trace_max_files kept). 0 disables it.
+    trace = None
+    trace_max_files = config.get("trace_max_files", 50)
+    if trace_max_files > 0:
+        traces_dir = results_dir / "traces"
+        traces_dir.mkdir(parents=True, exist_ok=True)
+        trace = ConvergenceTrace(trace_path(traces_dir, source_prefix), metadata={
+            "prefix": source_prefix,
+            "ortools_version": ortools.__version__,
+            "num_groups": len(groups),
+            "num_team_members": len(team_members),
+            "settings": solver.solver_settings(),
+            "time_limit_seconds": solver.time_limit
+        })
+        prune_traces(traces_dir, trace_max_files)
+    
+    # Every solution: append to the trace (per-rule costs are computed by the solution printer)
+    def on_progress(printer):
+        if trace is not None:
+            trace.record_solution(printer, printer.breakdown, printer.active_penalties)
+
+    # Throttled (progress_interval_seconds): extract and save results live (no JSON export in binary formats)
     def on_solution_found(printer):
         assignments, penalties = solver.extract_solution(printer)
-        save_results(assignments, penalties, results_dir, source_prefix, groups, effort_threshold)
+        save_results(assignments, penalties, results_dir, source_prefix, solver.group_records, effort_threshold, data_fmt)
 
     print("Solving...")
-    # Pass callback to solve
-    assignments, penalties = solver.solve(solution_callback=on_solution_found)
+    # Pass callbacks to solve
+    try:
+        assignments, penalties = solver.solve(solution_callback=on_solution_found, cache=cache, progress_callback=on_progress)
+    finally:
+        summary = trace.close(solver.solve_stats) if trace is not None else None
+    
+    def fmt(val, unit=""):
+        return "n/a" if val is None else f"{val:.2f}{unit}"
+    if summary is not None:
+        print(f"Trace saved to {trace.path}")
+        print(f"Time to first solution: {fmt(summary['time_to_first_solution'], ' s')}, "
+              f"within 5%: {fmt(summary['time_to_within_5pct'], ' s')}, "
+              f"within 1%: {fmt(summary['time_to_within_1pct'], ' s')}, "
+              f"final gap: {fmt(summary['final_gap'] * 100 if summary['final_gap'] is not None else None, '%')}")
     
-    # Final save (redundant if callback ran on last solution, but good for safety)
+    # Final save (redundant if callback ran on last solution, but good for safety). Also writes the JSON export.
     if assignments:
-        save_results(assignments, penalties, results_dir, source_prefix, groups, effort_threshold)
+        save_results(assignments, penalties, results_dir, source_prefix, solver.group_records, effort_threshold, data_fmt, export_json=True)
+        
+    # Model Build Profile (absent if the result came straight from the cache)
+    if solver.build_profile:
+        profile_path = results_dir / f"{source_prefix}_build_profile.json"
+        with open(profile_path, 'w', encoding='utf-8') as f:
+            json.dump(solver.build_profile, f, indent=4, ensure_ascii=False)
+        print(f"Build profile saved to {profile_path}")
+
+    stats = solver.solve_stats or {}
+    progress.emit(
+        "finished",
+        status=stats.get("status"),
+        objective=stats.get("objective"),
+        best_bound=stats.get("best_bound"),
+        wall_time=stats.get("stats", {}).get("wall_time"),
+        cached=stats.get("cached", False),
+        stopped=stats.get("stopped", False)
+    )
+    return solver
 
-def save_results(assignments, penalties, results_dir, source_prefix, groups, effort_threshold=8.0):
+def save_results(assignments, penalties, results_dir, source_prefix, groups, effort_threshold=8.0, fmt="json", export_json=False):
+    # groups: decoded Group records (solver.group_records)
     # Sort penalties: Cost (Desc) -> Rule (Asc)
     penalties.sort(key=lambda x: (-x['cost'], x['rule']))
 
     output_path = results_dir / f"{source_prefix}_assignments.json"
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(assignments, f, indent=4, ensure_ascii=False)
+    save_data(assignments, output_path, fmt, export_json)
         
     penalties_path = results_dir / f"{source_prefix}_penalties.json"
-    with open(penalties_path, 'w', encoding='utf-8') as f:
-        json.dump(penalties, f, indent=4, ensure_ascii=False)
+    save_data(penalties, penalties_path, fmt, export_json)
         
     # print(f"Assignments saved to {output_path}") # Reduce noise during live updates
     # print(f"Penalties saved to {penalties_path}")
     
     # Generate Person Report
     person_report_path = results_dir / f"{source_prefix}_assignments_by_person.json"
-    save_person_report(assignments, penalties, groups, person_report_path)
+    save_person_report(assignments, penalties, groups, person_report_path, fmt, export_json)
     # print(f"Person report saved to {person_report_path}")
 
     # Generate Effort Chart
@@ -98,16 +176,22 @@ def save_results(assignments, penalties, results_dir, source_prefix, groups, eff
     generate_effort_chart(assignments, groups, chart_path, effort_threshold)
     # print(f"Effort chart saved to {chart_path}")
 
-def save_person_report(assignments, penalties, groups, output_path):
+    if progress.enabled():
+        paths = [data_path(p, fmt) for p in (output_path, penalties_path, person_report_path)]
+        if chart_path.with_suffix('.svg').exists():
+            paths.append(chart_path.with_suffix('.svg'))
+        progress.emit("result_written", paths=[str(p) for p in paths], final=export_json)
+
+def save_person_report(assignments, penalties, groups, output_path, fmt="json", export_json=False):
     # assignments: dict of group_id -> {assignee, method, ...}
     # penalties: list of {person_name, rule, cost, details, ...}
     
-    group_map = {g['id']: g for g in groups}
+    group_map = {g.id: g for g in groups}
     person_data = {}
     
     # 1. Map Assignments to People
-    for g_id, res in assignments.items():
-        person = res.get('assignee')
+    for g_id, res in decode_assignments(assignments).items():
+        person = res.assignee
         if not person: continue
         
         if person not in person_data:
@@ -120,13 +204,13 @@ def save_person_report(assignments, penalties, groups, output_path):
         if not group: continue
         
         person_data[person]["assignments"].append({
-            "week": group.get('week'),
-            "day": group.get('day'),
-            "group_name": group.get('name'),
-            "family": group.get('family'),
-            "role": group.get('role'),
+            "week": group.week,
+            "day": group.day,
+            "group_name": group.name,
+            "family": group.family,
+            "role": group.role,
             "group_id": g_id,
-            "method": res.get('method', 'automatic')
+            "method": res.method
         })
         
     # 2. Map Penalties to People
@@ -155,13 +239,12 @@ def save_person_report(assignments, penalties, groups, output_path):
         # Simple tuple sort (week, day)
         person_data[person]["assignments"].sort(key=lambda x: (x.get('week', 0), x.get('day') or ''))
         
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(person_data, f, indent=4, ensure_ascii=False)
+    save_data(person_data, output_path, fmt, export_json)
 
 def generate_effort_chart(assignments, groups, output_path, effort_threshold=8.0, args=None):
     # 1. Map Group ID -> Effort and Original Assignee
-    # groups contains the INPUT state
-    group_map = {g['id']: g for g in groups}
+    # groups contains the INPUT state (Group records)
+    group_map = {g.id: g for g in groups}
     
     # 2. Pre-calculate N-for-N Forced Groups
     # Group by (Name, Week, Day) context to find "N candidates for N repeats"
@@ -170,7 +253,7 @@ def generate_effort_chart(assignments, groups, output_path, effort_threshold=8.0
     for g in groups:
         # Use a tuple key: (name, week, day)
         # Note: day might be None for Planning, but that's handled in aggregation now
-        key = (g['name'], g['week'], g['day'])
+        key = (g.name, g.week, g.day)
         context_groups[key].append(g)
         
     forced_n_for_n_ids = set()
@@ -179,16 +262,12 @@ def generate_effort_chart(assignments, groups, output_path, effort_threshold=8.0
         # Get union of all candidates for these groups
         all_candidates = set()
         for g in grps:
-            # Use filtered if available, else full list
-            cands = g.get('filtered_candidates_list')
-            if not cands: 
-                cands = g.get('candidates_list', [])
-            all_candidates.update(cands)
+            all_candidates.update(g.candidates)
             
         # Condition: If N groups == N unique candidates, all are forced (1-to-1)
         if n_groups > 0 and len(all_candidates) == n_groups:
             for g in grps:
-                forced_n_for_n_ids.add(g['id'])
+                forced_n_for_n_ids.add(g.id)
 
     # 3. Aggregate Effort per Person (Manual vs Auto)
     manual_effort = {}
@@ -197,33 +276,30 @@ def generate_effort_chart(assignments, groups, output_path, effort_threshold=8.0
     # Track all people encountered
     all_people = set()
 
-    for g_id, details in assignments.items():
-        person = details.get('assignee')
+    for g_id, details in decode_assignments(assignments).items():
+        person = details.assignee
         if not person:
             continue
             
         all_people.add(person)
-        effort = group_map.get(g_id, {}).get('effort', 0.0)
 
         # Check if this group was pre-assigned or effectively forced
         original_group = group_map.get(g_id)
+        effort = original_group.effort if original_group else 0.0
         is_manual = False
         
         if original_group:
             # A. Explicitly assigned
-            if original_group.get('assignee'):
+            if original_group.assignee:
                 is_manual = True
             else:
                 # B. Priority Assignment
                 # If the assigned person was a priority candidate
-                p_cands = original_group.get('priority_candidates_list', [])
-                if person in p_cands:
+                if person in original_group.priority_candidates_list:
                     is_manual = True
                 
                 # C. Single Candidate (Only 1 option)
-                candidates = original_group.get('filtered_candidates_list')
-                if not candidates:
-                    candidates = original_group.get('candidates_list', [])
+                candidates = original_group.candidates
                 if candidates and len(candidates) == 1:
                     is_manual = True
                     
@@ -274,7 +350,29 @@ def generate_effort_chart(assignments, groups, output_path, effort_threshold=8.0
         tmp_path.replace(svg_path)
 
 if __name__ == "__main__":
-    p = None
-    if len(sys.argv) > 1:
-        p = sys.argv[1]
-    run_solver(p)
+    parser = argparse.ArgumentParser(description="Run the solver on one month's groups.")
+    parser.add_argument("prefix", nargs="?", default=None, help="Month prefix (default from penalty_config.json).")
+    parser.add_argument("--events-fd", type=int, default=None, help="Write progress events (JSON lines) to this file descriptor.")
+    parser.add_argument("--results-dir", default=None, help="Write results here instead of data/results.")
+    parser.add_argument("--time-limit", type=float, default=None, help="Override time_limit_seconds.")
+    parser.add_argument("--search-workers", type=int, default=None, help="Override num_search_workers (CP-SAT threads).")
+    parser.add_argument("--stop-on-stdin", action="store_true",
+                        help="Stop the search, keeping the best solution, when a line arrives on stdin or stdin closes.")
+    args = parser.parse_args()
+    if args.events_fd is not None:
+        progress.set_sink(progress.fd_sink(args.events_fd))
+
+    overrides = {}
+    if args.time_limit is not None:
+        overrides["time_limit_seconds"] = args.time_limit
+    if args.search_workers is not None:
+        overrides["num_search_workers"] = args.search_workers
+
+    cancel = None
+    if args.stop_on_stdin:
+        cancel = threading.Event()
+        def watch_stdin():
+            sys.stdin.readline() # A line or EOF (the parent went away)
+            cancel.set()
+        threading.Thread(target=watch_stdin, daemon=True).start()
+    run_solver(args.prefix, args.results_dir, overrides, cancel)
@@ -2,14 +2,85 @@ import pandas as pd
 import json
 from pathlib import Path
 import numpy as np
+import sys
+
+# Add project root to sys.path to allow running as script
+root_dir = str(Path(__file__).resolve().parent.parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from src.interchange import data_exists, load_data
+from src.records import decode_assignments, decode_groups
+from src.step_02_convert_data import schedule_columns, assign_task_ids, task_row_ids, file_digest
 
 def load_json(path):
     with open(path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
-import sys
+def load_task_row_ids(processed_dir, source_prefix, raw_csv_path, jan_df):
+    """
+    Task ID per raw CSV row, from the row map step 02 wrote next to the tasks.
+    Falls back to deriving the IDs again with step 02's own code when the map is missing
+    or was written for a different version of the raw CSV.
+    """
+    task_rows_path = processed_dir / f"{source_prefix}_task_rows.json"
+    if data_exists(task_rows_path):
+        task_rows = load_data(task_rows_path)
+        if task_rows.get("source_sha256") == file_digest(raw_csv_path) and len(task_rows.get("task_ids", [])) == len(jan_df):
+            return task_rows["task_ids"]
+        print(f"[WARN] {raw_csv_path.name} changed since step 02 wrote {task_rows_path.name}; re-deriving task IDs. Re-run step 02.")
+    else:
+        print(f"[WARN] Row map not found at {task_rows_path}; re-deriving task IDs. Re-run step 02 to write it.")
+    return task_row_ids(assign_task_ids(schedule_columns(jan_df)), len(jan_df))
+
+def task_assignees(groups, assignments):
+    """Task ID -> assignee for one solver result: the solver's pick, else the group's manual assignee."""
+    task_id_to_assignee = {}
+    for group in groups:
+        # The assignments file is {GroupID: {assignee: ..., method: ...}} (older files: {GroupID: AssigneeName});
+        # Assignment.from_dict reads both.
+        assignment = assignments.get(group.id)
+        assigned_person = (assignment.assignee if assignment else None) or group.assignee
+        if assigned_person:
+            # Propagate to all tasks in this group (task_ref is [id, name])
+            for task_ref in group.tasks:
+                task_id_to_assignee[task_ref[0]] = assigned_person
+    return task_id_to_assignee
+
+def fill_assignees(jan_df, row_task_ids, task_id_to_assignee):
+    """Copy of jan_df with Assignee set from task_id_to_assignee (rows without a match keep their value)."""
+    filled_df = jan_df.copy()
+    row_assignees = pd.Series(row_task_ids, index=jan_df.index, dtype=object).map(task_id_to_assignee)
+    current = filled_df['Assignee'] if 'Assignee' in filled_df.columns else pd.Series(None, index=jan_df.index, dtype=object)
+    filled_df['Assignee'] = current.astype(object).where(row_assignees.isna(), row_assignees)
+    return filled_df
+
+def sanitize_output(jan_df):
+    # Replace \n and \r with spaces in all object (string) columns
+    for col in jan_df.columns:
+        if jan_df[col].dtype == 'object':
+            # Use regex to replace newlines/carriage returns
+            jan_df[col] = jan_df[col].replace(r'[\r\n]+', ' ', regex=True)
 
-def export_csv_for_month(source_prefix=None):
+    # Format Week column to remove decimals (18.0 -> 18)
+    if 'Week' in jan_df.columns:
+        def fmt_week(x):
+            try:
+                if pd.isna(x) or str(x).strip() == "":
+                    return ""
+                return str(int(float(x)))
+            except:
+                return str(x)
+        jan_df['Week'] = jan_df['Week'].apply(fmt_week)
+    return jan_df
+
+def export_csv_for_month(source_prefix=None, assignment_paths=None):
+    """
+    Fills the raw month CSV with the solver's assignees.
+    assignment_paths: assignment files to export (default: results/{prefix}_assignments.json).
+    The raw CSV, groups and row map are read once; each file is written as X_filled.csv next to X_assignments.json.
+    Returns the written paths.
+    """
     # Use CWD-relative data path
     base_dir = Path(".")
     data_dir = base_dir / "data"
@@ -38,158 +109,51 @@ def export_csv_for_month(source_prefix=None):
     raw_csv_path = raw_dir / f"{source_prefix}.csv"
     if not raw_csv_path.exists():
         print(f"Error: Raw CSV not found at {raw_csv_path}")
-        return
+        return []
 
     jan_df = pd.read_csv(raw_csv_path, encoding='utf-8')
     
     # B. Groups Definition (Maps Task ID <-> Group)
     groups_path = processed_dir / f"{source_prefix}_groups.json"
-    groups = load_json(groups_path)
-    
-    # C. Assignments (Maps Group <-> Assignee)
-    assignments_path = results_dir / f"{source_prefix}_assignments.json"
-    if not assignments_path.exists():
-        print(f"Error: Assignments file not found at {assignments_path}. Run solver first.")
-        return
-        
-    assignments = load_json(assignments_path)
-
-    # 3. Build Assignment Map (Task ID -> Assignee)
-    task_id_to_assignee = {}
-    
-    # Map Group ID -> Assignee
-    # The assignments JSON is {GroupID: AssigneeName} or {GroupID: {assignee: ..., method: ...}}
-    # Let's inspect the structure from previous steps. 
-    # Based on previous output: "G15_7_1_1": {"group_name": "...", "assignee": "Name", ...}
+    groups = decode_groups(load_data(groups_path))
     
-    for group in groups:
-        g_id = group['id']
-        
-        # Determine Assignee
-        assigned_person = None
-        
-        # Check solver output first
-        if g_id in assignments:
-            val = assignments[g_id]
-            if isinstance(val, dict):
-                assigned_person = val.get('assignee')
-            else:
-                # Fallback if simple key-value (older versions?)
-                assigned_person = val
-        
-        # Fallback to group definition (Manual assignments)
-        if not assigned_person:
-            assigned_person = group.get('assignee')
-            
-        if assigned_person:
-            # Propagate to all tasks in this group
-            for task_ref in group['tasks']:
-                 # task_ref is [id, name]
-                 t_id = task_ref[0]
-                 task_id_to_assignee[t_id] = assigned_person
-
-    print(f"Mapped {len(task_id_to_assignee)} tasks to assignees.")
-
-    # 4. Process CSV and Fill
-    # Logic copied from step_02_convert_data.py to recreate Task IDs
+    # C. Row Map (Maps CSV row <-> Task ID, written by step 02)
+    row_task_ids = load_task_row_ids(processed_dir, source_prefix, raw_csv_path, jan_df)
     
-    # helper structures for ID generation
-    daily_task_registry = {} 
-    DAY_NUM_MAP = {
-        "Monday": 1, "Tuesday": 2, "Wednesday": 3, "Thursday": 4,
-        "Friday": 5, "Saturday": 6, "Sunday": 7
-    }
-    occurrence_tracker = {}
+    # D. Assignments (Maps Group <-> Assignee), one or more solver results
+    if not assignment_paths:
+        assignment_paths = [results_dir / f"{source_prefix}_assignments.json"]
     
-    # Prepare Output Columns
-    # We want to fill 'Assignee' column. Ensure it exists.
-    if 'Assignee' not in jan_df.columns:
-        jan_df['Assignee'] = None
-        
-    # Iterate and Fill
-    # Using index to update directly
-    for idx, row in jan_df.iterrows():
-        # --- ID Generation Logic (MUST BE EXACT MATCH TO STEP 02) ---
-        week = row.get('Week')
-        day = row.get('Day')
-        time_slot = row.get('Time')
-        name = row.get('TODO')
-        
-        # Skip empty names/breaklines
-        if pd.isna(name): continue
-        
-        # Clean week
-        if pd.notna(week) and isinstance(week, float) and week.is_integer():
-             week_num = int(week)
-        elif pd.notna(week) and str(week).strip() != "":
-             try:
-                week_num = int(week)
-             except:
-                week_num = 0
-        else:
-             week_num = 0
-
-        day_num = DAY_NUM_MAP.get(day, 0)
-        
-        # Determine Task Num
-        context_key = (week_num, day_num)
-        if context_key not in daily_task_registry:
-            daily_task_registry[context_key] = {}
-        
-        task_norm_name = str(name).strip()
+    written = []
+    for assignments_path in map(Path, assignment_paths):
+        if not data_exists(assignments_path):
+            print(f"Error: Assignments file not found at {assignments_path}. Run solver first.")
+            continue
+        assignments = decode_assignments(load_data(assignments_path))
+
+        # 3. Build Assignment Map (Task ID -> Assignee)
+        task_id_to_assignee = task_assignees(groups, assignments)
+        print(f"Mapped {len(task_id_to_assignee)} tasks to assignees.")
+
+        # 4. Fill: one join of the row map against the assignment map
+        filled_df = fill_assignees(jan_df, row_task_ids, task_id_to_assignee)
+
+        # 5. Sanitize Output (Remove newlines that break simple parsers)
+        print("Sanitizing output (removing newlines)...")
+        sanitize_output(filled_df)
+
+        # 6. Save Output
+        output_path = assignments_path.with_name(assignments_path.stem.removesuffix("_assignments") + "_filled.csv")
         
-        if task_norm_name not in daily_task_registry[context_key]:
-            daily_task_registry[context_key][task_norm_name] = len(daily_task_registry[context_key]) + 1
-            
-        task_num = daily_task_registry[context_key][task_norm_name]
-
-        # Key for repetition tracking
-        # key = (week, day, time_slot, name) - Watch generic types in pandas (NaN != None)
-        # step_02 used: key = (week, day, time_slot, name) directly from row.get
-        # But we need to be careful about equality checks.
-        
-        key = (week, day, time_slot, name)
-        
-        if key not in occurrence_tracker:
-            occurrence_tracker[key] = 0
-        occurrence_tracker[key] += 1
-        
-        repeat_index = occurrence_tracker[key]
-        
-        task_id = f"T{week_num}_{day_num}_{task_num}_{repeat_index}"
-        
-        # --- Fill Logic ---
-        if task_id in task_id_to_assignee:
-            jan_df.at[idx, 'Assignee'] = task_id_to_assignee[task_id]
-
-    # 5. Sanitize Output (Remove newlines that break simple parsers)
-    # Replace \n and \r with spaces in all object (string) columns
-    print("Sanitizing output (removing newlines)...")
-    for col in jan_df.columns:
-        if jan_df[col].dtype == 'object':
-            # Use regex to replace newlines/carriage returns
-            jan_df[col] = jan_df[col].replace(r'[\r\n]+', ' ', regex=True)
-
-    # Format Week column to remove decimals (18.0 -> 18)
-    if 'Week' in jan_df.columns:
-        def fmt_week(x):
-            try:
-                if pd.isna(x) or str(x).strip() == "":
-                    return ""
-                return str(int(float(x)))
-            except:
-                return str(x)
-        jan_df['Week'] = jan_df['Week'].apply(fmt_week)
-
-    # 6. Save Output
-    output_path = results_dir / f"{source_prefix}_filled.csv"
-    
-    # Use standard CSV settings
-    jan_df.to_csv(output_path, index=False, encoding='utf-8-sig')
-    print(f"Exported filled CSV to {output_path}")
+        # Use standard CSV settings
+        filled_df.to_csv(output_path, index=False, encoding='utf-8-sig')
+        print(f"Exported filled CSV to {output_path}")
+        written.append(output_path)
+    return written
 
 if __name__ == "__main__":
+    # Usage: step_05_export_csv.py [prefix] [assignments files...]
     p = None
     if len(sys.argv) > 1:
         p = sys.argv[1]
-    export_csv_for_month(p)
+    export_csv_for_month(p, sys.argv[2:] or None)
@@ -0,0 +1,124 @@
+import re
+import numpy as np
+
+# Values that name a range instead of spelling it out
+SLOT_ALIASES = {
+    "All": "19-00"
+}
+
+SLOT_PATTERN = re.compile(r"^(\d{1,2})(?::(\d{2}))?\s*-\s*(\d{1,2})(?::(\d{2}))?$")
+DAY_MINUTES = 24 * 60
+
+
+def parse_slot(value):
+    """
+    'HH-HH' (or 'HH:MM-HH:MM') -> (start, end) in minutes since midnight, None if not a time range.
+    An end at or before the start is on the next day: '19-00' -> (1140, 1440), '22-02' -> (1320, 1560).
+    """
+    if not isinstance(value, str):
+        return None
+    value = SLOT_ALIASES.get(value.strip(), value.strip())
+    m = SLOT_PATTERN.match(value)
+    if not m:
+        return None
+    sh, sm, eh, em = (int(x) if x else 0 for x in m.groups())
+    if sh > 24 or eh > 24 or sm > 59 or em > 59:
+        return None
+    start, end = sh * 60 + sm, eh * 60 + em
+    if start == end:
+        return None
+    if end < start:
+        end += DAY_MINUTES
+    return start, end
+
+
+def format_slot(interval):
+    """(start, end) minutes -> 'HH-HH' (the inverse of parse_slot)."""
+    start, end = interval
+    if end >= DAY_MINUTES and end % DAY_MINUTES < start:
+        end %= DAY_MINUTES
+
+    def fmt(minutes):
+        h, m = divmod(minutes, 60)
+        return f"{h:02d}:{m:02d}" if m else f"{h:02d}"
+    return f"{fmt(start)}-{fmt(end)}"
+
+
+def merge_intervals(intervals):
+    """Union of (start, end) intervals as a sorted list of disjoint ones (touching intervals join)."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def day_intervals(day_data):
+    """
+    Name -> merged intervals for one calendar day.
+    Reads the interval form ("intervals": {name: ["19-22"]}) and the older slot form
+    ("time_slots": {"19-20": [names]}).
+    """
+    spans = {}
+    if "intervals" in day_data:
+        for name, slots in day_data["intervals"].items():
+            spans[name] = [s for s in map(parse_slot, slots) if s]
+    for slot, names in day_data.get("time_slots", {}).items():
+        span = parse_slot(slot)
+        if span:
+            for name in names:
+                spans.setdefault(name, []).append(span)
+    return {name: merge_intervals(s) for name, s in spans.items()}
+
+
+class AvailabilityIndex:
+    """
+    Interval table per (week, day) of a calendar. "Who is available for slot X" means
+    having one interval that covers X; answers are computed on first query and cached.
+    """
+    def __init__(self, calendar_data, person_index=None):
+        self.person_index = person_index
+        self._days = {}
+        self._cache = {}
+        self._masks = {}
+        for week_key, week_data in calendar_data.items():
+            for day_key, day_data in week_data.items():
+                names, starts, ends = [], [], []
+                for name, spans in day_intervals(day_data).items():
+                    for start, end in spans:
+                        names.append(name)
+                        starts.append(start)
+                        ends.append(end)
+                self._days[(week_key, day_key)] = (
+                    np.array(names, dtype=object),
+                    np.array(starts, dtype=np.int64),
+                    np.array(ends, dtype=np.int64)
+                )
+
+    def names(self, week, day, slot):
+        """People available for the whole slot, in calendar order (empty if unknown)."""
+        key = (week, day, slot)
+        if key not in self._cache:
+            table = self._days.get((week, day))
+            span = parse_slot(slot)
+            if table is None or span is None:
+                self._cache[key] = []
+            else:
+                names, starts, ends = table
+                covered = (starts <= span[0]) & (ends >= span[1])
+                self._cache[key] = list(dict.fromkeys(names[covered].tolist()))
+        return self._cache[key]
+
+    def mask(self, week, day, slot):
+        """names() as a bitmask over person_index."""
+        key = (week, day, slot)
+        if key not in self._masks:
+            self._masks[key] = self.person_index.encode(self.names(week, day, slot))
+        return self._masks[key]
+
+    def all_names(self):
+        for names, _, _ in self._days.values():
+            yield from names.tolist()
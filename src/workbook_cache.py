@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import pandas as pd
+from pandas.errors import EmptyDataError
+from pandas.io.parsers import TextParser
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class WorkbookCache:
+    """
+    Persistent cache of downloaded workbooks, keyed by the SHA-256 of their content.
+
+    Layout of cache_dir:
+    - {key}.xlsx:         The workbook as downloaded (or copied from a local file).
+    - {key}/{sheet}.csv:  Sheets already parsed from it, as step 01 writes them to data/raw.
+    - latest.json:        Key, source and time of the most recent fetch.
+
+    Identical content always maps to the same key, so a re-download of an unchanged
+    workbook reuses the sheets parsed before. LRU eviction uses the .xlsx modification time.
+    """
+    def __init__(self, cache_dir, max_entries=5):
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def workbook_path(self, key):
+        return self.cache_dir / f"{key}.xlsx"
+
+    def sheet_path(self, key, sheet_name):
+        return self.cache_dir / key / f"{sheet_name.replace(' ', '_').lower()}.csv"
+
+    def _latest_path(self):
+        return self.cache_dir / "latest.json"
+
+    def latest(self, max_age):
+        """Key of the most recent fetch if it is at most max_age seconds old and still cached, else None."""
+        try:
+            with open(self._latest_path(), 'r', encoding='utf-8') as f:
+                latest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - latest.get("fetched", 0) > max_age or not self.workbook_path(latest.get("key", "")).exists():
+            return None
+        return latest["key"]
+
+    def fetch(self, response, source):
+        """Streams a file-like object (e.g. an HTTP response) into the cache in chunks, hashing on the way. Returns the key."""
+        tmp_path = self.cache_dir / "download.xlsx.tmp"
+        h = hashlib.sha256()
+        with open(tmp_path, 'wb') as out_file:
+            while chunk := response.read(CHUNK_SIZE):
+                h.update(chunk)
+                out_file.write(chunk)
+        return self._store(tmp_path, h.hexdigest(), source)
+
+    def add_file(self, path):
+        """Adds a local workbook (copied, the original is left alone). Returns the key."""
+        with open(path, 'rb') as f:
+            return self.fetch(f, str(path))
+
+    def _store(self, tmp_path, key, source):
+        workbook_path = self.workbook_path(key)
+        if workbook_path.exists():
+            tmp_path.unlink()
+        else:
+            tmp_path.replace(workbook_path)
+        # Touched on every store: marks the entry as recently used
+        now = time.time()
+        os.utime(workbook_path, (now, now))
+
+        latest_path = self._latest_path()
+        tmp_latest = latest_path.with_suffix('.json.tmp')
+        with open(tmp_latest, 'w', encoding='utf-8') as f:
+            json.dump({"key": key, "source": source, "fetched": now}, f, ensure_ascii=False)
+        tmp_latest.replace(latest_path)
+
+        self.evict()
+        return key
+
+    def evict(self):
+        """Drop least recently used workbooks (and their parsed sheets) beyond max_entries."""
+        entries = sorted(self.cache_dir.glob("*.xlsx"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for workbook_path in entries[self.max_entries:]:
+            workbook_path.unlink(missing_ok=True)
+            shutil.rmtree(self.cache_dir / workbook_path.stem, ignore_errors=True)
+
+
+def _convert_value(value, error_codes):
+    # Same conversions as pandas' openpyxl reader: empty -> "", errors -> NaN, integral floats -> int
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return float('nan') if value in error_codes else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def read_sheets(workbook_path, sheet_names):
+    """
+    {sheet name: DataFrame} for the given sheets, header in the first row.
+
+    Same result as pd.read_excel(..., sheet_name=sheet_names, engine='openpyxl'), but streamed:
+    the workbook is opened read-only and only the values of the requested sheets are read
+    (no cell objects). Raises ValueError for a missing sheet.
+    """
+    from openpyxl import load_workbook
+    from openpyxl.cell.cell import ERROR_CODES
+    error_codes = frozenset(ERROR_CODES)
+
+    book = load_workbook(workbook_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        data = {}
+        for name in sheet_names:
+            if name not in book.sheetnames:
+                raise ValueError(f"Worksheet named '{name}' not found")
+            sheet = book[name]
+            sheet.reset_dimensions()
+
+            rows = []
+            last_row_with_data = -1
+            for row in sheet.iter_rows(values_only=True):
+                converted_row = [_convert_value(v, error_codes) for v in row]
+                while converted_row and converted_row[-1] == "":
+                    # trim trailing empty cells
+                    converted_row.pop()
+                if converted_row:
+                    last_row_with_data = len(rows)
+                rows.append(converted_row)
+            rows = rows[:last_row_with_data + 1]
+
+            if rows:
+                # extend rows to max width
+                width = max(len(r) for r in rows)
+                rows = [r + [""] * (width - len(r)) for r in rows]
+
+            try:
+                data[name] = TextParser(rows, header=0, skip_blank_lines=False).read()
+            except EmptyDataError:
+                data[name] = pd.DataFrame()
+        return data
+    finally:
+        book.close()
@@ -0,0 +1,220 @@
+"""
+Resident pipeline worker.
+
+One long-lived interpreter that keeps pandas, OR-Tools, matplotlib and the step modules
+imported, and runs pipeline requests (src/pipeline.py) in-process, so the GUI and the API
+pay the interpreter start-up and import cost once per session instead of once per step.
+Content hashes of the pipeline inputs are memoised across requests as well.
+
+Protocol: JSON lines, requests on stdin, events on stdout (one request at a time).
+    -> {"id": 1, "op": "run", "args": ["solve", "january_2026"]}   # pipeline.py command line
+    <- {"id": 1, "event": "log", "line": "Solution 1, time = 0.52 s, ..."}
+    <- {"id": 1, "event": "done", "ok": true, "code": 0, "elapsed": 12.3}
+    -> {"id": 2, "op": "ping"}          <- {"id": 2, "event": "pong"}
+    -> {"op": "shutdown"}
+
+Everything the steps print becomes a "log" event; the solver's typed progress events
+(src/progress.py: "solution", "bound", "stage", ...) are sent with the request's id as they are.
+Native output written to fd 1 (e.g. an OR-Tools search log) is redirected to stderr so it
+cannot corrupt the event stream.
+Stopping a request means terminating the worker; WorkerClient starts a fresh one on the next run.
+
+Usage (from the project root):
+    python -u src/worker.py
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root to sys.path to allow running as script
+root_dir = str(Path(__file__).resolve().parent.parent)
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+# Imported once, kept for the lifetime of the worker
+PRELOAD = [
+    "pandas",
+    "numpy",
+    "matplotlib",
+    "ortools.sat.python.cp_model",
+    "src.step_01_download_data",
+    "src.step_02_convert_data",
+    "src.step_03_aggregate_groups",
+    "src.step_04_run_solver",
+    "src.step_05_export_csv",
+]
+
+
+class LogStream:
+    """Replacement for sys.stdout: every complete line written becomes a "log" event (per thread, so concurrent nodes don't interleave)."""
+    def __init__(self, send):
+        self.send = send
+        self.request_id = None
+        self._local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", "") + text
+        *lines, self._local.buffer = buffer.split("\n")
+        for line in lines:
+            self.send({"id": self.request_id, "event": "log", "line": line.rstrip("\r")})
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+
+def preload():
+    import importlib
+    import matplotlib
+    matplotlib.use('Agg')
+    for module in PRELOAD:
+        importlib.import_module(module)
+
+
+def serve(requests=sys.stdin):
+    # The original stdout becomes the event channel; fd 1 itself now points at stderr
+    channel = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+    os.dup2(2, 1)
+    send_lock = threading.Lock()
+
+    def send(event):
+        with send_lock:
+            channel.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+    from src import progress
+    from src.pipeline import HashMemo, main as run_pipeline
+    log = LogStream(send)
+    sys.stdout = log
+    progress.set_sink(lambda event: send({"id": log.request_id, **event}))
+    started = time.perf_counter()
+    preload()
+    hashes = HashMemo()
+    send({"event": "ready", "pid": os.getpid(), "elapsed": round(time.perf_counter() - started, 3)})
+
+    for raw in requests:
+        if not raw.strip():
+            continue
+        try:
+            request = json.loads(raw)
+        except ValueError:
+            send({"event": "error", "error": f"Invalid request: {raw.strip()[:200]}"})
+            continue
+        request_id, op = request.get("id"), request.get("op")
+
+        if op == "shutdown":
+            break
+        if op == "ping":
+            send({"id": request_id, "event": "pong"})
+            continue
+        if op != "run":
+            send({"id": request_id, "event": "error", "error": f"Unknown op: {op!r}"})
+            continue
+
+        log.request_id = request_id
+        started = time.perf_counter()
+        try:
+            code = run_pipeline(list(request.get("args", [])), hashes=hashes)
+        except SystemExit as e:
+            # argparse errors (the message went to stderr)
+            code = e.code if isinstance(e.code, int) else 2
+        except Exception as e:
+            print(f"Error: {e}")
+            code = 1
+        log.request_id = None
+        send({"id": request_id, "event": "done", "ok": code == 0, "code": code,
+              "elapsed": round(time.perf_counter() - started, 3)})
+
+
+class WorkerClient:
+    """
+    Owns one resident worker process and runs pipeline requests on it, one at a time.
+
+    cmd defaults to this file under the current interpreter; the frozen GUI passes its
+    --dispatch command instead. The worker is started on first use and after stop().
+    """
+    def __init__(self, cmd=None, cwd=None, env=None):
+        self.cmd = cmd or [sys.executable, "-u", str(Path(__file__).resolve())]
+        self.cwd = cwd
+        self.env = env
+        self.process = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        if self.is_alive():
+            return
+        env = dict(self.env if self.env is not None else os.environ)
+        env["PYTHONUNBUFFERED"] = "1"
+        self.process = subprocess.Popen(
+            [str(c) for c in self.cmd],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            env=env,
+            cwd=self.cwd,
+            bufsize=1
+        )
+
+    def run(self, args):
+        """
+        Runs `pipeline.py <args>` on the worker. Yields the events of the request, the last
+        one always {"event": "done", "ok": ..., "code": ...} -- also when the worker died
+        or was stopped mid-request (code None).
+        """
+        with self._lock:
+            self.start()
+            self._next_id += 1
+            request_id = self._next_id
+            process = self.process
+            try:
+                process.stdin.write(json.dumps({"id": request_id, "op": "run", "args": list(args)}) + "\n")
+                process.stdin.flush()
+            except OSError:
+                pass
+
+            for raw in process.stdout:
+                try:
+                    event = json.loads(raw)
+                except ValueError:
+                    # Anything printed before the protocol starts (e.g. the frozen dispatcher)
+                    event = {"id": request_id, "event": "log", "line": raw.rstrip("\r\n")}
+                if not isinstance(event, dict) or event.get("id") != request_id:
+                    continue
+                yield event
+                if event["event"] == "done":
+                    return
+            # End of output: the worker died or was stopped (reaped here, so the next run starts a new one)
+            process.wait()
+            yield {"id": request_id, "event": "done", "ok": False, "code": None, "error": "worker exited"}
+
+    def stop(self):
+        """Terminates the worker (and whatever it is running)."""
+        process = self.process
+        if process is not None and process.poll() is None:
+            process.terminate()
+
+    def close(self):
+        process = self.process
+        if process is None or process.poll() is not None:
+            return
+        try:
+            process.stdin.write(json.dumps({"op": "shutdown"}) + "\n")
+            process.stdin.flush()
+            process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+
+
+if __name__ == "__main__":
+    serve()
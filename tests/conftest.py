@@ -40,7 +40,7 @@ def sample_calendar_availability_csv(tmp_path):
         ["","","","","2026-01-01","2026-01-01","2026-01-01"], # 4
         ["","","","","Monday","Monday","Monday"], # 5
         # Row 6 is data start in code assumption (index 6, which is 7th row)
-        # Cells must contain valid keys from PROPAGATION_MAP (e.g. "20-21", "20-22")
+        # Cells must contain time ranges (e.g. "20-21", "20-22")
         ["t1","Alice","e1","L","20-21","","20-22"], # 6
         ["t2","Bob","e2","F","","21-22",""], # 7
     ]
@@ -165,3 +165,99 @@ def test_orphan_tasks_processing(sample_team_members):
     assert group['role'] == 'any'
     assert group['effort'] == 2.0
     assert group['candidates_list'] == ["Alice"]
+
+def test_overlap_cliques(sample_team_members):
+    # Three tasks overlapping at 20-21, one touching (21-22), one without a slot
+    tasks = [
+        {"id": "T1", "name": "Task A", "week": 1, "day": "Monday", "time_slot": "19-21", "repeat_index": 1, "assignee": None, "candidates": ["Alice"]},
+        {"id": "T2", "name": "Task B", "week": 1, "day": "Monday", "time_slot": "20-22", "repeat_index": 1, "assignee": None, "candidates": ["Alice"]},
+        {"id": "T3", "name": "Task C", "week": 1, "day": "Monday", "time_slot": "20:30-21", "repeat_index": 1, "assignee": None, "candidates": ["Alice"]},
+        {"id": "T4", "name": "Task D", "week": 1, "day": "Monday", "time_slot": "21-22", "repeat_index": 1, "assignee": None, "candidates": ["Alice"]},
+        {"id": "T5", "name": "Task E", "week": 1, "day": "Monday", "time_slot": None, "repeat_index": 1, "assignee": None, "candidates": ["Alice"]},
+    ]
+    families = [{"name": "Family 1", "groups": [
+        {"name": "Group A", "tasks": ["Task A"], "leader-group-count": 0, "follower-group-count": 0, "any-group-count": 1, "exclusive": ["Group B", "Group D"]},
+        {"name": "Group B", "tasks": ["Task B"], "leader-group-count": 0, "follower-group-count": 0, "any-group-count": 1, "exclusive": []},
+        {"name": "Group D", "tasks": ["Task D"], "leader-group-count": 0, "follower-group-count": 0, "any-group-count": 1, "exclusive": []},
+    ]}]
+    
+    result = {g['name']: g for g in process_groups(tasks, families, sample_team_members)}
+    
+    assert result["Group A"]['overlap_cliques'] == ["C1_1_1"]
+    assert result["Group B"]['overlap_cliques'] == ["C1_1_1", "C1_1_2"]
+    assert result["Task C"]['overlap_cliques'] == ["C1_1_1"]
+    assert result["Group D"]['overlap_cliques'] == ["C1_1_2"]
+    assert result["Task E"]['overlap_cliques'] == []
+    
+    # A-B is covered by the clique; A-D don't overlap, so the explicit rule stays a pair
+    a_links = [link[1] for link in result["Group A"]['exclusive_groups']]
+    assert a_links == ["Group D"]
+    
+    without = {g['name']: g for g in process_groups(tasks, families, sample_team_members, detect_overlaps=False)}
+    assert without["Group A"]['overlap_cliques'] == []
+    assert sorted(link[1] for link in without["Group A"]['exclusive_groups']) == ["Group B", "Group D"]
+
+def test_cooldown_refs_expand_like_member_lists(sample_team_members):
+    from src.solver.solver import SATSolver
+    
+    families = [{"name": "Family 1", "groups": [
+        {"name": "Group A", "tasks": ["Task A"], "leader-group-count": 0, "follower-group-count": 0, "any-group-count": 1, "exclusive": []},
+        {"name": "Group B", "tasks": ["Task B"], "leader-group-count": 0, "follower-group-count": 0, "any-group-count": 1, "exclusive": []},
+    ]}]
+    tasks = [
+        {"id": f"T{w}{n}", "name": f"Task {n}", "week": w, "day": "Monday", "repeat_index": 1, "assignee": None, "candidates": ["Alice"]}
+        for w in (1, 2, 4) for n in "AB"
+    ]
+    
+    result = process_groups(tasks, families, sample_team_members)
+    by_key = {(g['week'], g['name']): g for g in result}
+    
+    # References instead of copied member lists (week 3 has no groups)
+    assert by_key[(2, "Group A")]['cooldown_refs'] == [["Family 1", 1]]
+    assert by_key[(4, "Group A")]['cooldown_refs'] == []
+    assert by_key[(1, "Group A")]['intra_cooldown_refs'] == [["Family 1", 1]]
+    
+    solver = SATSolver(result, sample_team_members, {"ladder": []})
+    a1, b1, a2, b2 = by_key[(1, "Group A")], by_key[(1, "Group B")], by_key[(2, "Group A")], by_key[(2, "Group B")]
+    assert solver.get_cooldown_targets(a2) == [[a1['id'], a1['name']], [b1['id'], b1['name']]]
+    assert solver.get_intra_cooldown_targets(a1) == [[b1['id'], b1['name']]]
+    
+    # Explicit lists from older files still count
+    legacy = dict(a1, cooldown_refs=[], cooldown_groups=[[b2['id'], b2['name']]])
+    assert solver.get_cooldown_targets(legacy) == [[b2['id'], b2['name']]]
+
+def test_reaggregate_rebuilds_only_changed_contexts(sample_team_members):
+    import json
+    from src.step_03_aggregate_groups import reaggregate_groups
+    
+    families = [{"name": "Family 1", "groups": [
+        {"name": "Group A", "tasks": ["Task A"], "leader-group-count": 0, "follower-group-count": 0, "any-group-count": 1, "exclusive": []},
+    ]}]
+    def tasks(candidates_w2):
+        return [
+            {"id": f"T{w}{n}", "name": f"Task {n}", "week": w, "day": "Monday", "time_slot": "20-21", "repeat_index": 1,
+             "assignee": None, "candidates": candidates_w2 if w == 2 else ["Alice", "Bob"]}
+            for w in (1, 2, 3) for n in "AB"
+        ]
+    
+    groups, state, rebuilt = reaggregate_groups(tasks(["Alice"]), families, sample_team_members)
+    assert rebuilt is None # No previous state: full build
+    assert len(state['contexts']) == 3
+    
+    # Round trip through JSON as aggregate_groups() does
+    groups, state = json.loads(json.dumps(groups)), json.loads(json.dumps(state))
+    ids = [g['id'] for g in groups]
+    
+    new_tasks = tasks(["Bob"])
+    again, new_state, rebuilt = reaggregate_groups(new_tasks, families, sample_team_members, groups, state)
+    assert rebuilt == {json.dumps([2, "Monday"])}
+    assert [g['id'] for g in again] == ids
+    assert again == process_groups(new_tasks, families, sample_team_members)
+    # Unchanged contexts are reused as saved
+    assert again[0] is groups[0]
+    assert new_state['contexts'][json.dumps([1, "Monday"])] == state['contexts'][json.dumps([1, "Monday"])]
+    
+    # Family definitions are part of every context: full rebuild
+    families[0]['groups'][0]['exclusive'] = ["Task B"]
+    _, _, rebuilt = reaggregate_groups(new_tasks, families, sample_team_members, again, new_state)
+    assert rebuilt is None
@@ -0,0 +1,77 @@
+from benchmarks.instances import generate_instance
+from benchmarks.report import compare_reports
+from benchmarks.solver_bench import objective_at, run_case
+
+GROUP_KEYS = {
+    "name", "id", "role", "family", "week", "day", "tasks", "task_count", "repeat_index",
+    "assignee", "exclusive_groups", "cooldown_refs", "intra_cooldown_refs", "overlap_cliques",
+    "candidates_list", "filtered_candidates_list", "priority_candidates_list",
+    "filtered_priority_candidates_list", "note", "effort"
+}
+
+def test_instance_is_deterministic_and_shaped_like_step_03():
+    groups, team = generate_instance(team_size=10, weeks=2, families=3, repeats=2, seed=7)
+    again, _ = generate_instance(team_size=10, weeks=2, families=3, repeats=2, seed=7)
+    assert groups == again
+    assert len(team) == 10
+    assert len(groups) == 2 * 3 * 2 * 2 # weeks * families * groups_per_family * repeats
+    
+    ids = {g['id'] for g in groups}
+    assert len(ids) == len(groups)
+    for g in groups:
+        assert set(g) == GROUP_KEYS
+        assert set(g['filtered_candidates_list']) <= set(g['candidates_list'])
+        # Links only point at existing groups
+        for link in g['exclusive_groups']:
+            assert link[0] in ids
+        for family, week in g['cooldown_refs'] + g['intra_cooldown_refs']:
+            assert any(o['family'] == family and o['week'] == week for o in groups)
+
+def test_objective_at_budget():
+    solutions = [(0.5, 100), (2.0, 50), (9.0, 10)]
+    assert objective_at(solutions, 0.1) is None
+    assert objective_at(solutions, 5) == 50
+    assert objective_at(solutions, 10) == 10
+
+def test_compare_flags_regressions():
+    baseline = {"cases": [{"case": "c", "metrics": {"build_seconds": 1.0, "objective_at_5s": 100, "status": "OPTIMAL"}}]}
+    current = {"cases": [{"case": "c", "metrics": {"build_seconds": 2.0, "objective_at_5s": None, "status": "FEASIBLE"}}]}
+    rows = {r['metric']: r for r in compare_reports(current, baseline)}
+    assert rows['build_seconds']['regression']
+    assert rows['objective_at_5s']['regression'] # Lost the solution within the budget
+    assert 'status' not in rows
+    
+    # Within tolerance / below the noise floor
+    current['cases'][0]['metrics'].update(build_seconds=1.1, objective_at_5s=100)
+    assert not any(r['regression'] for r in compare_reports(current, baseline, noise_floor={"build_seconds": 0.5}))
+
+def test_counts_are_reported_not_flagged():
+    baseline = {"cases": [{"case": "c", "metrics": {"num_solutions": 4, "num_variables": 100, "peak_rss_mb": 50.0}}]}
+    current = {"cases": [{"case": "c", "metrics": {"num_solutions": 12, "num_variables": 300, "peak_rss_mb": 90.0}}]}
+    rows = {r['metric']: r for r in compare_reports(current, baseline)}
+    # More solutions in the same budget is no regression; a bigger peak RSS is
+    assert rows['num_solutions']['ratio'] == 3.0
+    assert not rows['num_solutions']['regression']
+    assert not rows['num_variables']['regression']
+    assert rows['peak_rss_mb']['regression']
+
+def test_run_case_reports_metrics():
+    params = dict(team_size=4, weeks=1, families=2, groups_per_family=1, seed=0)
+    config = {"ladder": ["Unassigned Group", "Underworked Team Member (< Threshold)"]}
+    metrics = run_case(params, [1], config)
+    assert metrics['num_groups'] == 2
+    assert metrics['num_variables'] > 0
+    assert metrics['status'] in ("OPTIMAL", "FEASIBLE")
+    assert metrics['objective_at_1s'] is not None
+
+def test_pipeline_benchmark_runs_on_generated_csvs():
+    from benchmarks.pipeline_bench import run_case
+    params = dict(team_size=6, weeks=1, tasks=7, rows_per_day=2, families=2, groups_per_family=1, seed=0)
+    sizes, metrics = run_case(params, repeat=1)
+    
+    assert sizes['calendar_columns'] == 4 + 7
+    assert metrics['num_tasks'] == sizes['schedule_rows']
+    assert metrics['num_groups'] > 0
+    for step in ["read_csv", "task_availability", "calendar_availability", "schedule", "groups", "export_csv"]:
+        assert metrics[f"{step}_seconds"] >= 0
+        assert metrics[f"{step}_peak_mb"] >= 0
@@ -0,0 +1,65 @@
+import json
+from unittest.mock import MagicMock
+from src.solver.trace import ConvergenceTrace, relative_gap
+
+def make_printer(wall_time, objective, bound):
+    printer = MagicMock()
+    printer.WallTime.return_value = wall_time
+    printer.ObjectiveValue.return_value = objective
+    printer.BestObjectiveBound.return_value = bound
+    printer.NumConflicts.return_value = 0
+    printer.NumBranches.return_value = 0
+    printer.NumBooleans.return_value = 0
+    printer.DeterministicTime.return_value = 0.0
+    return printer
+
+def test_relative_gap():
+    assert relative_gap(100, 100) == 0
+    assert relative_gap(200, 100) == 0.5
+    assert relative_gap(None, 100) is None
+
+def test_time_to_quality_metrics(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    trace = ConvergenceTrace(path, metadata={"prefix": "test"})
+    
+    trace.record_solution(make_printer(1.0, 1000, 0), {"Unassigned Group": 1000}, 3)
+    trace.record_solution(make_printer(2.0, 104, 90), {}, 2)
+    trace.record_solution(make_printer(5.0, 100.5, 95), {}, 2)
+    trace.record_solution(make_printer(9.0, 100, 100), {}, 1)
+    
+    summary = trace.close({"status": "OPTIMAL", "objective": 100, "best_bound": 100})
+    
+    assert summary["num_solutions"] == 4
+    assert summary["time_to_first_solution"] == 1.0
+    assert summary["time_to_within_5pct"] == 2.0
+    assert summary["time_to_within_1pct"] == 5.0
+    assert summary["final_gap"] == 0
+    
+    lines = [json.loads(l) for l in path.read_text(encoding='utf-8').splitlines()]
+    assert [l["event"] for l in lines] == ["run", "solution", "solution", "solution", "solution", "summary"]
+    assert lines[0]["prefix"] == "test"
+    assert lines[1]["breakdown"] == {"Unassigned Group": 1000}
+    assert lines[1]["active_penalties"] == 3
+
+def test_empty_trace(tmp_path):
+    trace = ConvergenceTrace(tmp_path / "trace.jsonl")
+    summary = trace.close(None)
+    assert summary["num_solutions"] == 0
+    assert summary["time_to_first_solution"] is None
+
+def test_trace_names_are_unique_and_pruned(tmp_path):
+    import os
+    import time
+    from src.solver.trace import prune_traces, trace_path
+
+    paths = []
+    for _ in range(5):
+        paths.append(trace_path(tmp_path, "january_2026"))
+        time.sleep(0.001) # One solve per process at a time: runs are always further apart
+    assert len(set(paths)) == 5
+    for i, path in enumerate(paths):
+        path.write_text("{}")
+        os.utime(path, (i, i))
+
+    prune_traces(tmp_path, 3)
+    assert sorted(tmp_path.glob("*.jsonl")) == sorted(paths[2:])
@@ -1,7 +1,9 @@
 
+import json
 import pytest
 import pandas as pd
 from src.step_02_convert_data import process_task_availability, process_calendar_availability, process_schedule
+from src.time_slots import AvailabilityIndex
 
 def test_process_task_availability(sample_task_availability_csv):
     df = pd.read_csv(sample_task_availability_csv)
@@ -21,18 +23,16 @@ def test_process_calendar_availability(sample_calendar_availability_csv):
     assert "Week 1" in result
     assert "Monday" in result["Week 1"]
     
-    slots = result["Week 1"]["Monday"]["time_slots"]
-    # Alice: 20-22 -> 20-21, 21-22
-    # Also 20-21 explicitly Yes
-    
-    # Bob: 21-22 Yes
+    # Alice: 20-21 and 20-22 merge into one interval
+    # Bob: 21-22
+    assert result["Week 1"]["Monday"]["intervals"] == {"Alice": ["20-22"], "Bob": ["21-22"]}
     
+    index = AvailabilityIndex(result)
     # 20-21 should have Alice
-    assert "Alice" in slots["20-21"]
+    assert index.names("Week 1", "Monday", "20-21") == ["Alice"]
     
     # 21-22 should have Alice (from 20-22) and Bob
-    assert "Alice" in slots["21-22"]
-    assert "Bob" in slots["21-22"]
+    assert index.names("Week 1", "Monday", "21-22") == ["Alice", "Bob"]
 
 def test_process_schedule_basic():
     # Mock Inputs
@@ -120,6 +120,11 @@ def test_convert_data_dynamic_args(tmp_path, monkeypatch):
     output_path = tmp_path / "data" / "processed" / f"{target_prefix}_tasks.json"
     assert output_path.exists(), f"File not found at {output_path}"
 
+    # Row map for step 05: one task ID per CSV row
+    task_rows = json.loads((tmp_path / "data" / "processed" / f"{target_prefix}_task_rows.json").read_text(encoding='utf-8'))
+    assert task_rows["source"] == f"{target_prefix}.csv"
+    assert task_rows["task_ids"] == ["T1_1_1_1"]
+
 
 def test_process_schedule_manual_override_unavailability():
     # Scenario: Alice is NOT available in calendar, but manually assigned to Task A.
@@ -152,3 +157,63 @@ def test_process_schedule_manual_override_unavailability():
     # CRITICAL CHECK: Alice must be in 'candidates' list for the solver to respect the assignment
     # currently this likely fails (Alice filtered out because not in calendar)
     assert "Alice" in t['candidates'], "Manual assignee Alice should be in candidates list even if unavailable"
+
+
+def test_process_calendar_availability_ordering_and_edge_cases():
+    """Week labels carry forward, the first column of a day sets its date, names keep sheet order."""
+    nan = float('nan')
+    df = pd.DataFrame([
+        [nan] * 8, [nan] * 8, [nan] * 8,
+        [nan, nan, nan, nan, "Week 1", nan, nan, "Week 2"],               # 3: Weeks
+        [nan, nan, nan, nan, "2026-01-05", "2026-01-05", nan, "2026-01-12"], # 4: Dates
+        [nan, nan, nan, nan, "Mon", "Mon", "Tue", "Mon"],                 # 5: Days
+        ["1", "Bob", "b", "L", "19-21", "All", nan, " 20-21 "],           # 6
+        ["2", "Alice", "a", "F", "20-21", nan, "unknown", "20-21"],       # 7
+    ])
+    result = process_calendar_availability(df)
+    
+    assert list(result) == ["Week 1", "Week 2"]
+    assert list(result["Week 1"]) == ["Mon", "Tue"]
+    assert result["Week 1"]["Mon"]["date"] == "2026-01-05"
+    # No date on the Tuesday column; unknown values add no intervals
+    assert pd.isna(result["Week 1"]["Tue"]["date"])
+    assert result["Week 1"]["Tue"]["intervals"] == {}
+    
+    # Column order first, then row order; a person's intervals across columns are merged
+    mon = result["Week 1"]["Mon"]["intervals"]
+    assert list(mon) == ["Bob", "Alice"]
+    assert mon == {"Bob": ["19-00"], "Alice": ["20-21"]}
+    assert result["Week 2"]["Mon"]["intervals"] == {"Bob": ["20-21"], "Alice": ["20-21"]}
+
+
+def test_process_schedule_task_ids():
+    """Task numbers follow first appearance per (week, day); repeats count identical rows."""
+    jan_df = pd.DataFrame([
+        {"Week": 1.0, "Day": "Monday", "Time": "20-21", "TODO": "Task A", "Assignee": None, "EFFORT": 1.0},
+        {"Week": 1.0, "Day": "Monday", "Time": "20-21", "TODO": "Task B", "Assignee": None, "EFFORT": 1.0},
+        {"Week": None, "Day": None, "Time": None, "TODO": None, "Assignee": None, "EFFORT": None}, # Separator
+        {"Week": 1.0, "Day": "Monday", "Time": "20-21", "TODO": "Task A", "Assignee": None, "EFFORT": "n/a"},
+        {"Week": 1.0, "Day": "Monday", "Time": "21-22", "TODO": "Task C ", "Assignee": None, "EFFORT": 1.0},
+        {"Week": 1.0, "Day": "Tuesday", "Time": "20-21", "TODO": "Task B", "Assignee": None, "EFFORT": 1.0},
+        {"Week": 2.0, "Day": None, "Time": None, "TODO": "Task A", "Assignee": "Bob", "EFFORT": 1.0},
+    ])
+    tasks_data = [
+        {"name": "Task A", "candidates": ["Bob", "Alice"]},
+        {"name": "Task B", "candidates": ["Alice"]},
+        {"name": "Task C", "candidates": ["Bob"]}
+    ]
+    calendar_data = {"Week 1": {"Mon": {"time_slots": {"20-21": ["Alice", "Bob"], "21-22": ["Bob"]}}}}
+    
+    result = process_schedule(jan_df, tasks_data, calendar_data)
+    
+    assert [t['id'] for t in result] == ["T1_1_1_1", "T1_1_2_1", "T1_1_1_2", "T1_1_3_1", "T1_2_1_1", "T2_0_1_1"]
+    assert [t['repeat_index'] for t in result] == [1, 1, 2, 1, 1, 1]
+    assert result[0]['week'] == 1 and isinstance(result[0]['week'], int)
+    assert result[2]['effort'] == 0.0
+    # Intersections are sorted; the stripped name matches the capability table
+    assert result[0]['candidates'] == ["Alice", "Bob"]
+    assert result[3]['candidates'] == ["Bob"]
+    assert result[4]['candidates'] == [] # No calendar entry for Tuesday
+    # No day: all capable candidates
+    assert result[5]['day'] is None
+    assert result[5]['candidates'] == ["Alice", "Bob"]
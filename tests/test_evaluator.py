@@ -0,0 +1,58 @@
+import pytest
+
+from benchmarks.instances import generate_instance
+from src.solver.evaluator import ObjectiveEvaluator, evaluate
+from src.solver.solver import SATSolver, load_config
+
+def make_config(team, pairs=True, **overrides):
+    config = {**load_config(), "time_limit_seconds": 5, "progress_interval_seconds": 0, **overrides}
+    config["preferred_pairs"] = [[team[0]["name"], team[1]["name"]]] if pairs else []
+    return config
+
+@pytest.mark.parametrize("pairs, disabled_rules", [
+    (True, []),
+    (False, ["Multi-Day General (Weekday+Sunday)"])
+])
+def test_matches_extract_solution_for_every_solution(pairs, disabled_rules):
+    groups, team = generate_instance(team_size=12, weeks=5, families=4, priority_share=0.3, manual_share=0.2, seed=1)
+    config = make_config(team, pairs=pairs, disabled_rules=disabled_rules)
+    solver = SATSolver(groups, team, config, log=lambda line: None, events=lambda event: None)
+    seen = []
+    solver.solve(solution_callback=lambda cb: seen.append((*solver.extract_solution(cb), cb.ObjectiveValue(), dict(cb.breakdown))))
+    assert seen
+
+    evaluator = ObjectiveEvaluator(groups, team, config)
+    for results, penalties, objective, breakdown in seen:
+        result = evaluator.evaluate({g_id: a["assignee"] for g_id, a in results.items()})
+        assert result.costs.keys() == breakdown.keys() # Same rules: those with cost terms
+        assert result.penalties == penalties
+        assert result.assignments == results
+        # The model only bounds Inefficient Day from below: an incumbent may pay for a day it need not
+        inefficient = "Inefficient Day (< 2 Tasks)"
+        assert result.costs[inefficient] <= breakdown[inefficient]
+        assert {r: c for r, c in result.costs.items() if r != inefficient} == {r: c for r, c in breakdown.items() if r != inefficient}
+        assert result.total == objective - (breakdown[inefficient] - result.costs[inefficient])
+        assert result.violations == []
+
+def test_disabled_rules_and_hand_edits():
+    groups, team = generate_instance(team_size=8, weeks=2, families=3, groups_per_family=1, seed=2)
+    config = make_config(team, disabled_rules=["Effort Equalization"])
+    solver = SATSolver(groups, team, config, log=lambda line: None, events=lambda event: None)
+    results, _ = solver.solve()
+    assignments = {g_id: a["assignee"] for g_id, a in results.items()}
+
+    evaluator = ObjectiveEvaluator(groups, team, config)
+    assert "Effort Equalization" not in evaluator.evaluate(assignments).costs
+
+    # Someone outside the candidates is still scored, and reported
+    group = next(g for g in groups if set(m["name"] for m in team) - set(g["filtered_candidates_list"]))
+    outsider = sorted(set(m["name"] for m in team) - set(group["filtered_candidates_list"]))[0]
+    edited = evaluate(groups, team, config, {**assignments, group["id"]: outsider})
+    assert edited.assignments[group["id"]]["assignee"] == outsider
+    assert [(v["group_id"], v["constraint"]) for v in edited.violations] == [(group["id"], "Candidates")]
+
+    unassigned = evaluator.evaluate({**assignments, group["id"]: None})
+    assert any(p["rule"] == "Unassigned Group" and p["group_id"] == group["id"] for p in unassigned.penalties)
+
+    with pytest.raises(ValueError):
+        evaluator.evaluate({group["id"]: "Nobody"})
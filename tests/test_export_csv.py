@@ -0,0 +1,59 @@
+import json
+import pandas as pd
+from src.step_02_convert_data import assign_task_ids, schedule_columns, task_row_ids, file_digest
+from src.step_05_export_csv import export_csv_for_month
+
+SCHEDULE = (
+    "Week,Day,Time,TODO,Assignee,EFFORT\n"
+    "1,Monday,20-21,Task A,,1\n"
+    ",,,,,\n"
+    "1,Monday,20-21,Task A,Zoe,1\n"
+    "1,Tuesday,20-21,Task B,,1\n"
+)
+
+def write_month(tmp_path):
+    for sub in ["raw", "processed", "results"]:
+        (tmp_path / "data" / sub).mkdir(parents=True, exist_ok=True)
+    csv_path = tmp_path / "data" / "raw" / "m_2026.csv"
+    csv_path.write_text(SCHEDULE, encoding='utf-8')
+    groups = [
+        {"id": "G1", "name": "Task A", "tasks": [["T1_1_1_1", "Task A"], ["T1_1_1_2", "Task A"]]},
+        {"id": "G2", "name": "Task B", "tasks": [["T1_2_1_1", "Task B"]], "assignee": "Max"}
+    ]
+    (tmp_path / "data" / "processed" / "m_2026_groups.json").write_text(json.dumps(groups), encoding='utf-8')
+    return csv_path
+
+def read_assignees(path):
+    return pd.read_csv(path, encoding='utf-8-sig')['Assignee'].tolist()
+
+def test_export_joins_row_map(tmp_path, monkeypatch):
+    csv_path = write_month(tmp_path)
+    jan_df = pd.read_csv(csv_path)
+    task_ids = task_row_ids(assign_task_ids(schedule_columns(jan_df)), len(jan_df))
+    assert task_ids == ["T1_1_1_1", None, "T1_1_1_2", "T1_2_1_1"]
+    (tmp_path / "data" / "processed" / "m_2026_task_rows.json").write_text(
+        json.dumps({"source": "m_2026.csv", "source_sha256": file_digest(csv_path), "task_ids": task_ids}), encoding='utf-8')
+
+    results = tmp_path / "data" / "results"
+    (results / "m_2026_assignments.json").write_text(json.dumps({"G1": {"assignee": "Ann"}}), encoding='utf-8')
+    (results / "alt_assignments.json").write_text(json.dumps({"G1": "Bea", "G2": {"assignee": "Cid"}}), encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+
+    written = export_csv_for_month("m_2026", [results / "m_2026_assignments.json", results / "alt_assignments.json"])
+    assert [p.name for p in written] == ["m_2026_filled.csv", "alt_filled.csv"]
+    # Solver pick, else the group's manual assignee; the separator row stays empty
+    assert read_assignees(written[0])[0::2] == ["Ann", "Ann"]
+    assert read_assignees(written[0])[3] == "Max"
+    assert pd.isna(read_assignees(written[0])[1])
+    assert read_assignees(written[1])[2:] == ["Bea", "Cid"]
+
+def test_export_rederives_ids_for_stale_row_map(tmp_path, monkeypatch):
+    write_month(tmp_path)
+    # Written for an older version of the CSV: ignored
+    (tmp_path / "data" / "processed" / "m_2026_task_rows.json").write_text(
+        json.dumps({"source": "m_2026.csv", "source_sha256": "old", "task_ids": ["T1_2_1_1"] * 4}), encoding='utf-8')
+    (tmp_path / "data" / "results" / "m_2026_assignments.json").write_text(json.dumps({"G1": "Ann"}), encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+
+    written = export_csv_for_month("m_2026")
+    assert read_assignees(written[0])[0::2] == ["Ann", "Ann"]
@@ -0,0 +1,47 @@
+import json
+import os
+import pytest
+from src import interchange
+from src.interchange import data_format, data_path, data_exists, load_data, save_data
+
+GROUPS = [{"id": "G1_1_1_1", "name": "Task Ä", "candidates_list": ["Alice", "Bob"], "effort": 1.5, "assignee": None}]
+
+def test_json_is_the_default_and_unchanged(tmp_path):
+    path = tmp_path / "groups.json"
+    assert data_format({}) == "json"
+    blob = save_data(GROUPS, path)
+    assert path.read_bytes() == blob
+    assert blob.decode('utf-8').startswith('[\n    {\n        "id"')
+    assert load_data(path) == GROUPS
+
+def test_msgpack_roundtrip_with_json_export(tmp_path):
+    pytest.importorskip("msgpack")
+    path = tmp_path / "groups.json"
+    fmt = data_format({"interchange_format": "msgpack"})
+    assert fmt == "msgpack"
+
+    save_data(GROUPS, path, fmt)
+    assert data_path(path, fmt).exists() and not path.exists()
+    assert load_data(path) == GROUPS
+
+    save_data(GROUPS, path, fmt, export_json=True)
+    assert json.loads(path.read_text(encoding='utf-8')) == GROUPS
+    assert interchange.find_data(path)[1] == "msgpack"
+
+def test_newest_file_wins(tmp_path):
+    pytest.importorskip("msgpack")
+    path = tmp_path / "assignments.json"
+    save_data({"G1": "Alice"}, path, "msgpack")
+    save_data({"G1": "Bob"}, path, "json")
+    os.utime(data_path(path, "msgpack"), ns=(0, 0))
+    assert load_data(path) == {"G1": "Bob"}
+
+def test_missing_and_unknown(tmp_path, monkeypatch):
+    assert not data_exists(tmp_path / "nothing.json")
+    with pytest.raises(FileNotFoundError):
+        load_data(tmp_path / "nothing.json")
+    with pytest.raises(ValueError):
+        data_format({"interchange_format": "xml"})
+
+    monkeypatch.setattr(interchange, "msgpack", None)
+    assert data_format({"interchange_format": "msgpack"}) == "json"
@@ -0,0 +1,115 @@
+import asyncio
+import sys
+
+from src.jobs import JobManager
+
+# Stands in for step 04: one solution event, then waits for a stop on stdin (or sleeps --time-limit)
+FAKE_SOLVER = """
+import argparse, json, os, pathlib, sys, time
+p = argparse.ArgumentParser()
+p.add_argument("prefix")
+p.add_argument("--results-dir")
+p.add_argument("--events-fd", type=int)
+p.add_argument("--search-workers")
+p.add_argument("--stop-on-stdin", action="store_true")
+p.add_argument("--time-limit", type=float, default=None)
+a = p.parse_args()
+events = os.fdopen(a.events_fd, "w", buffering=1)
+print("Solving...", flush=True)
+events.write(json.dumps({"event": "solution", "solution": 1, "objective": 10}) + "\\n")
+if a.time_limit is None:
+    sys.stdin.readline()
+else:
+    time.sleep(a.time_limit)
+pathlib.Path(a.results_dir, a.prefix + "_assignments.json").write_text("{}")
+events.write(json.dumps({"event": "finished", "stopped": a.time_limit is None}) + "\\n")
+"""
+
+def make_manager(tmp_path, max_jobs):
+    script = tmp_path / "fake_solver.py"
+    script.write_text(FAKE_SOLVER, encoding='utf-8')
+    return JobManager([sys.executable, script], tmp_path / "jobs", publish_dir=tmp_path / "results", max_jobs=max_jobs)
+
+def test_cancel_keeps_result_and_fans_out(tmp_path):
+    async def scenario():
+        manager = make_manager(tmp_path, max_jobs=1)
+        first = manager.submit("january_2026", publish=True)
+        second = manager.submit("january_2026")
+        assert second.status == "queued"
+
+        async def follow(job):
+            seen = []
+            async for event in manager.subscribe(job.id):
+                seen.append(event)
+                if event["event"] == "solution":
+                    manager.cancel(job.id)
+            return seen
+
+        # A queued job is dropped without starting a solver
+        manager.cancel(second.id)
+        viewers = await asyncio.gather(follow(first), follow(first))
+        await manager.shutdown()
+        return manager, first, second, viewers
+
+    manager, first, second, (a, b) = asyncio.run(scenario())
+    assert second.status == "cancelled" and second.process is None
+
+    # Stopped gracefully: the solver finished and its best solution was written and published
+    assert first.status == "cancelled" and first.return_code == 0
+    assert first.result == {"event": "finished", "stopped": True}
+    assert (first.results_dir / "january_2026_assignments.json").exists()
+    assert (tmp_path / "results" / "january_2026_assignments.json").exists()
+    assert first.summary()["has_result"]
+
+    # Both viewers saw the whole run, ending with the final state
+    assert a == b
+    assert [e["status"] for e in a if e["event"] == "job"] == ["queued", "running", "cancelling", "cancelled"]
+    assert {"event": "log", "line": "Solving..."} in a
+
+def test_jobs_run_concurrently_in_own_directories(tmp_path):
+    async def scenario():
+        manager = make_manager(tmp_path, max_jobs=2)
+        submitted = [manager.submit("january_2026", time_limit=0.5) for _ in range(2)]
+        await manager.join()
+        return submitted
+
+    first, second = asyncio.run(scenario())
+    assert first.status == second.status == "completed"
+    assert first.results_dir != second.results_dir
+    # Both slots were in use at the same time
+    assert second.started < first.finished
+
+def test_real_solver_stops_gracefully(tmp_path, monkeypatch):
+    import json
+    from pathlib import Path
+    from benchmarks.instances import generate_instance
+
+    root = Path(__file__).resolve().parent.parent
+    groups, team = generate_instance(team_size=20, weeks=4, families=6, groups_per_family=2, seed=1)
+    data = tmp_path / "data"
+    (data / "processed").mkdir(parents=True)
+    (data / "processed" / "test_month_groups.json").write_text(json.dumps(groups), encoding='utf-8')
+    (data / "team_members.json").write_text(json.dumps(team), encoding='utf-8')
+    config = json.loads((root / "data" / "penalty_config.json").read_text(encoding='utf-8'))
+    config.update(time_limit_seconds=120, cache_max_entries=0, progress_interval_seconds=0)
+    (data / "penalty_config.json").write_text(json.dumps(config), encoding='utf-8')
+    # Step 04 imports src from its working directory's path
+    monkeypatch.setenv("PYTHONPATH", str(root))
+
+    async def scenario():
+        manager = JobManager([sys.executable, "-u", root / "src" / "step_04_run_solver.py"],
+                             data / "results" / "jobs", max_jobs=1, cwd=tmp_path)
+        job = manager.submit("test_month")
+        async for event in manager.subscribe(job.id):
+            if event["event"] == "solution":
+                manager.cancel(job.id)
+        await manager.join()
+        return job
+
+    job = asyncio.run(scenario())
+    # Stopped long before the time limit, with the best solution written
+    assert job.status == "cancelled" and job.return_code == 0
+    assert job.result["event"] == "finished" and job.result["stopped"]
+    assert job.finished - job.started < 60
+    assignments = json.loads((job.results_dir / "test_month_assignments.json").read_text(encoding='utf-8'))
+    assert set(assignments) == {g["id"] for g in groups}
@@ -0,0 +1,52 @@
+import pytest
+from src.person_index import PersonIndex
+from src.step_03_aggregate_groups import finalize_candidate_lists
+
+def test_encode_decode_roundtrip_sorted():
+    index = PersonIndex(["Charlie", "Alice", "Bob", float('nan'), "Alice"])
+    assert index.names == ["Alice", "Bob", "Charlie"]
+
+    mask = index.encode(["Charlie", "Alice"])
+    assert index.decode(mask) == ["Alice", "Charlie"]
+    assert PersonIndex.count(mask) == 2
+    assert index.decode(0) == []
+
+    # Intersection is a bitwise AND
+    assert index.decode(mask & index.encode(["Bob", "Charlie"])) == ["Charlie"]
+
+def test_unknown_names():
+    index = PersonIndex(["Alice"])
+    with pytest.raises(KeyError):
+        index.encode(["Zoe"])
+    assert index.encode(["Zoe", "Alice"], ignore_unknown=True) == index.encode(["Alice"])
+    assert index.encode([float('nan')]) == 0
+
+def test_decode_beyond_one_byte():
+    names = [f"P{i:03d}" for i in range(200)]
+    index = PersonIndex(names)
+    picked = names[::7] + [names[-1]]
+    assert index.decode(index.encode(picked)) == sorted(set(picked))
+
+def test_role_masks(sample_team_members):
+    member_map = {m['name']: m for m in sample_team_members}
+    index = PersonIndex.from_sources(sample_team_members, ["Outsider"])
+
+    assert "Outsider" in index
+    # Unregistered team members never pass role filtering, even for 'any'
+    assert not index.role_mask('any', member_map) & index.encode(["Outsider"])
+    for m in sample_team_members:
+        bit = index.encode([m['name']])
+        assert bool(index.role_mask('leader', member_map) & bit) == (m['role'] == 'leader' or m['both'])
+        assert bool(index.role_mask('follower', member_map) & bit) == (m['role'] == 'follower' or m['both'])
+
+def test_finalize_candidate_lists_without_index(sample_team_members):
+    member_map = {m['name']: m for m in sample_team_members}
+    names = [m['name'] for m in sample_team_members]
+    leaders = sorted(m['name'] for m in sample_team_members if m['role'] == 'leader' or m['both'])
+
+    group = {"role": "leader", "candidates_list": sorted(names + ["Outsider"])}
+    finalize_candidate_lists(group, member_map, {"PriorityAssignees": [leaders[0], "Outsider", "Nobody"]})
+
+    assert group["filtered_candidates_list"] == leaders
+    assert group["priority_candidates_list"] == sorted([leaders[0], "Outsider"])
+    assert group["filtered_priority_candidates_list"] == [leaders[0]]
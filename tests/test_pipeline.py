@@ -0,0 +1,66 @@
+import json
+from src.pipeline import Node, Pipeline, build_nodes, required, target_nodes
+
+def make_nodes(tmp_path, calls, fail=()):
+    src = tmp_path / "a.txt"
+    mid = tmp_path / "b.json"
+    out = tmp_path / "c.txt"
+
+    def step(name, fn):
+        def run():
+            calls.append(name)
+            if name in fail:
+                raise ValueError("boom")
+            fn()
+        return run
+
+    return {
+        "b": Node("b", step("b", lambda: mid.write_text(json.dumps({"v": src.read_text()}))), inputs=[src], outputs=[mid]),
+        "c": Node("c", step("c", lambda: out.write_text(json.loads(mid.read_text())["v"].upper())), inputs=[mid], outputs=[out], deps=["b"]),
+        "d": Node("d", step("d", lambda: None), deps=["c"], always=True)
+    }, src, mid, out
+
+def test_runs_only_what_changed(tmp_path):
+    calls = []
+    nodes, src, mid, out = make_nodes(tmp_path, calls)
+    src.write_text("x")
+    pipeline = Pipeline(nodes, state_dir=tmp_path / "state", jobs=2)
+
+    assert pipeline.run(["d"]) == {"b": "ran", "c": "ran", "d": "ran"}
+    assert out.read_text() == "X"
+    # Nothing changed: only the always-run node
+    calls.clear()
+    assert Pipeline(nodes, state_dir=tmp_path / "state").run(["c"]) == {"b": "skipped", "c": "skipped"}
+    assert calls == []
+
+    # Same content rewritten: still up to date (content hashes, not timestamps)
+    src.write_text("x")
+    assert Pipeline(nodes, state_dir=tmp_path / "state").run(["c"])["b"] == "skipped"
+
+    # A changed source re-runs the chain; a modified output re-runs its producer only
+    src.write_text("y")
+    dry = Pipeline(nodes, state_dir=tmp_path / "state").run(["c"], dry_run=True)
+    assert dry == {"b": "would run", "c": "would run"} and calls == []
+    assert Pipeline(nodes, state_dir=tmp_path / "state").run(["c"]) == {"b": "ran", "c": "ran"}
+    out.write_text("edited")
+    assert Pipeline(nodes, state_dir=tmp_path / "state").run(["c"]) == {"b": "skipped", "c": "ran"}
+    assert out.read_text() == "Y"
+
+def test_failure_blocks_dependents(tmp_path):
+    calls = []
+    nodes, src, mid, out = make_nodes(tmp_path, calls, fail={"b"})
+    src.write_text("x")
+    assert Pipeline(nodes, state_dir=tmp_path / "state").run(["d"]) == {"b": "failed", "c": "blocked", "d": "blocked"}
+    assert calls == ["b"]
+
+    # A node that "succeeds" without writing its outputs has failed too
+    nodes["b"].run = lambda: None
+    assert Pipeline(nodes, state_dir=tmp_path / "state").run(["b"]) == {"b": "failed"}
+
+def test_build_nodes_dag():
+    nodes = build_nodes(["january_2026", "february_2026"])
+    needed = required(nodes, target_nodes("export", ["january_2026"]))
+    # Export does not re-solve; it reads the last result
+    assert needed == {"tasks", "calendar", "schedule:january_2026", "groups:january_2026", "export:january_2026"}
+    assert nodes["solve:january_2026"].always and nodes["groups:february_2026"].lock == nodes["groups:january_2026"].lock
+    assert "download" in build_nodes(["january_2026"], download_month="January 2026")["tasks"].deps
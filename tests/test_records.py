@@ -0,0 +1,47 @@
+import pytest
+from src.records import Group, Task, Assignment, decode_assignments, decode_team
+
+def test_group_derived_candidates():
+    group = Group.from_dict({
+        "id": "G1_1_1_1", "name": "Task A",
+        "candidates_list": ["Alice", "Bob", "Carol"], "filtered_candidates_list": [],
+        "priority_candidates_list": ["Bob"], "filtered_priority_candidates_list": []
+    })
+    # Empty filtered lists fall back to the unfiltered ones
+    assert group.candidates == ["Alice", "Bob", "Carol"]
+    assert group.priority_candidates == ["Bob"]
+    # ...but the solver only ever sees filtered candidates
+    assert group.solver_candidates == []
+    assert group.task_count == 1 and group.exclusive_groups == []
+
+    manual = Group.from_dict({"id": "G1", "name": "A", "assignee": "Dave", "filtered_candidates_list": ["Alice"]})
+    assert manual.solver_candidates == ["Dave"]
+    prio = Group.from_dict({"id": "G2", "name": "A", "filtered_priority_candidates_list": ["Bob", "Bob"], "filtered_candidates_list": ["Alice", "Bob"]})
+    assert prio.solver_candidates == ["Bob"]
+
+    assert Group.of(manual) is manual
+    assert "candidates" not in manual.to_dict()
+
+def test_invalid_records_are_rejected():
+    with pytest.raises(ValueError, match="'id'"):
+        Group.from_dict({"name": "No ID"})
+    with pytest.raises(ValueError, match="G1.*filtered_candidates_list"):
+        Group.from_dict({"id": "G1", "name": "A", "filtered_candidates_list": "Alice"})
+    with pytest.raises(ValueError, match="effort"):
+        Task.from_dict({"id": "T1", "name": "A", "effort": "2"})
+    with pytest.raises(ValueError, match="name"):
+        decode_team([{"role": "leader"}])
+
+def test_task_and_assignment_decoding():
+    task = Task.from_dict({"id": "T1", "name": "A", "week": 1, "day": "Monday", "candidates": ["Alice"]})
+    assert (task.repeat_index, task.effort, task.assignee) == (1, 0.0, None)
+    assert task.to_dict()["candidates"] == ["Alice"]
+
+    assignments = decode_assignments({
+        "G1": {"group_name": "A", "assignee": "Alice", "method": "manual"},
+        "G2": {"group_name": "B", "assignee": None},
+        "G3": "Bob" # Older files: ID -> name
+    })
+    assert assignments["G1"] == Assignment("A", "Alice", "manual")
+    assert assignments["G2"].method == "automatic"
+    assert assignments["G3"].assignee == "Bob"
@@ -0,0 +1,50 @@
+from benchmarks.instances import generate_instance
+from src.scenarios import build_variants, format_table, run_scenarios
+
+LADDER = ["Unassigned Group", "Underworked Team Member (< Threshold)", "Effort Equalization"]
+
+def test_build_variants():
+    config = {"ladder": LADDER, "disabled_rules": ["Preferred Pair"]}
+    variants = build_variants(
+        config,
+        [{"name": "flat", "penalty_ratio": 2}],
+        effort_thresholds=[6, 8], penalty_ratios=[5],
+        disable=["Effort Equalization"], swap_adjacent=True
+    )
+    names = [name for name, _ in variants]
+    assert names == [
+        "baseline", "flat",
+        "effort_threshold=6, penalty_ratio=5", "effort_threshold=8, penalty_ratio=5",
+        "without Effort Equalization", "swap 1<->2", "swap 2<->3"
+    ]
+    overrides = dict(variants)
+    assert overrides["baseline"] == {}
+    assert overrides["without Effort Equalization"] == {"disabled_rules": ["Preferred Pair", "Effort Equalization"]}
+    assert overrides["swap 2<->3"] == {"ladder": [LADDER[0], LADDER[2], LADDER[1]]}
+
+def test_unknown_variant_key_is_rejected():
+    try:
+        build_variants({"ladder": LADDER}, [{"name": "typo", "effort_treshold": 6}])
+    except ValueError as e:
+        assert "effort_treshold" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+def test_scenarios_are_compared_against_the_baseline():
+    groups, team = generate_instance(team_size=6, weeks=1, families=3, groups_per_family=1, seed=1)
+    config = {"ladder": LADDER, "time_limit_seconds": 5}
+    variants = build_variants(config, effort_thresholds=[1, 20])
+    comparison = run_scenarios(groups, team, config, variants, max_workers=2)
+
+    baseline, low, high = comparison["scenarios"]
+    assert [s["name"] for s in comparison["scenarios"]] == [name for name, _ in variants]
+    assert baseline["changed"] == {}
+    assert set(baseline["assignments"]) == {g["id"] for g in groups}
+    # Nobody can reach a threshold of 20, everybody reaches 1
+    underworked = "Underworked Team Member (< Threshold)"
+    assert high["violations"].get(underworked, 0) >= baseline["violations"].get(underworked, 0) >= low["violations"].get(underworked, 0)
+    assert comparison["rules"][:3] == LADDER
+
+    table = format_table(comparison).splitlines()
+    assert table[0].split()[0] == "Rule"
+    assert table[-1].startswith("Changed assignments")
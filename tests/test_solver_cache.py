@@ -0,0 +1,77 @@
+import os
+import pytest
+from src.solver.solver import SATSolver
+from src.solver.cache import SolverCache, canonical_hash
+
+@pytest.fixture
+def sample_team():
+    return [
+        {"name": "Alice", "role": "leader", "both": False},
+        {"name": "Bob", "role": "follower", "both": False}
+    ]
+
+@pytest.fixture
+def sample_groups():
+    return [
+        {"id": "G1_1_1_1", "name": "Task 1", "week": 1, "day": "Monday", "family": "FamA",
+         "filtered_candidates_list": ["Alice", "Bob"], "task_count": 1, "effort": 1.0},
+        {"id": "G1_2_1_1", "name": "Task 2", "week": 1, "day": "Tuesday", "family": "FamA",
+         "filtered_candidates_list": ["Alice", "Bob"], "task_count": 1, "effort": 1.0},
+    ]
+
+def test_canonical_hash_ignores_key_order():
+    assert canonical_hash({"a": 1, "b": [1, 2]}) == canonical_hash({"b": [1, 2], "a": 1})
+    assert canonical_hash({"a": 1}) != canonical_hash({"a": 2})
+
+def test_optimal_result_is_reused(tmp_path, sample_groups, sample_team):
+    cache = SolverCache(tmp_path / "cache")
+
+    first = SATSolver(sample_groups, sample_team)
+    res1, pen1 = first.solve(cache=cache)
+    assert res1
+
+    # Second run: served from the cache, no model is built
+    second = SATSolver(sample_groups, sample_team)
+    res2, pen2 = second.solve(cache=cache)
+    assert second.model is None
+    assert res2 == res1
+    assert pen2 == pen1
+
+def test_changed_input_misses_cache(tmp_path, sample_groups, sample_team):
+    cache = SolverCache(tmp_path / "cache")
+    SATSolver(sample_groups, sample_team).solve(cache=cache)
+
+    sample_groups[0]['effort'] = 2.0
+    solver = SATSolver(sample_groups, sample_team)
+    solver.solve(cache=cache)
+    assert solver.model is not None
+
+def test_model_version_misses_cache(tmp_path, sample_groups, sample_team, monkeypatch):
+    import src.solver.solver as solver_module
+    cache = SolverCache(tmp_path / "cache")
+    SATSolver(sample_groups, sample_team).solve(cache=cache)
+
+    # A changed model never reuses an entry of the old one, even a proven optimum
+    monkeypatch.setattr(solver_module, "MODEL_VERSION", solver_module.MODEL_VERSION + 1)
+    solver = SATSolver(sample_groups, sample_team)
+    solver.solve(cache=cache)
+    assert solver.model is not None
+
+def test_lru_eviction(tmp_path, sample_groups, sample_team):
+    solver = SATSolver(sample_groups, sample_team)
+    solver.solve()
+    model = solver.model
+
+    cache = SolverCache(tmp_path / "cache", max_entries=2)
+    cache.put("a", model, "OPTIMAL", 0, 0, [], {}, [])
+    cache.put("b", model, "OPTIMAL", 0, 0, [], {}, [])
+    # Make 'a' the oldest, then touch it through get() so 'b' becomes LRU
+    os.utime(cache._meta_path("a"), (1, 1))
+    os.utime(cache._meta_path("b"), (2, 2))
+    assert cache.get("a") is not None
+
+    cache.put("c", model, "OPTIMAL", 0, 0, [], {}, [])
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert not cache._model_path("b").exists()
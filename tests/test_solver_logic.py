@@ -148,3 +148,70 @@ def test_manual_override_exclusivity(sample_team):
     assert res["G2"]["assignee"] == "Alice"
     assert res["G1"]["method"] == "manual"
     assert res["G2"]["method"] == "manual"
+
+def test_overlap_clique_exclusivity(sample_team):
+    """At most one group of a time-overlap clique per person; manual assignments still win."""
+    def group(g_id, candidates, assignee=None):
+        return {"id": g_id, "name": f"Task {g_id}", "week": 1, "day": "Mon", "assignee": assignee,
+                "filtered_candidates_list": candidates, "overlap_cliques": ["C1_1_1"], "task_count": 1}
+    
+    groups = [group("G1", ["Alice"]), group("G2", ["Alice"]), group("G3", ["Alice"])]
+    res, _ = SATSolver(groups, sample_team).solve()
+    assert [res[g]["assignee"] for g in ("G1", "G2", "G3")].count("Alice") == 1
+    
+    groups = [group("G1", ["Alice"], "Alice"), group("G2", ["Alice"], "Alice"), group("G3", ["Alice", "Bob"])]
+    res, _ = SATSolver(groups, sample_team).solve()
+    assert res["G1"]["assignee"] == "Alice" and res["G2"]["assignee"] == "Alice"
+    assert res["G3"]["assignee"] == "Bob"
+
+def test_build_profile_reports_rule_sections(sample_groups, sample_team):
+    """Every ladder section of solve() is profiled with non-negative counts."""
+    solver = SATSolver(sample_groups, sample_team)
+    solver.solve()
+    
+    profile = solver.build_profile
+    sections = {row['section']: row for row in profile['sections']}
+    for name in ["Unassigned", "Underworked", "Multi-Day", "Cooldown", "Chains",
+                 "Diversity", "Teaching", "Equalization", "Preferred Pair"]:
+        assert name in sections
+        assert sections[name]['seconds'] >= 0
+        
+    # Base owns the assignment variables, Unassigned adds one term per group
+    assert sections['Base']['variables'] > 0
+    assert sections['Unassigned']['objective_terms'] == len(sample_groups)
+    assert profile['totals']['variables'] == len(solver.model.Proto().variables)
+
+def test_live_breakdown_sums_to_objective(sample_groups, sample_team):
+    """Per-rule costs reported by the solution callback add up to the objective."""
+    solver = SATSolver(sample_groups, sample_team)
+    seen = []
+    solver.solve(progress_callback=lambda printer: seen.append((printer.ObjectiveValue(), dict(printer.breakdown))))
+    
+    assert seen
+    objective, breakdown = seen[-1]
+    assert sum(breakdown.values()) == round(objective)
+    assert set(breakdown) <= set(solver.rule_definitions)
+    # Both people are below the effort threshold with a single 1.0 task
+    assert breakdown["Underworked Team Member (< Threshold)"] > 0
+
+def test_progress_events(sample_groups, sample_team, capsys):
+    """With a progress sink, solve() emits typed events instead of the "Breakdown:" lines."""
+    from src import progress
+    events = []
+    previous = progress.set_sink(events.append)
+    try:
+        solver = SATSolver(sample_groups, sample_team)
+        solver.solve()
+    finally:
+        progress.set_sink(previous)
+
+    kinds = [e["event"] for e in events]
+    assert kinds.index("model_built") < kinds.index("solution")
+    built = events[kinds.index("model_built")]
+    assert built["variables"] == solver.build_profile["totals"]["variables"]
+    assert {"Base", "Unassigned", "Search"} <= {e["name"] for e in events if e["event"] == "stage"}
+
+    solution = [e for e in events if e["event"] == "solution"][-1]
+    assert sum(solution["breakdown"].values()) == solution["objective"] == round(solver.solve_stats["objective"])
+    out = capsys.readouterr().out
+    assert "Solution " in out and "Breakdown:" not in out
@@ -0,0 +1,68 @@
+import os
+import threading
+import time
+
+import pytest
+
+from benchmarks.instances import generate_instance
+from src.solver.solver import SATSolver, load_config
+from src.solver.parallel import solve_many
+
+def make_solver(seed, time_limit, lines=None, events=None, size=None, **config):
+    groups, team = generate_instance(seed=seed, **(size or {"team_size": 20, "weeks": 2, "families": 6}))
+    config = {**load_config(), "time_limit_seconds": time_limit, "num_search_workers": 1, **config}
+    return SATSolver(groups, team, config, log=(lines.append if lines is not None else lambda line: None), events=events)
+
+def test_instances_log_to_their_own_sinks(capsys):
+    logs = [[], []]
+    events = [[], []]
+    # Tiny instances solved to optimality (time limit 0: none), every solution reported: no dependence on load
+    tiny = {"team_size": 4, "weeks": 1, "families": 2, "groups_per_family": 1}
+    solvers = [make_solver(seed, 0, logs[seed], events[seed].append, size=tiny, progress_interval_seconds=0)
+               for seed in range(2)]
+    results = solve_many(solvers, max_workers=2)
+
+    assert all(assignments for assignments, _ in results)
+    assert all(solver.solve_stats["status"] == "OPTIMAL" for solver in solvers)
+    for seed in range(2):
+        assert any(line.startswith("Solution ") for line in logs[seed])
+        assert any(e["event"] == "model_built" for e in events[seed])
+        assert any(e["event"] == "solution" for e in events[seed])
+    # Nothing went through the process's stdout
+    assert capsys.readouterr().out == ""
+
+def test_one_solve_per_instance_and_stop_keeps_solution():
+    searching = threading.Event()
+    solver = make_solver(0, 60, events=lambda e: e["event"] == "solution" and searching.set())
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(value=solver.solve()))
+    worker.start()
+    assert searching.wait(30)
+
+    with pytest.raises(RuntimeError):
+        solver.solve()
+    started = time.perf_counter()
+    solver.stop()
+    worker.join(30)
+    assert time.perf_counter() - started < 10
+    assert result["value"][0] # Best solution kept
+    assert solver.solve_stats["stopped"]
+
+@pytest.mark.skipif((os.cpu_count() or 1) < 2, reason="needs at least 2 cores")
+def test_thread_pool_speeds_up_independent_solves():
+    n = min(4, os.cpu_count())
+    time_limit = 2.0
+
+    # One search thread per solve, so each solve runs out its time limit on a core of its own
+    started = time.perf_counter()
+    for seed in range(n):
+        make_solver(seed, time_limit).solve()
+    serial = time.perf_counter() - started
+
+    solvers = [make_solver(seed, time_limit) for seed in range(n)]
+    started = time.perf_counter()
+    solve_many(solvers, max_workers=n)
+    parallel = time.perf_counter() - started
+
+    # Linear would be serial / n; the model builds hold the GIL, so allow some slack
+    assert parallel < serial / n * 1.5
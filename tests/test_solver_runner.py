@@ -29,3 +29,20 @@ def test_matplotlib_setup_at_import_time():
         
         # Verify matplotlib.use('Agg') was called
         mock_mpl.use.assert_called_with('Agg')
+
+def test_overrides_apply_without_penalty_config(tmp_path, monkeypatch):
+    import json
+    from benchmarks.instances import generate_instance
+    from src.step_04_run_solver import run_solver
+
+    groups, team = generate_instance(team_size=6, weeks=1, families=2, groups_per_family=1, seed=3)
+    (tmp_path / "data" / "processed").mkdir(parents=True)
+    (tmp_path / "data" / "processed" / "test_month_groups.json").write_text(json.dumps(groups), encoding='utf-8')
+    (tmp_path / "data" / "team_members.json").write_text(json.dumps(team), encoding='utf-8')
+    monkeypatch.chdir(tmp_path) # No data/penalty_config.json here
+
+    solver = run_solver("test_month", overrides={"time_limit_seconds": 7.0, "num_search_workers": 1})
+    assert solver.time_limit == 7.0
+    assert solver.num_search_workers == 1
+    assert solver.rule_definitions # The project's default ladder still applies
+    assert (tmp_path / "data" / "results" / "test_month_assignments.json").exists()
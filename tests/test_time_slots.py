@@ -0,0 +1,45 @@
+import pandas as pd
+from src.time_slots import parse_slot, format_slot, merge_intervals, day_intervals, AvailabilityIndex
+from src.step_02_convert_data import process_schedule
+
+def test_parse_and_format_slots():
+    assert parse_slot("19-22") == (19 * 60, 22 * 60)
+    assert parse_slot(" 19-00 ") == (19 * 60, 24 * 60)
+    assert parse_slot("All") == parse_slot("19-00")
+    assert parse_slot("22-02") == (22 * 60, 26 * 60)
+    assert parse_slot("18:30-20") == (18 * 60 + 30, 20 * 60)
+    for bad in ("x", "20.0", "19-19", "25-26", None, 20.0):
+        assert parse_slot(bad) is None
+
+    for text in ("19-22", "19-00", "22-02", "18:30-20", "00-24"):
+        assert format_slot(parse_slot(text)) == text
+
+def test_merge_intervals():
+    assert merge_intervals([(5, 6), (1, 3), (3, 4), (2, 3)]) == [(1, 4), (5, 6)]
+    assert merge_intervals([]) == []
+
+def test_legacy_slot_form_is_read():
+    day = {"time_slots": {"20-21": ["Alice", "Bob"], "21-22": ["Bob"], "bogus": ["Carol"]}}
+    assert day_intervals(day) == {"Alice": [(1200, 1260)], "Bob": [(1200, 1320)]}
+
+def test_index_queries_any_slot():
+    calendar = {"Week 1": {"Mon": {"intervals": {"Bob": ["19-20", "21-00"], "Alice": ["19-22"]}}}}
+    index = AvailabilityIndex(calendar)
+    assert index.names("Week 1", "Mon", "19-20") == ["Bob", "Alice"]
+    assert index.names("Week 1", "Mon", "19-21") == ["Alice"]
+    assert index.names("Week 1", "Mon", "21:15-23:45") == ["Bob"]
+    assert index.names("Week 1", "Mon", "All") == []
+    assert index.names("Week 1", "Tue", "19-20") == []
+    assert index.names("Week 1", "Mon", "n/a") == []
+
+def test_process_schedule_with_interval_calendar():
+    jan_df = pd.DataFrame([
+        {"Week": 1, "Day": "Monday", "Time": "19:30-20:30", "TODO": "Task A", "Assignee": None, "EFFORT": 1.0},
+        {"Week": 1, "Day": "Monday", "Time": "21-22", "TODO": "Task A", "Assignee": None, "EFFORT": 1.0},
+    ])
+    tasks_data = [{"name": "Task A", "candidates": ["Alice", "Bob", "Carol"]}]
+    calendar_data = {"Week 1": {"Mon": {"date": "2026-01-05", "intervals": {"Bob": ["19-21"], "Alice": ["21-00"], "Carol": ["19-00"]}}}}
+
+    result = process_schedule(jan_df, tasks_data, calendar_data)
+    assert result[0]['candidates'] == ["Bob", "Carol"]
+    assert result[1]['candidates'] == ["Alice", "Carol"]
@@ -0,0 +1,78 @@
+import datetime
+import shutil
+import pandas as pd
+from openpyxl import Workbook
+from src.workbook_cache import WorkbookCache, read_sheets
+from src.step_01_download_data import cache_minutes, download_data, parse_args
+
+SHEETS = ["Task Availability", "Calendar Availability", "January 2026", "February 2026"]
+
+def make_workbook(path, marker="Yes"):
+    book = Workbook()
+    book.remove(book.active)
+    ws = book.create_sheet("Task Availability")
+    ws.append(["Name", "Role", "Task A", "Task B", None, "Task A"])
+    ws.append(["Alice", "Leader", marker, "No"])
+    ws.append(["Bob", None, "No", 1.0, None, 2.5])
+    ws.append([])
+    ws = book.create_sheet("Calendar Availability")
+    ws.append(["x", None, None, None, datetime.datetime(2026, 1, 5), "=1/0"])
+    ws.append([True, "19-21", 3])
+    for month in ["January 2026", "February 2026"]:
+        ws = book.create_sheet(month)
+        ws.append(["Week", "Day", "Time", "TODO", "Assignee", "EFFORT"])
+        ws.append([1, "Monday", "19-21", f"{month} task\nline", None, 1.5])
+    book.create_sheet("Empty")
+    book.save(path)
+    return path
+
+def test_read_sheets_matches_read_excel(tmp_path):
+    path = make_workbook(tmp_path / "book.xlsx")
+    names = SHEETS + ["Empty"]
+    expected = pd.read_excel(path, sheet_name=names, engine='openpyxl')
+    result = read_sheets(path, names)
+    for name in names:
+        pd.testing.assert_frame_equal(result[name], expected[name])
+
+def test_cache_is_keyed_by_content(tmp_path):
+    cache = WorkbookCache(tmp_path / "cache", max_entries=1)
+    first = cache.add_file(make_workbook(tmp_path / "a.xlsx"))
+    # Same bytes under another name (openpyxl stamps each save with the current time, so no second save)
+    assert cache.add_file(shutil.copyfile(tmp_path / "a.xlsx", tmp_path / "b.xlsx")) == first
+    assert cache.latest(max_age=60) == first
+    assert cache.latest(max_age=-1) is None
+
+    # A changed workbook is a new entry; the old one is evicted with its parsed sheets
+    cache.sheet_path(first, "Task Availability").parent.mkdir()
+    second = cache.add_file(make_workbook(tmp_path / "c.xlsx", marker="Maybe"))
+    assert second != first
+    assert not cache.workbook_path(first).exists() and not cache.sheet_path(first, "x").parent.exists()
+
+def test_download_data_from_local_workbook(tmp_path, monkeypatch):
+    path = make_workbook(tmp_path / "book.xlsx")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("src.step_02_convert_data.convert_data", lambda month: None)
+
+    download_data("January 2026", workbook_path=path)
+    raw = tmp_path / "data" / "raw"
+    expected = pd.read_excel(path, sheet_name="Task Availability", engine='openpyxl')
+    assert (raw / "task_availability.csv").read_text(encoding='utf-8') == expected.to_csv(index=False)
+    assert (raw / "january_2026.csv").exists()
+
+    # The next month reuses the sheets already parsed from the same workbook
+    key = WorkbookCache(tmp_path / "data" / "cache" / "workbooks").latest(max_age=60)
+    cached = WorkbookCache(tmp_path / "data" / "cache" / "workbooks").sheet_path(key, "Task Availability")
+    cached.write_text("Name\nFrom cache\n", encoding='utf-8')
+    download_data("February 2026", workbook_path=path)
+    assert (raw / "task_availability.csv").read_text(encoding='utf-8') == "Name\nFrom cache\n"
+    assert "February 2026 task" in (raw / "february_2026.csv").read_text(encoding='utf-8')
+
+def test_parse_args():
+    assert parse_args(["January", "2026"]) == ("January 2026", None, False)
+    assert parse_args(["March 2026", "--workbook", "book.xlsx", "--refresh"]) == ("March 2026", "book.xlsx", True)
+    assert parse_args([]) == (None, None, False)
+
+def test_downloads_are_fresh_unless_reuse_is_configured(tmp_path):
+    assert cache_minutes(tmp_path) == 0
+    (tmp_path / "penalty_config.json").write_text('{"workbook_cache_minutes": 15}', encoding='utf-8')
+    assert cache_minutes(tmp_path) == 15
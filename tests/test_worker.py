@@ -0,0 +1,33 @@
+from src.worker import LogStream, WorkerClient
+
+def test_log_stream_splits_lines():
+    events = []
+    log = LogStream(events.append)
+    log.request_id = 7
+    print("Solution 1, time = 0.5 s", file=log)
+    log.write("partial ")
+    assert [e["line"] for e in events] == ["Solution 1, time = 0.5 s"]
+    log.write("line\r\nnext\n")
+    assert [e["line"] for e in events][1:] == ["partial line", "next"]
+    assert all(e["id"] == 7 and e["event"] == "log" for e in events)
+
+def test_resident_worker_runs_requests(tmp_path):
+    client = WorkerClient(cwd=tmp_path)
+    try:
+        events = list(client.run(["export", "x", "--dry-run"]))
+        pid = client.process.pid
+        assert events[-1]["event"] == "done" and events[-1]["code"] == 0
+        assert "[pipeline] 5 would run" in [e.get("line") for e in events]
+
+        # Bad arguments fail the request, not the worker
+        assert list(client.run(["bogus"]))[-1]["code"] == 2
+        assert list(client.run(["export", "x", "--dry-run"]))[-1]["ok"]
+        assert client.process.pid == pid
+
+        # A stopped worker is replaced on the next run
+        client.stop()
+        client.process.wait()
+        assert list(client.run(["export", "x", "--dry-run"]))[-1]["ok"]
+        assert client.process.pid != pid
+    finally:
+        client.close()